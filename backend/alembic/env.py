@@ -19,6 +19,13 @@ from app.models import (  # noqa: F401
     CartItem,
     Order,
     OrderItem,
+    StockHold,
+    IdempotencyKey,
+    OutboxEvent,
+    SalesDaily,
+    SalesDailyGame,
+    SalesDailyGenre,
+    SyncState,
 )
 
 # Configuración de Alembic
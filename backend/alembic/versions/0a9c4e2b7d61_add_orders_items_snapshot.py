@@ -0,0 +1,72 @@
+"""add orders items snapshot
+
+Revision ID: 0a9c4e2b7d61
+Revises: f3b8d1a6c054
+Create Date: 2026-10-19 17:40:26.093381
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0a9c4e2b7d61"
+down_revision: Union[str, Sequence[str], None] = "f3b8d1a6c054"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "orders",
+        sa.Column(
+            "items_snapshot",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+            comment=(
+                "[{id, game_id, quantity, price_at_purchase, "
+                "game: {id, slug, name, image_url}}]"
+            ),
+        ),
+    )
+
+    # Backfill de órdenes existentes con los datos actuales de sus juegos
+    op.execute("""
+        UPDATE orders o
+        SET items_snapshot = s.items
+        FROM (
+            SELECT oi.order_id, oi.created_at,
+                   jsonb_agg(
+                       jsonb_build_object(
+                           'id', oi.id,
+                           'game_id', oi.game_id,
+                           'quantity', oi.quantity,
+                           'price_at_purchase', oi.price_at_purchase::text,
+                           'game', jsonb_build_object(
+                               'id', g.id,
+                               'slug', g.slug,
+                               'name', g.name,
+                               'image_url', g.image_url
+                           )
+                       )
+                       ORDER BY oi.id
+                   ) AS items
+            FROM order_items oi
+            JOIN games g ON g.id = oi.game_id
+            GROUP BY oi.order_id, oi.created_at
+        ) s
+        WHERE o.id = s.order_id AND o.created_at = s.created_at
+        """)
+    op.execute(
+        "UPDATE orders SET items_snapshot = '[]'::jsonb WHERE items_snapshot IS NULL"
+    )
+    op.alter_column("orders", "items_snapshot", nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("orders", "items_snapshot")
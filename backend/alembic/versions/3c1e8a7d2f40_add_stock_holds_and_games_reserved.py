@@ -0,0 +1,66 @@
+"""add stock holds and games.reserved
+
+Revision ID: 3c1e8a7d2f40
+Revises: 66920cbf7062
+Create Date: 2026-10-19 10:12:44.318201
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1e8a7d2f40"
+down_revision: Union[str, Sequence[str], None] = "66920cbf7062"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "games",
+        sa.Column(
+            "reserved",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+            comment="Unidades apartadas por holds de carritos (suma de stock_holds)",
+        ),
+    )
+
+    op.create_table(
+        "stock_holds",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("cart_id", sa.UUID(), nullable=False),
+        sa.Column("game_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "quantity", sa.Integer(), nullable=False, comment="Unidades apartadas"
+        ),
+        sa.Column(
+            "expires_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            comment="Momento en que el reaper puede liberar el hold",
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["game_id"], ["games.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("cart_id", "game_id", name="uq_stock_holds_cart_game"),
+    )
+    op.create_index(
+        op.f("ix_stock_holds_expires_at"), "stock_holds", ["expires_at"], unique=False
+    )
+    op.create_index(
+        op.f("ix_stock_holds_game_id"), "stock_holds", ["game_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_stock_holds_game_id"), table_name="stock_holds")
+    op.drop_index(op.f("ix_stock_holds_expires_at"), table_name="stock_holds")
+    op.drop_table("stock_holds")
+    op.drop_column("games", "reserved")
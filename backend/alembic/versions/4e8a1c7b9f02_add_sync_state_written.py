@@ -0,0 +1,37 @@
+"""add sync_state written
+
+Revision ID: 4e8a1c7b9f02
+Revises: 9d4e7b2c6a15
+Create Date: 2026-10-19 22:14:37.902114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4e8a1c7b9f02"
+down_revision: Union[str, Sequence[str], None] = "9d4e7b2c6a15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "sync_state",
+        sa.Column(
+            "written",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+            comment="Juegos guardados en la ejecución (cuenta contra limit al retomar)",
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("sync_state", "written")
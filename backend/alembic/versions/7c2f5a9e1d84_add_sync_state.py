@@ -0,0 +1,77 @@
+"""add sync state
+
+Revision ID: 7c2f5a9e1d84
+Revises: 0a9c4e2b7d61
+Create Date: 2026-10-19 18:21:47.530912
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2f5a9e1d84"
+down_revision: Union[str, Sequence[str], None] = "0a9c4e2b7d61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "sync_state",
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column(
+            "ordering",
+            sa.String(length=50),
+            nullable=False,
+            comment="Ordenamiento pedido a la API: -rating, -updated, etc",
+        ),
+        sa.Column("page_size", sa.Integer(), nullable=False),
+        sa.Column(
+            "since",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            comment="Filtro updated >= since de la ejecución (incremental)",
+        ),
+        sa.Column(
+            "limit",
+            sa.Integer(),
+            nullable=True,
+            comment="Máximo de juegos de la ejecución (NULL: catálogo completo)",
+        ),
+        sa.Column(
+            "status",
+            sa.String(length=20),
+            nullable=False,
+            comment="running | completed",
+        ),
+        sa.Column(
+            "last_page",
+            sa.Integer(),
+            nullable=False,
+            comment="Última página guardada sin huecos antes de ella",
+        ),
+        sa.Column(
+            "last_updated",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            comment="Mayor 'updated' de RAWG visto en la ejecución",
+        ),
+        sa.Column(
+            "synced_until",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            comment="Punto de partida del próximo sync incremental",
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("sync_state")
@@ -0,0 +1,40 @@
+"""add order_items genres
+
+Revision ID: 9d4e7b2c6a15
+Revises: 7c2f5a9e1d84
+Create Date: 2026-10-19 21:02:13.418227
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4e7b2c6a15"
+down_revision: Union[str, Sequence[str], None] = "7c2f5a9e1d84"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable y sin default: en Postgres 11+ no reescribe la tabla; se
+    # propaga a todas las particiones. Las órdenes existentes quedan en
+    # NULL y los rollups usan games.genres para ellas
+    op.add_column(
+        "order_items",
+        sa.Column(
+            "genres",
+            postgresql.ARRAY(sa.String()),
+            nullable=True,
+            comment="Géneros al momento de compra (NULL: orden anterior al snapshot)",
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("order_items", "genres")
@@ -0,0 +1,53 @@
+"""add orders keyset pagination indexes
+
+Revision ID: b5d93e1f7a26
+Revises: 8f2b6d0c4a17
+Create Date: 2026-10-19 13:05:42.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b5d93e1f7a26"
+down_revision: Union[str, Sequence[str], None] = "8f2b6d0c4a17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Los índices compuestos cubren los filtros simples (prefijo izquierdo)
+    op.drop_index(op.f("ix_orders_user_id"), table_name="orders")
+    op.drop_index(op.f("ix_orders_status"), table_name="orders")
+    op.drop_index(op.f("ix_orders_created_at"), table_name="orders")
+    op.create_index(
+        "ix_orders_user_id_created_at_id",
+        "orders",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_orders_status_created_at_id",
+        "orders",
+        ["status", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_orders_created_at_id", "orders", ["created_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_orders_created_at_id", table_name="orders")
+    op.drop_index("ix_orders_status_created_at_id", table_name="orders")
+    op.drop_index("ix_orders_user_id_created_at_id", table_name="orders")
+    op.create_index(
+        op.f("ix_orders_created_at"), "orders", ["created_at"], unique=False
+    )
+    op.create_index(op.f("ix_orders_status"), "orders", ["status"], unique=False)
+    op.create_index(op.f("ix_orders_user_id"), "orders", ["user_id"], unique=False)
@@ -0,0 +1,86 @@
+"""add sales rollups
+
+Revision ID: d41c7a9e5b83
+Revises: b5d93e1f7a26
+Create Date: 2026-10-19 14:22:10.604873
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d41c7a9e5b83"
+down_revision: Union[str, Sequence[str], None] = "b5d93e1f7a26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "sales_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("revenue", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.Column(
+            "buyers_hll",
+            postgresql.ARRAY(sa.SmallInteger()),
+            nullable=False,
+            comment="Registros HyperLogLog de compradores distintos (app.core.hll)",
+        ),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    op.create_table(
+        "sales_daily_games",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("game_id", sa.UUID(), nullable=False),
+        sa.Column("revenue", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["game_id"], ["games.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("day", "game_id"),
+    )
+    op.create_index(
+        op.f("ix_sales_daily_games_game_id"),
+        "sales_daily_games",
+        ["game_id"],
+        unique=False,
+    )
+    op.create_table(
+        "sales_daily_genres",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("genre", sa.String(length=255), nullable=False),
+        sa.Column("revenue", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("units", sa.Integer(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "genre"),
+    )
+
+    # Sube un registro HLL (índice 1-based) al máximo entre su valor y val
+    op.execute("""
+        CREATE FUNCTION hll_add(registers smallint[], idx integer, val integer)
+        RETURNS smallint[]
+        LANGUAGE sql IMMUTABLE AS $$
+            SELECT CASE
+                WHEN registers[idx] >= val THEN registers
+                ELSE registers[1:idx - 1]
+                     || val::smallint
+                     || registers[idx + 1:array_length(registers, 1)]
+            END
+        $$
+        """)
+    # Los rollups se llenan con: python -m app.scripts.rebuild_sales_rollups
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION hll_add(smallint[], integer, integer)")
+    op.drop_table("sales_daily_genres")
+    op.drop_index(op.f("ix_sales_daily_games_game_id"), table_name="sales_daily_games")
+    op.drop_table("sales_daily_games")
+    op.drop_table("sales_daily")
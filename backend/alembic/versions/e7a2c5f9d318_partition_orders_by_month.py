@@ -0,0 +1,203 @@
+"""partition orders and order_items by month
+
+Revision ID: e7a2c5f9d318
+Revises: d41c7a9e5b83
+Create Date: 2026-10-19 15:48:31.270946
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a2c5f9d318"
+down_revision: Union[str, Sequence[str], None] = "d41c7a9e5b83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Meses creados por adelantado; después lo mantiene
+# python -m app.scripts.manage_partitions
+MONTHS_AHEAD = 3
+
+ORDER_COLUMNS = (
+    "id, order_number, user_id, status, total_amount, shipping_address, "
+    "created_at, updated_at"
+)
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_orders_order_number", "orders", ["order_number"], unique=False)
+    op.create_index(
+        "ix_orders_user_id_created_at_id",
+        "orders",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_orders_status_created_at_id",
+        "orders",
+        ["status", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_orders_created_at_id", "orders", ["created_at", "id"], unique=False
+    )
+    op.create_index(
+        "ix_order_items_order_id", "order_items", ["order_id"], unique=False
+    )
+    op.create_index("ix_order_items_game_id", "order_items", ["game_id"], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 1. Tablas nuevas particionadas por rango mensual de created_at, con
+    #    las mismas columnas. La PK debe incluir la llave de partición.
+    op.execute("ALTER TABLE order_items RENAME TO order_items_old")
+    op.execute("ALTER TABLE orders RENAME TO orders_old")
+    op.execute(
+        "CREATE TABLE orders (LIKE orders_old INCLUDING DEFAULTS INCLUDING COMMENTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    op.execute(
+        "CREATE TABLE order_items "
+        "(LIKE order_items_old INCLUDING DEFAULTS INCLUDING COMMENTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+
+    # 2. Una partición por mes desde la orden más antigua hasta
+    #    MONTHS_AHEAD meses en el futuro, más una DEFAULT de respaldo
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start timestamptz;
+            last_month timestamptz := date_trunc('month', now() AT TIME ZONE 'UTC')
+                AT TIME ZONE 'UTC' + interval '{MONTHS_AHEAD} months';
+            suffix text;
+        BEGIN
+            SELECT coalesce(
+                date_trunc('month', min(created_at) AT TIME ZONE 'UTC')
+                    AT TIME ZONE 'UTC',
+                date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+            ) INTO month_start FROM orders_old;
+
+            WHILE month_start <= last_month LOOP
+                suffix := to_char(month_start AT TIME ZONE 'UTC', 'YYYYMM');
+                EXECUTE format(
+                    'CREATE TABLE orders_p%s PARTITION OF orders '
+                    || 'FOR VALUES FROM (%L) TO (%L)',
+                    suffix, month_start, month_start + interval '1 month'
+                );
+                EXECUTE format(
+                    'CREATE TABLE order_items_p%s PARTITION OF order_items '
+                    || 'FOR VALUES FROM (%L) TO (%L)',
+                    suffix, month_start, month_start + interval '1 month'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$
+        """)
+    op.execute("CREATE TABLE orders_default PARTITION OF orders DEFAULT")
+    op.execute("CREATE TABLE order_items_default PARTITION OF order_items DEFAULT")
+
+    # 3. Copiar datos. order_items.created_at toma el de su orden para que
+    #    cada item viva en la misma partición (y cumpla la FK compuesta)
+    op.execute(
+        f"INSERT INTO orders ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM orders_old"
+    )
+    op.execute("""
+        INSERT INTO order_items
+            (id, order_id, game_id, quantity, price_at_purchase, created_at)
+        SELECT oi.id, oi.order_id, oi.game_id, oi.quantity, oi.price_at_purchase,
+            o.created_at
+        FROM order_items_old oi
+        JOIN orders_old o ON o.id = oi.order_id
+        """)
+    op.execute("DROP TABLE order_items_old")
+    op.execute("DROP TABLE orders_old")
+
+    # 4. Constraints e índices (se propagan a cada partición)
+    op.create_primary_key("orders_pkey", "orders", ["id", "created_at"])
+    op.create_primary_key("order_items_pkey", "order_items", ["id", "created_at"])
+    op.create_foreign_key(
+        "orders_user_id_fkey",
+        "orders",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "order_items_order_id_created_at_fkey",
+        "order_items",
+        "orders",
+        ["order_id", "created_at"],
+        ["id", "created_at"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "order_items_game_id_fkey",
+        "order_items",
+        "games",
+        ["game_id"],
+        ["id"],
+        ondelete="RESTRICT",
+    )
+    _create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE order_items RENAME TO order_items_part")
+    op.execute("ALTER TABLE orders RENAME TO orders_part")
+    op.execute(
+        "CREATE TABLE orders (LIKE orders_part INCLUDING DEFAULTS INCLUDING COMMENTS)"
+    )
+    op.execute(
+        "CREATE TABLE order_items "
+        "(LIKE order_items_part INCLUDING DEFAULTS INCLUDING COMMENTS)"
+    )
+    op.execute(
+        f"INSERT INTO orders ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM orders_part"
+    )
+    op.execute(
+        "INSERT INTO order_items "
+        "(id, order_id, game_id, quantity, price_at_purchase, created_at) "
+        "SELECT id, order_id, game_id, quantity, price_at_purchase, created_at "
+        "FROM order_items_part"
+    )
+    # DROP de la tabla particionada elimina también sus particiones
+    op.execute("DROP TABLE order_items_part")
+    op.execute("DROP TABLE orders_part")
+
+    op.create_primary_key("orders_pkey", "orders", ["id"])
+    op.create_primary_key("order_items_pkey", "order_items", ["id"])
+    op.create_foreign_key(
+        "orders_user_id_fkey",
+        "orders",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "order_items_order_id_fkey",
+        "order_items",
+        "orders",
+        ["order_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_foreign_key(
+        "order_items_game_id_fkey",
+        "order_items",
+        "games",
+        ["game_id"],
+        ["id"],
+        ondelete="RESTRICT",
+    )
+    _create_indexes()
+    op.drop_index("ix_orders_order_number", table_name="orders")
+    op.create_index("ix_orders_order_number", "orders", ["order_number"], unique=True)
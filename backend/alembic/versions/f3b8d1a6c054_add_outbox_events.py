@@ -0,0 +1,72 @@
+"""add outbox events
+
+Revision ID: f3b8d1a6c054
+Revises: e7a2c5f9d318
+Create Date: 2026-10-19 16:55:03.418527
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b8d1a6c054"
+down_revision: Union[str, Sequence[str], None] = "e7a2c5f9d318"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "event_type",
+            sa.String(length=100),
+            nullable=False,
+            comment="Tipo de evento: order.created, order.status_changed",
+        ),
+        sa.Column(
+            "aggregate_id",
+            sa.UUID(),
+            nullable=False,
+            comment="ID de la entidad que originó el evento (orden)",
+        ),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "available_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            comment="No se entrega antes de esta fecha (lease o backoff)",
+        ),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "failed_at",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            comment="Se agotaron los reintentos (dead letter)",
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["available_at"],
+        unique=False,
+        postgresql_where=sa.text("failed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_outbox_events_pending",
+        table_name="outbox_events",
+        postgresql_where=sa.text("failed_at IS NULL"),
+    )
+    op.drop_table("outbox_events")
@@ -6,12 +6,13 @@ Usadas para proteger rutas y obtener usuario actual.
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.security import decode_token
+from app.core.database import get_auth_db
 from app.schemas.token import TokenPayload
 from app.models.user import User, UserRole
 from app.crud import user as crud_user
@@ -23,7 +24,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/lo
 
 
 async def get_current_user(
-    db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)
+    db: AsyncSession = Depends(get_auth_db), token: str = Depends(oauth2_scheme)
 ) -> User:
     """
     Dependencia que obtiene el usuario actual desde el JWT.
@@ -33,6 +34,10 @@ async def get_current_user(
         async def protected_route(user: User = Depends(get_current_user)):
             return {"user": user.email}
 
+    El usuario se lee de la base en cada request (una lectura por primary
+    key en autocommit, ver get_auth_db): desactivar una cuenta o quitarle
+    el rol de admin se aplica en el request siguiente.
+
     Raises:
         HTTPException 401: Si el token es inválido o el usuario no existe
     """
@@ -44,9 +49,7 @@ async def get_current_user(
 
     try:
         # Decodificar JWT
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_token(token)
 
         # Extraer user_id del campo 'sub' (subject)
         user_id_str: str = payload.get("sub")
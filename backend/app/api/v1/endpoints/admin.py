@@ -0,0 +1,144 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+import math
+import os
+
+from app.core.cache import catalog_cache
+from app.core.database import get_db, get_read_db, all_engines
+from app.schemas.stats import SalesGroupBy, SalesStatsResponse
+from app.schemas.pricing import RepriceRequest, RepriceResponse
+from app.schemas.metrics import PoolMetrics, PoolMetricsResponse
+from app.crud import sales_stats as crud_sales_stats
+from app.crud import pricing as crud_pricing
+from app.api.deps import AdminUser
+
+router = APIRouter()
+
+
+@router.get("/stats/sales", response_model=SalesStatsResponse)
+async def get_sales_stats(
+    admin: AdminUser,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    group_by: SalesGroupBy = SalesGroupBy.DAY,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Reporte de ventas (admin). Lee solo las tablas de rollups.
+
+    **Query Parameters:**
+    - from: Primer día, inclusive (UTC). Default: hace 29 días
+    - to: Último día, inclusive (UTC). Default: hoy
+    - group_by: day, week, month, game o genre
+    - limit: Máximo de filas para game/genre (top por revenue)
+
+    **Returns:**
+    - Totales del rango (con compradores distintos aproximados) y filas
+
+    **Errors:**
+    - 400: Rango de fechas inválido
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=29)
+
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be on or before 'to'",
+        )
+
+    stats = await crud_sales_stats.get_sales_stats(
+        db, date_from, date_to, group_by.value, limit
+    )
+
+    return SalesStatsResponse(
+        date_from=date_from, date_to=date_to, group_by=group_by, **stats
+    )
+
+
+@router.post("/pricing/reprice", response_model=RepriceResponse)
+async def reprice_catalog(
+    request: RepriceRequest,
+    admin: AdminUser,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Recalcular los precios de todo el catálogo activo (admin).
+
+    Evalúa las reglas (tramos por metacritic/rating, multiplicadores por
+    género, descuentos por antigüedad, redondeo a .99) sobre todos los
+    juegos de una vez. Con dry_run=true (default) solo devuelve el diff.
+
+    **Body:**
+    - rules: Reglas de precio (default: los tramos del importador)
+    - dry_run: Solo calcular, sin guardar
+    - diff_limit: Máximo de cambios en la respuesta
+
+    **Returns:**
+    - Juegos evaluados, cambiados, saltados (editados durante el repricing)
+      y los cambios de mayor diferencia
+    """
+    evaluated, changed, skipped, changes = await crud_pricing.reprice_catalog(
+        db, request.rules, request.dry_run, request.diff_limit
+    )
+    if changed and not request.dry_run:
+        catalog_cache.clear()
+
+    return RepriceResponse(
+        dry_run=request.dry_run,
+        evaluated=evaluated,
+        changed=changed,
+        skipped=skipped,
+        unchanged=evaluated - changed - skipped,
+        changes=changes,
+    )
+
+
+def _histogram(histogram) -> dict:
+    return {
+        "buckets": [
+            {"le": None if math.isinf(bound) else bound, "count": count}
+            for bound, count in histogram.cumulative()
+        ],
+        "count": histogram.count,
+        "sum": histogram.sum,
+    }
+
+
+@router.get("/metrics/db-pool", response_model=PoolMetricsResponse)
+async def get_db_pool_metrics(admin: AdminUser):
+    """
+    Estado de los pools de conexiones de este worker (admin): primario y
+    réplicas de lectura.
+
+    Sirve para dimensionar DB_POOL_SIZE / DB_MAX_OVERFLOW: si hay esperas
+    largas o timeouts el pool es chico; si checked_out nunca se acerca a
+    size sobran conexiones. Cada worker tiene su propio pool.
+
+    **Returns:**
+    - Conexiones en uso/libres/overflow, checkouts, timeouts e histogramas
+      de espera por checkout y de tiempo con la conexión tomada
+    """
+    pools = []
+    for pool in (e.pool for e in all_engines()):
+        stats = pool.stats
+        pools.append(
+            PoolMetrics(
+                name=pool._orig_logging_name,
+                size=pool.size(),
+                max_overflow=pool._max_overflow,
+                timeout=pool.timeout(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                checkouts=stats.checkouts,
+                timeouts=stats.timeouts,
+                wait_seconds=_histogram(stats.wait),
+                hold_seconds=_histogram(stats.hold),
+            )
+        )
+
+    return PoolMetricsResponse(pid=os.getpid(), pools=pools)
@@ -13,6 +13,7 @@ from app.core.database import get_db
 from app.core.security import (
     create_access_token,
     create_refresh_token,
+    decode_token,
     get_password_hash,
     verify_password,
 )
@@ -21,7 +22,7 @@ from app.schemas.user import UserRegister, UserResponse, UserCreate
 from app.schemas.token import Token, RefreshTokenRequest
 from app.api.deps import get_current_user, CurrentUser
 from app.models.user import User
-from jose import JWTError, jwt
+from jose import JWTError
 import uuid
 
 
@@ -124,11 +125,7 @@ async def refresh_token(
     )
 
     try:
-        payload = jwt.decode(
-            refresh_request.refresh_token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
+        payload = decode_token(refresh_request.refresh_token)
 
         user_id_str: str = payload.get("sub")
         token_type: str = payload.get("type")
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
+from app.core.query_stats import query_budget
 from app.schemas.cart import CartResponse, CartItemCreate, CartItemUpdate
 from app.crud import cart as crud_cart
 from app.api.deps import CurrentUser
@@ -14,7 +15,8 @@ router = APIRouter()
 # todos los endpoints requieren authenticacion
 
 
-@router.get("", response_model=CartResponse)
+# usuario + carrito + items + juegos (o usuario + carrito + INSERT + refresh)
+@router.get("", response_model=CartResponse, dependencies=[Depends(query_budget(4))])
 async def get_cart(
     current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
@@ -9,7 +9,9 @@ from typing import Optional
 import uuid
 import math
 
-from app.core.database import get_db
+from app.core.cache import catalog_cache
+from app.core.database import get_db, get_read_db
+from app.core.query_stats import query_budget
 from app.schemas.game import (
     GameListResponse,
     GameDetail,
@@ -23,10 +25,17 @@ from app.api.deps import CurrentUser, AdminUser
 
 router = APIRouter()
 
+# Campos del detalle que nunca se cachean (ver get_game)
+_STOCK_FIELDS = {"stock", "available_stock"}
+
 # endpoints publicos
 
 
-@router.get("", response_model=GameListResponse)
+@router.get(
+    "",
+    response_model=GameListResponse,
+    dependencies=[Depends(query_budget(2))],  # count + página
+)
 async def list_games(
     search: Optional[str] = Query(None, min_length=1, max_length=100),
     genre: Optional[str] = None,
@@ -40,7 +49,7 @@ async def list_games(
     order: str = Query("desc", regex="^(asc|desc)$"),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Listar videojuegos con filtros, búsqueda y paginación.
@@ -60,6 +69,9 @@ async def list_games(
 
     **Returns:**
     - Lista de juegos con metadata de paginación
+
+    Las páginas se cachean CATALOG_CACHE_TTL_SECONDS por worker; un hit
+    no toca la base de datos.
     """
 
     filters = GameFilters(
@@ -75,17 +87,26 @@ async def list_games(
         limit=limit,
     )
 
+    cache_key = ("list", tuple(filters.model_dump().items()))
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     games, total = await crud_game.get_games(db, filters)
 
     pages = math.ceil(total / limit) if total > 0 else 0
 
-    return GameListResponse(
+    response = GameListResponse(
         items=games, total=total, skip=skip, limit=limit, pages=pages
     )
+    catalog_cache.set(cache_key, response)
+    return response
 
 
-@router.get("/{slug}", response_model=GameDetail)
-async def get_game(slug: str, db: AsyncSession = Depends(get_db)):
+@router.get(
+    "/{slug}", response_model=GameDetail, dependencies=[Depends(query_budget(1))]
+)
+async def get_game(slug: str, db: AsyncSession = Depends(get_read_db)):
     """
     Obtener detalle de un videojuego por slug.
 
@@ -99,17 +120,33 @@ async def get_game(slug: str, db: AsyncSession = Depends(get_db)):
 
     **Errors:**
     - 404: Juego no encontrado
+
+    Cacheado CATALOG_CACHE_TTL_SECONDS por worker, como el listado, pero
+    sin stock: holds, checkouts y el reaper no invalidan el cache, así que
+    en un hit stock y available_stock se leen de la base (una lectura por
+    primary key de dos columnas).
     """
+    not_found = HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Game with slug '{slug}' not found",
+    )
+
+    cache_key = ("detail", slug)
+    cached = catalog_cache.get(cache_key)
+    if cached is not None:
+        stock = await crud_game.get_game_stock(db, cached["id"])
+        if stock is None:
+            raise not_found
+        return GameDetail(**cached, stock=stock[0], available_stock=stock[1])
 
     game = await crud_game.get_game_by_slug(db, slug)
 
     if not game:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Game with slug '{slug}' not found",
-        )
+        raise not_found
 
-    return game
+    detail = GameDetail.model_validate(game)
+    catalog_cache.set(cache_key, detail.model_dump(exclude=_STOCK_FIELDS))
+    return detail
 
 
 # endpoints protegidos (admin)
@@ -144,6 +181,7 @@ async def create_game(
         )
 
     game = await crud_game.create_game(db, game_data)
+    catalog_cache.clear()
     return game
 
 
@@ -194,6 +232,7 @@ async def update_game(
             )
 
     game = await crud_game.update_game(db, game_id, game_data)
+    catalog_cache.clear()
     return game
 
 
@@ -219,6 +258,7 @@ async def delete_game(
     - 404: Juego no encontrado
     """
     success = await crud_game.delete_game(db, game_id)
+    catalog_cache.clear()
 
     if not success:
         raise HTTPException(
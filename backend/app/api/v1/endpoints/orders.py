@@ -1,15 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import AsyncIterator, Optional
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+import csv
+import enum
+import io
+import json
 import uuid
+import zlib
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.query_stats import query_budget
 from app.schemas.order import (
     OrderCreate,
     OrderResponse,
     OrderListItem,
     OrderListResponse,
     OrderStatusUpdate,
+    OrderStatusBatchUpdate,
+    OrderStatusBatchResponse,
+    OrderExportFormat,
 )
 from app.crud import order as crud_order
 from app.api.deps import CurrentUser, AdminUser
@@ -22,7 +34,13 @@ router = APIRouter()
 # endpoints de usuario -  requieren autenticacion
 
 
-@router.post("", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
+# usuario + checkout + claim y respuesta de Idempotency-Key
+@router.post(
+    "",
+    response_model=OrderResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(crud_order.CHECKOUT_QUERIES + 3))],
+)
 async def create_order(
     order_data: OrderCreate,
     current_user: CurrentUser,
@@ -48,29 +66,173 @@ async def create_order(
     return order
 
 
-@router.get("/me", response_model=OrderListResponse)
+@router.get(
+    "/me",
+    response_model=OrderListResponse,
+    dependencies=[Depends(query_budget(2))],  # usuario + página
+)
 async def get_my_orders(
     current_user: CurrentUser,
-    skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Obtener órdenes del usuario actual.
+    Obtener órdenes del usuario actual (más recientes primero).
 
     **Query Parameters:**
-    - skip: Registros a saltar
     - limit: Registros por página (max 100)
+    - cursor: `next_cursor` de la página anterior
+    - created_from, created_to: Rango de fecha de creación (opcional)
 
     **Returns:**
-    - Lista de órdenes con paginación
+    - Lista de órdenes y cursor de la siguiente página
+
+    **Errors:**
+    - 400: Cursor inválido
     """
-    orders, total = await crud_order.get_user_orders(db, current_user.id, skip, limit)
+    try:
+        orders, next_cursor = await crud_order.get_user_orders(
+            db, current_user.id, limit, cursor, created_from, created_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return OrderListResponse(items=orders, total=total, skip=skip, limit=limit)
+    return OrderListResponse(items=orders, limit=limit, next_cursor=next_cursor)
+
+
+EXPORT_CSV_COLUMNS = [
+    "order_id",
+    "order_number",
+    "created_at",
+    "status",
+    "user_id",
+    "total_amount",
+    "item_id",
+    "game_id",
+    "game_slug",
+    "game_name",
+    "quantity",
+    "price_at_purchase",
+]
+
+
+def _export_value(value):
+    """Convierte valores de la base de datos a texto/JSON"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    return value
+
+
+async def _export_chunks(
+    batches: AsyncIterator[list], export_format: OrderExportFormat
+) -> AsyncIterator[bytes]:
+    """Serializa cada lote de filas en un solo chunk de bytes"""
+    if export_format == OrderExportFormat.CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_CSV_COLUMNS)
+        yield buffer.getvalue().encode()
+
+        async for batch in batches:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows(
+                [_export_value(row[name]) for name in EXPORT_CSV_COLUMNS]
+                for row in batch
+            )
+            yield buffer.getvalue().encode()
+    else:
+        async for batch in batches:
+            yield "".join(
+                json.dumps({key: _export_value(value) for key, value in row.items()})
+                + "\n"
+                for row in batch
+            ).encode()
+
+
+async def _gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Comprime el stream en formato gzip sin acumularlo en memoria"""
+    compressor = zlib.compressobj(wbits=31)  # 31 = contenedor gzip
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@router.get("/export")
+async def export_orders(
+    admin: AdminUser,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    export_format: OrderExportFormat = Query(OrderExportFormat.CSV, alias="format"),
+    gzip: bool = False,
+):
+    """
+    Exportar órdenes (admin) como descarga en streaming.
 
+    Lee las órdenes por lotes desde un cursor del servidor, dentro de un
+    snapshot consistente, sin cargar el resultado completo en memoria.
 
-@router.get("/{order_id}", response_model=OrderResponse)
+    **Query Parameters:**
+    - from: Primer día, inclusive (UTC). Default: hace 29 días
+    - to: Último día, inclusive (UTC). Default: hoy
+    - status: Filtrar por estado (opcional)
+    - format: csv (una fila por item) o ndjson (un objeto por orden)
+    - gzip: Comprimir la descarga (.gz)
+
+    **Returns:**
+    - Archivo CSV o NDJSON
+
+    **Errors:**
+    - 400: Rango de fechas inválido
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=29)
+
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'from' must be on or before 'to'",
+        )
+
+    batches = crud_order.stream_orders_export(
+        datetime.combine(date_from, time.min, timezone.utc),
+        datetime.combine(date_to + timedelta(days=1), time.min, timezone.utc),
+        order_status,
+        flatten_items=export_format == OrderExportFormat.CSV,
+    )
+    chunks = _export_chunks(batches, export_format)
+
+    filename = f"orders-{date_from}-{date_to}.{export_format.value}"
+    media_type = (
+        "text/csv" if export_format == OrderExportFormat.CSV else "application/x-ndjson"
+    )
+    if gzip:
+        chunks = _gzip_chunks(chunks)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/{order_id}",
+    response_model=OrderResponse,
+    dependencies=[Depends(query_budget(2))],  # usuario + orden
+)
 async def get_order(
     order_id: uuid.UUID,
     current_user: CurrentUser,
@@ -101,31 +263,51 @@ async def get_order(
 # endpoins the admin
 
 
-@router.get("", response_model=OrderListResponse)
+@router.get(
+    "",
+    response_model=OrderListResponse,
+    dependencies=[Depends(query_budget(2))],  # usuario + página
+)
 async def get_all_orders(
     admin: AdminUser,
-    skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    status: Optional[OrderStatus] = None,
-    db: AsyncSession = Depends(get_db),
+    order_status: Optional[OrderStatus] = Query(None, alias="status"),
+    cursor: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Obtener todas las órdenes (admin).
+    Obtener todas las órdenes (admin), más recientes primero.
 
     **Query Parameters:**
-    - skip: Registros a saltar
     - limit: Registros por página (max 100)
     - status: Filtrar por estado (opcional)
+    - cursor: `next_cursor` de la página anterior
+    - created_from, created_to: Rango de fecha de creación (opcional)
 
     **Returns:**
-    - Lista de todas las órdenes con paginación
+    - Lista de órdenes y cursor de la siguiente página
+
+    **Errors:**
+    - 400: Cursor inválido
     """
-    orders, total = await crud_order.get_all_orders(db, skip, limit, status)
+    try:
+        orders, next_cursor = await crud_order.get_all_orders(
+            db, limit, order_status, cursor, created_from, created_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return OrderListResponse(items=orders, total=total, skip=skip, limit=limit)
+    return OrderListResponse(items=orders, limit=limit, next_cursor=next_cursor)
 
 
-@router.put("/{order_id}/status", response_model=OrderResponse)
+# usuario + orden (FOR UPDATE) + 3 rollups al cancelar + outbox + UPDATE
+@router.put(
+    "/{order_id}/status",
+    response_model=OrderResponse,
+    dependencies=[Depends(query_budget(7))],
+)
 async def update_order_status(
     order_id: uuid.UUID,
     status_data: OrderStatusUpdate,
@@ -138,6 +320,9 @@ async def update_order_status(
     **Path Parameters:**
     - order_id: UUID de la orden
 
+    Transiciones permitidas: pending → processing/cancelled,
+    processing → completed/cancelled (las mismas que en status:batch).
+
     **Body:**
     - status: Nuevo estado (pending, processing, completed, cancelled)
 
@@ -146,8 +331,12 @@ async def update_order_status(
 
     **Errors:**
     - 404: Orden no encontrada
+    - 409: Transición de estado no permitida
     """
-    order = await crud_order.update_order_status(db, order_id, status_data)
+    try:
+        order = await crud_order.update_order_status(db, order_id, status_data)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
     if not order:
         raise HTTPException(
@@ -155,3 +344,48 @@ async def update_order_status(
         )
 
     return order
+
+
+# usuario + UPDATE con CTEs + 3 rollups al cancelar + outbox + Idempotency-Key
+@router.post(
+    "/status:batch",
+    response_model=OrderStatusBatchResponse,
+    dependencies=[Depends(query_budget(8))],
+)
+async def update_orders_status_batch(
+    batch: OrderStatusBatchUpdate,
+    admin: AdminUser,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Cambiar el estado de varias órdenes (admin).
+
+    Transiciones permitidas: pending → processing/cancelled,
+    processing → completed/cancelled. Las demás se reportan como
+    `invalid_transition` sin modificar la orden.
+
+    **Body:**
+    - status: Nuevo estado
+    - order_ids: Lista de UUIDs (max 1000), o
+    - filter: {status, created_from, created_to} para elegir por estado
+      actual y fecha de creación
+    - limit: Máximo de órdenes afectadas con filter (max 1000)
+
+    **Returns:**
+    - Resultado por orden: updated, invalid_transition o not_found
+    """
+    results = await crud_order.update_orders_status_batch(
+        db,
+        batch.status,
+        order_ids=batch.order_ids,
+        status_filter=batch.filter.status if batch.filter else None,
+        created_from=batch.filter.created_from if batch.filter else None,
+        created_to=batch.filter.created_to if batch.filter else None,
+        limit=batch.limit,
+    )
+
+    return OrderStatusBatchResponse(
+        status=batch.status,
+        updated=sum(1 for item in results if item["result"] == "updated"),
+        results=results,
+    )
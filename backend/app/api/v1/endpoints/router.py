@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from . import auth, games, cart, orders
+from . import auth, games, cart, orders, admin
 
 api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(games.router, prefix="/games", tags=["Games"])
 api_router.include_router(cart.router, prefix="/cart", tags=["Cart"])
 api_router.include_router(orders.router, prefix="/orders", tags=["Orders"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
@@ -0,0 +1,77 @@
+"""
+Cache en memoria del proceso, con TTL y tope de entradas (LRU).
+
+Cada worker tiene su propio cache: invalidar aquí solo limpia este
+proceso, los demás ven el cambio cuando vence el TTL. Por eso solo se
+cachean lecturas que toleran unos segundos de atraso.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import settings
+from app.core.prometheus import cache_requests
+
+
+class TTLCache:
+    """
+    Diccionario con vencimiento por entrada.
+
+    Al pasar max_size se descarta la entrada usada hace más tiempo.
+    ttl <= 0 desactiva el cache (get siempre es miss). Hits y misses se
+    cuentan también en /metrics con el label cache=name.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._hit_counter = cache_requests.labels(name, "hit")
+        self._miss_counter = cache_requests.labels(name, "miss")
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            self._miss_counter.inc()
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self._hit_counter.inc()
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Catálogo público: detalle por slug y páginas de GET /games
+catalog_cache = TTLCache(
+    "catalog", settings.CATALOG_CACHE_TTL_SECONDS, settings.CACHE_MAX_ENTRIES
+)
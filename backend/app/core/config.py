@@ -31,19 +31,90 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_URL_SYNC: str  # Para Alembic (no soporta async)
 
+    # Pool de conexiones (por worker: el total es workers * (size + overflow)
+    # y debe caber en max_connections de Postgres)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Espera máxima por una conexión
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Reabrir conexiones más viejas
+    DB_POOL_PRE_PING: bool = False  # Un round-trip extra por checkout
+    DB_STATEMENT_CACHE_SIZE: int = 100  # 0 detrás de PgBouncer (transaction mode)
+    DB_APPLICATION_NAME: str = "memorycard-api"  # Visible en pg_stat_activity
+    DB_JIT: bool = False  # JIT de Postgres: costoso en queries OLTP cortas
+
+    # Réplicas de lectura (string separado por comas; vacío = solo primario)
+    DATABASE_READ_URLS: str = ""
+    DB_READ_BALANCING: str = "round_robin"  # round_robin | least_connections
+    # Tras una escritura, las lecturas de ese cliente van al primario
+    # durante este tiempo (cubre el lag de replicación)
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    # Cache en memoria por worker (0 = desactivado). Un cambio hecho en
+    # otro worker se ve cuando vence el TTL
+    CATALOG_CACHE_TTL_SECONDS: float = 30.0
+    CACHE_MAX_ENTRIES: int = 10000
+
+    # Medición de queries por request (ver app.core.query_stats)
+    SQL_SERVER_TIMING: bool = True  # Header Server-Timing con el tiempo en la base
+    SQL_QUERY_BUDGET_ENFORCE: bool = (
+        False  # True en tests: exceder el presupuesto falla
+    )
+
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Stock holds (reservas temporales desde el carrito)
+    STOCK_HOLD_TTL_MINUTES: int = 15
+    STOCK_HOLD_REAPER_INTERVAL_SECONDS: float = 30.0
+    STOCK_HOLD_REAPER_BATCH_SIZE: int = 500
+
+    # Idempotency-Key (reintentos seguros de POST/PUT/DELETE)
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 60  # Ejecución en curso abandonada
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS: float = 30.0  # Espera de duplicados
+
+    # Outbox de eventos (entrega asíncrona a handlers en proceso)
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_LEASE_SECONDS: int = 60  # Tiempo antes de reintentar un lote tomado
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    OUTBOX_MAX_BACKOFF_SECONDS: int = 600
+
     # RAWG API
     RAWG_API_KEY: str
     RAWG_BASE_URL: str = "https://api.rawg.io/api"
+    RAWG_CONCURRENCY: int = 4  # Requests simultáneos (y conexiones keep-alive)
+    RAWG_RATE_PER_SECOND: float = 4.0  # Token bucket: requests/s sostenidos
+    RAWG_BURST: int = 8  # Capacidad del bucket
+    RAWG_MAX_RETRIES: int = 5  # Reintentos en 429/5xx/errores de red
+    RAWG_BACKOFF_BASE_SECONDS: float = 0.5
+    RAWG_MAX_BACKOFF_SECONDS: float = 30.0
+    RAWG_CACHE_DIR: str = ""  # Cache en disco de respuestas ("" = desactivado)
+    RAWG_CACHE_MAX_AGE_SECONDS: int = 7 * 24 * 3600
+    RAWG_CACHE_OFFLINE: bool = False  # Solo responder desde el cache, sin red
 
     # CORS (string separado por comas, será convertido a lista)
     ALLOWED_ORIGINS: str = "http://localhost:3000"
 
+    @property
+    def database_read_urls(self) -> List[str]:
+        """Convierte string separado por comas en lista"""
+        return [
+            url.strip() for url in self.DATABASE_READ_URLS.split(",") if url.strip()
+        ]
+
+    @field_validator("DB_READ_BALANCING")
+    @classmethod
+    def validate_read_balancing(cls, value: str) -> str:
+        if value not in ("round_robin", "least_connections"):
+            raise ValueError(
+                "DB_READ_BALANCING must be round_robin or least_connections"
+            )
+        return value
+
     @property
     def cors_origins(self) -> List[str]:
         """Convierte string separado por comas en lista"""
@@ -2,23 +2,143 @@
 Configuración de la base de datos con SQLAlchemy 2.0.
 """
 
-from typing import AsyncGenerator
+import itertools
+import time
+from typing import AsyncGenerator, Callable, List, Optional
+from fastapi import Request
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import PoolStats, pool_stats
+from app.core.prometheus import pool_series
+from app.core.query_stats import instrument_engine
 
 
-# echo=True muestra las queries SQL en consola (útil para desarrollo)
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,  # Verifica conexiones antes de usarlas
-)
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Pool que mide cada checkout: cuánto se esperó por una conexión (incluye
+    abrir una nueva si hay overflow), cuántas esperas terminaron en timeout
+    y cuánto tiempo se retuvo la conexión hasta devolverla.
+    Ver GET /admin/metrics/db-pool.
+    """
+
+    @property
+    def stats(self) -> PoolStats:
+        return pool_stats(self._orig_logging_name)
+
+    def connect(self):
+        stats = self.stats
+        series = pool_series(self._orig_logging_name)
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            stats.timeouts += 1
+            series.timeouts.inc()
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            stats.checkouts += 1
+            stats.wait.observe(waited)
+            series.wait.observe(waited)
+
+
+def _track_hold_time(engine: AsyncEngine, name: str) -> None:
+    """
+    Registra el tiempo entre checkout y checkin de cada conexión y mantiene
+    los gauges de conexiones en uso/libres para /metrics
+    """
+    series = pool_series(name)
+
+    def update_gauges() -> None:
+        series.in_use.set(engine.pool.checkedout())
+        series.idle.set(engine.pool.checkedin())
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        update_gauges()
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            pool_stats(name).hold.observe(time.perf_counter() - checked_out_at)
+        update_gauges()
+
+
+def create_engine(url: str, name: str) -> AsyncEngine:
+    """
+    Crea un engine con los parámetros de pool de Settings.
+
+    Args:
+        url: URL de la base de datos (postgresql+asyncpg://...)
+        name: Nombre del pool en métricas y logs
+    """
+    new_engine = create_async_engine(
+        url,
+        # echo=True muestra las queries SQL en consola (útil para desarrollo)
+        echo=settings.DEBUG,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_logging_name=name,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # Cache de prepared statements de SQLAlchemy y de asyncpg
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": {
+                "application_name": settings.DB_APPLICATION_NAME,
+                "jit": "on" if settings.DB_JIT else "off",
+            },
+        },
+    )
+    _track_hold_time(new_engine, name)
+    instrument_engine(new_engine)
+    return new_engine
+
+
+engine = create_engine(settings.DATABASE_URL, "primary")
+
+# Réplicas de lectura (vacío: todo va al primario)
+read_engines: List[AsyncEngine] = [
+    create_engine(url, f"replica{index}")
+    for index, url in enumerate(settings.database_read_urls, start=1)
+]
+_round_robin = itertools.cycle(read_engines)
+
+# Cookie que marca a un cliente que acaba de escribir (ver
+# app.middleware.read_your_writes); expira sola tras READ_YOUR_WRITES_SECONDS
+PRIMARY_STICKY_COOKIE = "db_primary"
+
+
+def all_engines() -> List[AsyncEngine]:
+    return [engine, *read_engines]
+
+
+def select_read_engine() -> AsyncEngine:
+    """
+    Elige la réplica para una lectura: en turno (round_robin) o la que
+    tiene menos conexiones en uso en este worker (least_connections).
+    Sin réplicas devuelve el primario.
+    """
+    if not read_engines:
+        return engine
+    if settings.DB_READ_BALANCING == "least_connections":
+        return min(read_engines, key=lambda e: e.pool.checkedout())
+    return next(_round_robin)
+
 
 # expire_on_commit=False previene que los objetos expiren al hacer commit
 AsyncSessionLocal = async_sessionmaker(
@@ -30,15 +150,92 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+class ReadOnlySession(AsyncSession):
+    """
+    Sesión de solo lectura sobre una conexión en autocommit.
+
+    Sin transacción no hay BEGIN ni COMMIT/ROLLBACK que pagar, y la conexión
+    vuelve al pool apenas termina cada consulta (los resultados de execute
+    ya vienen leídos), no al final de la petición: la serialización de la
+    respuesta no retiene conexiones. El commit() interno solo libera la
+    conexión; en autocommit no envía nada al servidor.
+
+    No usar para escribir: cada sentencia se confirmaría por separado.
+    """
+
+    async def _release(self) -> None:
+        await self.commit()
+
+    async def execute(self, *args, **kwargs):
+        try:
+            return await super().execute(*args, **kwargs)
+        finally:
+            await self._release()
+
+    async def scalar(self, *args, **kwargs):
+        try:
+            return await super().scalar(*args, **kwargs)
+        finally:
+            await self._release()
+
+    async def scalars(self, *args, **kwargs):
+        try:
+            return await super().scalars(*args, **kwargs)
+        finally:
+            await self._release()
+
+    async def get(self, *args, **kwargs):
+        try:
+            return await super().get(*args, **kwargs)
+        finally:
+            await self._release()
+
+
+ReadSessionLocal = async_sessionmaker(
+    class_=ReadOnlySession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+# Variante autocommit de cada engine (comparte su pool)
+_autocommit_engines = {
+    e: e.execution_options(isolation_level="AUTOCOMMIT") for e in all_engines()
+}
+
+
 class Base(DeclarativeBase):
     """Clase base para todos los modelos ORM"""
     pass
 
 
+class LazySession:
+    """
+    Proxy que crea la sesión recién al primer uso (db.execute, db.add, ...).
+
+    Un endpoint que responde desde el cache o falla antes de consultar no
+    crea sesión ni toma conexión del pool, y al terminar no hay commit,
+    rollback ni close que hacer: la presión sobre el pool sigue al trabajo
+    real en la base, no a la cantidad de requests.
+    """
+
+    def __init__(self, factory: Callable[[], AsyncSession]):
+        self._factory = factory
+        self._session: Optional[AsyncSession] = None
+
+    @property
+    def acquired(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependencia de FastAPI que provee una sesión de base de datos.
+    Dependencia de FastAPI que provee una sesión de base de datos
+    (LazySession: no toca el pool si el endpoint no la usa).
 
     Uso en endpoints:
         @app.get("/items")
@@ -47,17 +244,63 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
     El yield asegura que la sesión se cierre incluso si hay errores.
     """
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
+    session = LazySession(AsyncSessionLocal)
+    try:
+        yield session
+        if session.acquired:
             await session.commit()
-        except Exception:
+    except Exception:
+        if session.acquired:
             await session.rollback()
-            raise
-        finally:
+        raise
+    finally:
+        if session.acquired:
             await session.close()
 
 
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependencia de FastAPI para endpoints de solo lectura: ReadOnlySession
+    en autocommit sobre una réplica (si hay), creada al primer uso como en
+    get_db. Para endpoints que escriben, usar get_db.
+
+    Un cliente que escribió hace menos de READ_YOUR_WRITES_SECONDS lee del
+    primario, así siempre ve sus propios cambios aunque la réplica tenga lag.
+    """
+
+    def open_session() -> AsyncSession:
+        if request.cookies.get(PRIMARY_STICKY_COOKIE):
+            bind = engine
+        else:
+            bind = select_read_engine()
+        return ReadSessionLocal(bind=_autocommit_engines[bind])
+
+    session = LazySession(open_session)
+    try:
+        yield session
+    finally:
+        if session.acquired:
+            await session.close()
+
+
+async def get_auth_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependencia de get_current_user: ReadOnlySession en autocommit sobre el
+    primario, creada al primer uso.
+
+    Buscar al usuario no abre transacción y la conexión vuelve al pool
+    apenas termina la lectura: un endpoint de lectura (get_read_db) no
+    retiene una conexión del primario durante el handler ni paga COMMIT
+    al final. Primario y no réplica: desactivar una cuenta o quitar el rol
+    de admin vale en el request siguiente, sin esperar el lag.
+    """
+    session = LazySession(lambda: ReadSessionLocal(bind=_autocommit_engines[engine]))
+    try:
+        yield session
+    finally:
+        if session.acquired:
+            await session.close()
+
 
 async def create_tables():
     async with engine.begin() as conn:
@@ -66,4 +309,4 @@ async def create_tables():
 
 async def drop_tables():
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.drop_all)
@@ -0,0 +1,64 @@
+"""
+Handlers en proceso para los eventos del outbox.
+
+Los módulos se suscriben con el decorador subscribe; el relay
+(app.workers.outbox_relay) entrega cada evento a todos los handlers de su
+tipo. La entrega es "al menos una vez": si un handler falla, el evento se
+reintenta completo, así que los handlers deben ser idempotentes.
+
+Uso:
+    @subscribe(ORDER_CREATED)
+    async def send_confirmation_email(event: Event):
+        ...
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+ORDER_CREATED = "order.created"
+ORDER_STATUS_CHANGED = "order.status_changed"
+
+
+class Event(NamedTuple):
+    """Evento entregado a los handlers"""
+
+    id: uuid.UUID
+    event_type: str
+    aggregate_id: uuid.UUID
+    payload: dict
+    attempts: int
+
+
+EventHandler = Callable[[Event], Awaitable[None]]
+
+_handlers: Dict[str, List[EventHandler]] = defaultdict(list)
+
+
+def subscribe(event_type: str) -> Callable[[EventHandler], EventHandler]:
+    """Registra un handler para un tipo de evento"""
+
+    def decorator(handler: EventHandler) -> EventHandler:
+        _handlers[event_type].append(handler)
+        return handler
+
+    return decorator
+
+
+def get_handlers(event_type: str) -> List[EventHandler]:
+    return list(_handlers.get(event_type, []))
+
+
+@subscribe(ORDER_CREATED)
+@subscribe(ORDER_STATUS_CHANGED)
+async def log_order_event(event: Event):
+    """Handler base: deja constancia del evento en el log"""
+    logger.info(
+        "Order event %s for %s (attempt %d)",
+        event.event_type,
+        event.aggregate_id,
+        event.attempts,
+    )
@@ -0,0 +1,71 @@
+"""
+HyperLogLog para contar compradores distintos de forma aproximada.
+
+Cada rollup diario guarda HLL_REGISTERS registros (smallint[] en Postgres).
+Agregar un comprador solo sube un registro al máximo entre su valor y el
+del hash, así que la actualización es conmutativa e idempotente: dos
+checkouts concurrentes no se pisan y reprocesar una orden no infla el
+conteo. Varios días se combinan con el máximo registro a registro.
+
+Error estándar con 1024 registros: ~1.04 / sqrt(1024) ≈ 3.25%.
+"""
+
+import hashlib
+import math
+import uuid
+from typing import Iterable, List, Tuple
+
+HLL_PRECISION = 10
+HLL_REGISTERS = 1 << HLL_PRECISION
+_HASH_BITS = 64
+_RANK_BITS = _HASH_BITS - HLL_PRECISION
+
+
+def empty_registers() -> List[int]:
+    return [0] * HLL_REGISTERS
+
+
+def hll_position(value: uuid.UUID) -> Tuple[int, int]:
+    """
+    Posición de un valor en el HLL.
+
+    Returns:
+        Tuple de (índice del registro, rango): los primeros HLL_PRECISION
+        bits del hash eligen el registro y el rango es la posición del
+        primer bit en 1 del resto.
+    """
+    hashed = int.from_bytes(hashlib.blake2b(value.bytes, digest_size=8).digest(), "big")
+    index = hashed >> _RANK_BITS
+    remainder = hashed & ((1 << _RANK_BITS) - 1)
+    rank = _RANK_BITS - remainder.bit_length() + 1
+    return index, rank
+
+
+def hll_add(registers: List[int], value: uuid.UUID) -> None:
+    """Agrega un valor a los registros (in place)"""
+    index, rank = hll_position(value)
+    if registers[index] < rank:
+        registers[index] = rank
+
+
+def hll_merge(register_sets: Iterable[List[int]]) -> List[int]:
+    """Une varios HLL (máximo registro a registro)"""
+    merged = empty_registers()
+    for registers in register_sets:
+        for i, rank in enumerate(registers):
+            if rank > merged[i]:
+                merged[i] = rank
+    return merged
+
+
+def hll_estimate(registers: List[int]) -> int:
+    """Estima la cardinalidad (con corrección de rango pequeño)"""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / sum(2.0**-rank for rank in registers)
+
+    zeros = registers.count(0)
+    if raw <= 2.5 * m and zeros:
+        # Linear counting: más preciso con pocos elementos
+        return round(m * math.log(m / zeros))
+    return round(raw)
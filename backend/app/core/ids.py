@@ -0,0 +1,80 @@
+"""
+Generación de identificadores ordenables por tiempo (UUIDv7, RFC 9562).
+
+Los UUIDv4 son aleatorios: cada INSERT cae en una página distinta del
+índice B-tree de la primary key (page splits, mala localidad de caché,
+más WAL). Un UUIDv7 empieza con el timestamp en milisegundos, así que los
+registros nuevos se agregan al final del índice, como un autoincremental,
+sin perder la unicidad global de un UUID.
+"""
+
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+# Alfabeto Crockford Base32 (sin I, L, O, U para evitar confusiones)
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Genera un UUIDv7 monótono.
+
+    Estructura (128 bits):
+    - 48 bits: timestamp Unix en milisegundos
+    - 4 bits: versión (7)
+    - 12 bits: contador dentro del mismo milisegundo (método 1 del RFC)
+    - 2 bits: variante
+    - 62 bits: aleatorios
+
+    Dentro de un mismo milisegundo el contador crece, por lo que los IDs
+    generados por este proceso son estrictamente crecientes. El contador
+    arranca en un valor aleatorio de la mitad inferior para dejar margen;
+    si se agota, se toma prestado el siguiente milisegundo.
+    """
+    global _last_ms, _counter
+
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1
+                _counter = 0
+        timestamp_ms = _last_ms
+        counter = _counter
+
+    random_bits = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    value = (
+        (timestamp_ms << 80)
+        | (0x7 << 76)
+        | (counter << 64)
+        | (0b10 << 62)
+        | random_bits
+    )
+    return uuid.UUID(int=value)
+
+
+def uuid7_datetime(value: uuid.UUID) -> datetime:
+    """Devuelve el instante (UTC, precisión de ms) codificado en un UUIDv7"""
+    timestamp_ms = value.int >> 80
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
+
+def to_crockford32(value: uuid.UUID) -> str:
+    """Codifica un UUID en 26 caracteres Crockford Base32 (orden preservado)"""
+    number = value.int
+    chars = []
+    for _ in range(26):
+        chars.append(_CROCKFORD[number & 0x1F])
+        number >>= 5
+    return "".join(reversed(chars))
@@ -0,0 +1,87 @@
+"""
+Métricas en proceso (sin dependencias externas).
+
+Cada worker lleva sus propios contadores; se exponen en endpoints de admin.
+"""
+
+import bisect
+import math
+from typing import Dict, List, Optional, Sequence
+
+# Segundos: de 1ms (conexión libre en el pool) a 30s (pool_timeout default)
+WAIT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# Segundos que una petición retiene la conexión (checkout -> checkin)
+HOLD_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    5.0,
+)
+
+
+class Histogram:
+    """
+    Histograma de buckets fijos, al estilo de Prometheus: cada bucket
+    cuenta las observaciones <= su límite (acumulado), más +Inf.
+    """
+
+    def __init__(self, buckets: Sequence[float] = WAIT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[tuple]:
+        """[(límite, observaciones <= límite)], el último con límite inf"""
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (math.inf,), self._counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class PoolStats:
+    """Contadores de checkout de un pool de conexiones"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait = Histogram()
+        self.hold = Histogram(HOLD_BUCKETS)
+
+
+_pool_stats: Dict[str, PoolStats] = {}
+
+
+def pool_stats(name: Optional[str]) -> PoolStats:
+    """Stats del pool con ese nombre (se conservan si el pool se recrea)"""
+    return _pool_stats.setdefault(name or "default", PoolStats())
@@ -0,0 +1,150 @@
+"""
+Métricas en formato Prometheus (GET /metrics).
+
+Con varios workers de uvicorn, cada proceso escribe sus valores en
+archivos mmap dentro de PROMETHEUS_MULTIPROC_DIR y /metrics suma los de
+todos (modo multiproceso de prometheus_client). La variable debe estar en
+el entorno antes de arrancar (no en .env) y el directorio vacío:
+
+    PROMETHEUS_MULTIPROC_DIR=/tmp/memorycard-metrics uvicorn app.main:app --workers 4
+
+Sin la variable, cada worker expone solo lo suyo.
+
+Las series con labels se resuelven una vez y se guardan (labels() busca y
+arma la serie en cada llamada): en el camino de un request solo queda
+observe/inc.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Latencia de requests: de 5ms a 10s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# bcrypt (cost 12) tarda ~0.2-0.3s; JWT, microsegundos
+AUTH_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Latencia de requests HTTP",
+    ("method", "route", "status"),
+    buckets=LATENCY_BUCKETS,
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "Requests HTTP en curso",
+    ("method",),
+    multiprocess_mode="livesum",
+)
+
+db_pool_connections = Gauge(
+    "db_pool_connections",
+    "Conexiones del pool por estado (in_use, idle)",
+    ("pool", "state"),
+    multiprocess_mode="livesum",
+)
+db_pool_wait = Histogram(
+    "db_pool_wait_seconds",
+    "Espera por una conexión del pool",
+    ("pool",),
+    buckets=LATENCY_BUCKETS,
+)
+db_pool_timeouts = Counter(
+    "db_pool_timeouts",
+    "Checkouts que terminaron en timeout",
+    ("pool",),
+)
+
+auth_duration = Histogram(
+    "auth_operation_duration_seconds",
+    "Tiempo de operaciones de autenticación (bcrypt, JWT)",
+    ("operation",),
+    buckets=AUTH_BUCKETS,
+)
+
+cache_requests = Counter(
+    "cache_requests",
+    "Lecturas de los caches en memoria (hit ratio = hit / total)",
+    ("cache", "result"),
+)
+
+
+class PoolSeries:
+    """Series de un pool, resueltas una vez"""
+
+    def __init__(self, pool: str):
+        self.wait = db_pool_wait.labels(pool)
+        self.timeouts = db_pool_timeouts.labels(pool)
+        self.in_use = db_pool_connections.labels(pool, "in_use")
+        self.idle = db_pool_connections.labels(pool, "idle")
+
+
+_http_series: Dict[Tuple[str, str, int], object] = {}
+_in_progress_series: Dict[str, object] = {}
+_pool_series: Dict[str, PoolSeries] = {}
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    key = (method, route, status)
+    series = _http_series.get(key)
+    if series is None:
+        series = _http_series[key] = http_request_duration.labels(
+            method, route, str(status)
+        )
+    series.observe(seconds)
+
+
+def requests_in_progress(method: str):
+    series = _in_progress_series.get(method)
+    if series is None:
+        series = _in_progress_series[method] = http_requests_in_progress.labels(method)
+    return series
+
+
+def pool_series(pool: str) -> PoolSeries:
+    series = _pool_series.get(pool)
+    if series is None:
+        series = _pool_series[pool] = PoolSeries(pool)
+    return series
+
+
+@contextmanager
+def time_auth(operation: str) -> Iterator[None]:
+    """Mide una operación de autenticación: with time_auth("bcrypt_verify"): ..."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        auth_duration.labels(operation).observe(time.perf_counter() - start)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Cuerpo y content type de GET /metrics"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Descarta los gauges de este worker al apagarse (modo multiproceso)"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
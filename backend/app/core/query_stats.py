@@ -0,0 +1,133 @@
+"""
+Conteo de queries SQL por request.
+
+Los hooks before/after_cursor_execute de cada engine suman en el
+QueryStats del request actual (un ContextVar que abre
+ServerTimingMiddleware): cantidad de queries, tiempo total en la base y la
+query más lenta. Fuera de un request (workers, scripts) no se mide nada.
+
+Presupuesto de queries: un endpoint lo declara con
+dependencies=[Depends(query_budget(n))]. Con SQL_QUERY_BUDGET_ENFORCE (en
+tests) la query n+1 levanta QueryBudgetExceeded y el request falla; sin
+él, el exceso solo queda en el log. Para código fuera de un endpoint,
+assert_max_queries (p. ej. app.scripts.bench_checkout).
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+# Largo máximo del SQL que se guarda para logs y errores
+STATEMENT_PREVIEW_CHARS = 200
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Un request o bloque hizo más queries que su presupuesto"""
+
+
+class QueryStats:
+    """Queries de un request"""
+
+    def __init__(self, budget: Optional[int] = None, enforce: bool = False):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.budget = budget
+        self.enforce = enforce
+        # Solo al hacer cumplir el presupuesto: para el mensaje de error
+        self.statements: List[str] = []
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_seconds += elapsed
+        if elapsed >= self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement[:STATEMENT_PREVIEW_CHARS]
+
+        if self.enforce:
+            self.statements.append(statement[:STATEMENT_PREVIEW_CHARS])
+            if self.over_budget:
+                listing = "\n".join(
+                    f"  {number}. {sql}"
+                    for number, sql in enumerate(self.statements, 1)
+                )
+                raise QueryBudgetExceeded(
+                    f"{self.count} queries, budget is {self.budget}:\n{listing}"
+                )
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@contextmanager
+def track_queries(
+    budget: Optional[int] = None, enforce: Optional[bool] = None
+) -> Iterator[QueryStats]:
+    """Mide las queries hechas dentro del bloque (en esta tarea de asyncio)"""
+    if enforce is None:
+        enforce = settings.SQL_QUERY_BUDGET_ENFORCE
+    stats = QueryStats(budget, enforce)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget: int) -> Iterator[QueryStats]:
+    """
+    Falla si el bloque hace más de `budget` queries, siempre (no depende
+    de SQL_QUERY_BUDGET_ENFORCE). Para scripts de verificación:
+
+        with assert_max_queries(crud_order.CHECKOUT_QUERIES):
+            await crud_order.create_order_from_cart(db, user_id, order_data)
+    """
+    with track_queries(budget, enforce=True) as stats:
+        yield stats
+
+
+def query_budget(budget: int) -> Callable[[], Awaitable[None]]:
+    """
+    Dependencia que declara el máximo de queries de un endpoint, contando
+    las de otras dependencias (autenticación incluida).
+    Va en dependencies=[...] de la ruta: así corre antes que las demás.
+    """
+
+    async def declare_budget() -> None:
+        stats = _current.get()
+        if stats is not None:
+            stats.budget = budget
+
+    return declare_budget
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Registra los hooks de medición en el engine"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context._query_started_at = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, time.perf_counter() - context._query_started_at)
@@ -5,20 +5,33 @@ Funciones de seguridad: hashing de contraseñas y JWT.
 from datetime import datetime, timedelta,timezone
 from typing import Optional
 from passlib.context import CryptContext
-from jose import jwt
+from jose import JWTError, jwt
 from app.core.config import settings
-
+from app.core.prometheus import time_auth
 
 # Contexto para hashear contraseñas con bcrypt
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    with time_auth("bcrypt_verify"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    with time_auth("bcrypt_hash"):
+        return pwd_context.hash(password)
+
+
+def decode_token(token: str) -> dict:
+    """
+    Decodifica y valida un JWT (firma y expiración).
+
+    Raises:
+        JWTError: Si el token es inválido o expiró
+    """
+    with time_auth("jwt_decode"):
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -42,11 +55,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         )
 
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM
-    )
+    with time_auth("jwt_encode"):
+        encoded_jwt = jwt.encode(
+            to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        )
     return encoded_jwt
 
 
@@ -56,9 +68,26 @@ def create_refresh_token(data: dict) -> str:
     expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
 
-    encoded_jwt = jwt.encode(
-        to_encode,
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM
-    )
-    return encoded_jwt
\ No newline at end of file
+    with time_auth("jwt_encode"):
+        encoded_jwt = jwt.encode(
+            to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        )
+    return encoded_jwt
+
+
+def get_token_subject(token: str) -> Optional[str]:
+    """
+    Devuelve el 'sub' de un access token válido, o None.
+
+    No consulta la base de datos: sirve para identificar al usuario en
+    middlewares antes de que corran las dependencias del endpoint.
+    """
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        return None
+
+    if payload.get("type", "access") != "access":
+        return None
+
+    return payload.get("sub")
@@ -1,4 +1,5 @@
-from sqlalchemy import select
+from sqlalchemy import select, lambda_stmt
+from sqlalchemy.sql import StatementLambdaElement
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from typing import Optional
@@ -7,6 +8,41 @@ import uuid
 from app.models.cart import Cart, CartItem
 from app.models.game import Game
 from app.schemas.cart import CartItemCreate, CartItemUpdate
+from app.crud.game import active_game_by_id_stmt
+from app.crud.stock_hold import hold_stock, release_hold, release_cart_holds
+
+# Queries calientes como lambda_stmt (ver app.crud.user)
+
+
+def cart_with_items_stmt(user_id: uuid.UUID) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Cart)
+        .where(Cart.user_id == user_id)
+        .options(selectinload(Cart.items).selectinload(CartItem.game))
+    )
+
+
+def cart_item_by_game_stmt(
+    cart_id: uuid.UUID, game_id: uuid.UUID
+) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(CartItem).where(
+            CartItem.cart_id == cart_id, CartItem.game_id == game_id
+        )
+    )
+
+
+def owned_cart_item_stmt(
+    item_id: uuid.UUID, user_id: uuid.UUID, with_game: bool = False
+) -> StatementLambdaElement:
+    stmt = lambda_stmt(
+        lambda: select(CartItem)
+        .join(Cart)
+        .where(CartItem.id == item_id, Cart.user_id == user_id)
+    )
+    if with_game:
+        stmt += lambda s: s.options(selectinload(CartItem.game))
+    return stmt
 
 
 async def get_or_create_cart(db: AsyncSession, user_id: uuid.UUID) -> Cart:
@@ -20,13 +56,13 @@ async def get_or_create_cart(db: AsyncSession, user_id: uuid.UUID) -> Cart:
     Returns:
         Carrito del usuario
     """
-    # Buscar carrito existente con items precargados
-    stmt = (
-        select(Cart)
-        .where(Cart.user_id == user_id)
-        .options(selectinload(Cart.items).selectinload(CartItem.game))
+    # Buscar carrito existente con items precargados. populate_existing
+    # refresca objetos ya cargados: los holds cambian games.reserved con
+    # UPDATEs directos que no pasan por el identity map
+    result = await db.execute(
+        cart_with_items_stmt(user_id),
+        execution_options={"populate_existing": True},
     )
-    result = await db.execute(stmt)
     cart = result.scalar_one_or_none()
 
     if cart:
@@ -45,6 +81,7 @@ async def add_item_to_cart(
 ) -> CartItem:
     """
     Agrega un item al carrito o actualiza cantidad si ya existe.
+    Aparta (hold) la cantidad total del item hasta que expire el hold.
 
     Args:
         db: Sesión de base de datos
@@ -58,33 +95,25 @@ async def add_item_to_cart(
         ValueError: Si el juego no existe o no hay stock
     """
     # Verificar que el juego existe y está activo
-    stmt = select(Game).where(Game.id == item_data.game_id, Game.is_active == True)
-    result = await db.execute(stmt)
+    result = await db.execute(active_game_by_id_stmt(item_data.game_id))
     game = result.scalar_one_or_none()
 
     if not game:
         raise ValueError("Game not found or inactive")
 
-    # Verificar stock
-    if game.stock < item_data.quantity:
-        raise ValueError(f"Insufficient stock. Available: {game.stock}")
-
     # Verificar si el item ya existe en el carrito
-    stmt = select(CartItem).where(
-        CartItem.cart_id == cart.id, CartItem.game_id == item_data.game_id
-    )
-    result = await db.execute(stmt)
+    result = await db.execute(cart_item_by_game_stmt(cart.id, item_data.game_id))
     existing_item = result.scalar_one_or_none()
 
+    new_quantity = item_data.quantity
     if existing_item:
-        # Actualizar cantidad
-        new_quantity = existing_item.quantity + item_data.quantity
+        new_quantity += existing_item.quantity
 
-        if game.stock < new_quantity:
-            raise ValueError(
-                f"Insufficient stock. Available: {game.stock}, requested: {new_quantity}"
-            )
+    # Apartar stock (verifica disponibilidad de forma atómica)
+    await hold_stock(db, cart.id, game.id, new_quantity)
 
+    if existing_item:
+        # Actualizar cantidad
         existing_item.quantity = new_quantity
         await db.commit()
         await db.refresh(existing_item)
@@ -126,21 +155,14 @@ async def update_cart_item(
         ValueError: Si no hay stock suficiente
     """
     # Buscar item con verificación de ownership
-    stmt = (
-        select(CartItem)
-        .join(Cart)
-        .where(CartItem.id == item_id, Cart.user_id == user_id)
-        .options(selectinload(CartItem.game))
-    )
-    result = await db.execute(stmt)
+    result = await db.execute(owned_cart_item_stmt(item_id, user_id, with_game=True))
     cart_item = result.scalar_one_or_none()
 
     if not cart_item:
         return None
 
-    # Verificar stock
-    if cart_item.game.stock < update_data.quantity:
-        raise ValueError(f"Insufficient stock. Available: {cart_item.game.stock}")
+    # Ajustar el hold (verifica disponibilidad de forma atómica)
+    await hold_stock(db, cart_item.cart_id, cart_item.game_id, update_data.quantity)
 
     cart_item.quantity = update_data.quantity
     await db.commit()
@@ -162,17 +184,13 @@ async def remove_item_from_cart(
     Returns:
         True si se eliminó, False si no existía
     """
-    stmt = (
-        select(CartItem)
-        .join(Cart)
-        .where(CartItem.id == item_id, Cart.user_id == user_id)
-    )
-    result = await db.execute(stmt)
+    result = await db.execute(owned_cart_item_stmt(item_id, user_id))
     cart_item = result.scalar_one_or_none()
 
     if not cart_item:
         return False
 
+    await release_hold(db, cart_item.cart_id, cart_item.game_id)
     await db.delete(cart_item)
     await db.commit()
     return True
@@ -186,6 +204,8 @@ async def clear_cart(db: AsyncSession, cart: Cart):
         db: Sesión de base de datos
         cart: Carrito a vaciar
     """
+    await release_cart_holds(db, cart.id)
+
     for item in cart.items:
         await db.delete(item)
 
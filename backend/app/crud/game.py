@@ -1,6 +1,24 @@
-from sqlalchemy import select, func, or_, desc, asc
+from sqlalchemy import (
+    select,
+    func,
+    or_,
+    desc,
+    asc,
+    update,
+    values,
+    column,
+    Integer,
+    String,
+    literal,
+    literal_column,
+    any_,
+    Table,
+    lambda_stmt,
+)
+from sqlalchemy.sql import StatementLambdaElement
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import uuid
 
 from app.models.game import Game
@@ -78,9 +96,44 @@ async def get_games(db: AsyncSession, filters: GameFilters) -> Tuple[List[Game],
     return list(games), total
 
 
+# Queries calientes como lambda_stmt (ver app.crud.user)
+
+
+def game_by_id_stmt(game_id: uuid.UUID) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(Game).where(Game.id == game_id))
+
+
+def active_game_by_id_stmt(game_id: uuid.UUID) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Game).where(Game.id == game_id, Game.is_active == True)
+    )
+
+
+def game_by_slug_stmt(slug: str) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Game).where(Game.slug == slug, Game.is_active == True)
+    )
+
+
+def active_game_stock_stmt(game_id: uuid.UUID) -> StatementLambdaElement:
+    return lambda_stmt(
+        lambda: select(Game.stock, Game.reserved).where(
+            Game.id == game_id, Game.is_active == True
+        )
+    )
+
+
+def slug_exists_stmt(
+    slug: str, exclude_id: Optional[uuid.UUID] = None
+) -> StatementLambdaElement:
+    stmt = lambda_stmt(lambda: select(Game.id).where(Game.slug == slug).limit(1))
+    if exclude_id:
+        stmt += lambda s: s.where(Game.id != exclude_id)
+    return stmt
+
+
 async def get_game_by_id(db: AsyncSession, game_id: uuid.UUID) -> Optional[Game]:
-    stmt = select(Game).where(Game.id == game_id)
-    result = await db.execute(stmt)
+    result = await db.execute(game_by_id_stmt(game_id))
     return result.scalar_one_or_none()
 
 
@@ -88,11 +141,25 @@ async def get_game_by_slug(db: AsyncSession, slug: str) -> Optional[Game]:
     """
     Usado en endpoints públicos (ej: /games/the-witcher-3)
     """
-    stmt = select(Game).where(Game.slug == slug, Game.is_active == True)
-    result = await db.execute(stmt)
+    result = await db.execute(game_by_slug_stmt(slug))
     return result.scalar_one_or_none()
 
 
+async def get_game_stock(
+    db: AsyncSession, game_id: uuid.UUID
+) -> Optional[Tuple[int, int]]:
+    """
+    (stock, available_stock) de un juego activo, o None si ya no lo está.
+    Para completar un detalle cacheado: el stock cambia con cada hold y
+    checkout, que no invalidan el cache.
+    """
+    result = await db.execute(active_game_stock_stmt(game_id))
+    row = result.one_or_none()
+    if row is None:
+        return None
+    return row.stock, max(row.stock - row.reserved, 0)
+
+
 async def create_game(db: AsyncSession, game_data: GameCreate) -> Game:
     """
     Crea un nuevo videojuego.
@@ -176,12 +243,265 @@ async def check_slug_exists(
     Returns:
         True si el slug ya existe, False si no
     """
-    stmt = select(Game).where(Game.slug == slug)
+    result = await db.execute(slug_exists_stmt(slug, exclude_id))
+    return result.scalar_one_or_none() is not None
 
-    if exclude_id:
-        stmt = stmt.where(Game.id != exclude_id)
+
+def _locked_lines(rows: list, *extra_columns: str):
+    """
+    CTE que bloquea las filas de games referenciadas por rows, en orden de id.
+
+    Cada fila es (game_id, *valores) y los valores se exponen como columnas
+    enteras con los nombres de extra_columns. Bloquear siempre en el mismo
+    orden evita deadlocks entre transacciones que tocan los mismos juegos.
+    """
+    lines = values(
+        column("id", UUID(as_uuid=True)),
+        *(column(name, Integer) for name in extra_columns),
+        name="v",
+    ).data(sorted(rows, key=lambda row: row[0]))
+
+    return (
+        select(Game.id, *(lines.c[name] for name in extra_columns))
+        .join(lines, Game.id == lines.c.id)
+        .order_by(Game.id)
+        .with_for_update(of=Game)
+        .cte("locked")
+    )
+
+
+async def decrement_stock(
+    db: AsyncSession,
+    quantities: Dict[uuid.UUID, int],
+    held: Optional[Dict[uuid.UUID, int]] = None,
+) -> Dict[uuid.UUID, int]:
+    """
+    Descuenta stock de varios juegos en una sola sentencia.
+
+    Ejecuta un único UPDATE ... FROM (VALUES ...) que solo toca las filas
+    con stock suficiente. Las filas se bloquean primero en orden de id
+    dentro del mismo statement, así dos checkouts con los mismos juegos
+    nunca se bloquean en orden cruzado (sin deadlocks).
+
+    Las unidades ya apartadas por el comprador (held) se convierten en
+    descuento: salen de games.reserved y cuentan como disponibles para él.
+
+    No hace commit: el llamador decide si confirma o revierte. Si el número
+    de filas devueltas es menor que len(quantities), algún juego no tenía
+    stock suficiente y el llamador debe hacer rollback (todo o nada).
+
+    Args:
+        db: Sesión de base de datos
+        quantities: Mapa {game_id: cantidad a descontar}
+        held: Mapa {game_id: unidades apartadas por el comprador} (opcional)
+
+    Returns:
+        Mapa {game_id: stock restante} de los juegos actualizados
+    """
+    if not quantities:
+        return {}
+
+    held = held or {}
+    locked = _locked_lines(
+        [(game_id, q, held.get(game_id, 0)) for game_id, q in quantities.items()],
+        "q",
+        "h",
+    )
+
+    stmt = (
+        update(Game)
+        .where(
+            Game.id == locked.c.id,
+            Game.stock - Game.reserved + locked.c.h >= locked.c.q,
+        )
+        .values(
+            stock=Game.stock - locked.c.q,
+            reserved=Game.reserved - locked.c.h,
+        )
+        .returning(Game.id, Game.stock)
+        .execution_options(synchronize_session=False)
+    )
 
     result = await db.execute(stmt)
-    existing_game = result.scalar_one_or_none()
+    return {game_id: stock for game_id, stock in result.all()}
+
 
-    return existing_game is not None
+async def release_reserved(db: AsyncSession, quantities: Dict[uuid.UUID, int]):
+    """
+    Devuelve unidades apartadas (games.reserved) en una sola sentencia.
+    Usado por el reaper al liberar holds expirados. No hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        quantities: Mapa {game_id: unidades a liberar}
+    """
+    if not quantities:
+        return
+
+    locked = _locked_lines(list(quantities.items()), "q")
+
+    stmt = (
+        update(Game)
+        .where(Game.id == locked.c.id)
+        .values(reserved=Game.reserved - locked.c.q)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(stmt)
+
+
+async def get_described_rawg_ids(db: AsyncSession, rawg_ids: List[int]) -> set:
+    """rawg_ids de la lista que ya tienen description guardada"""
+    if not rawg_ids:
+        return set()
+
+    result = await db.execute(
+        select(Game.rawg_id).where(
+            Game.rawg_id.in_(rawg_ids), Game.description.is_not(None)
+        )
+    )
+    return set(result.scalars().all())
+
+
+# Columnas que refresca un re-import. price, stock, reserved e is_active son
+# del negocio y nunca se pisan desde el catálogo externo: el precio del
+# importador solo se usa al insertar, después lo manejan los admins
+# (PUT /games/{id}, POST /admin/pricing/reprice)
+CATALOG_COLUMNS = (
+    "slug",
+    "name",
+    "description",
+    "image_url",
+    "background_image",
+    "genres",
+    "platforms",
+    "rating",
+    "metacritic",
+    "released",
+)
+
+
+def _suffixed_slug(slug: str, rawg_id: int) -> str:
+    suffix = f"-{rawg_id}"
+    return slug[: Game.__table__.c.slug.type.length - len(suffix)] + suffix
+
+
+async def assign_catalog_slugs(
+    db: AsyncSession, rows: List[dict]
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Evita choques con games.slug (UNIQUE) antes de un upsert del catálogo.
+
+    El upsert resuelve conflictos por rawg_id, pero RAWG puede traer un
+    slug que ya es de otro rawg_id (en la base o antes en el mismo lote):
+    el INSERT fallaría entero. A esas filas se les asigna <slug>-<rawg_id>;
+    si ese también está tomado, la fila se descarta. Una sola lectura de
+    los slugs en juego. Las filas deben tener rawg_id único.
+
+    Returns:
+        Tuple de (filas a guardar, filas descartadas)
+    """
+    candidates = {row["slug"] for row in rows}
+    candidates.update(_suffixed_slug(row["slug"], row["rawg_id"]) for row in rows)
+    result = await db.execute(
+        select(Game.slug, Game.rawg_id).where(
+            Game.slug == any_(literal(list(candidates), ARRAY(String)))
+        )
+    )
+    owners = dict(result.all())
+
+    kept, skipped = [], []
+    for row in rows:
+        rawg_id = row["rawg_id"]
+        for slug in (row["slug"], _suffixed_slug(row["slug"], rawg_id)):
+            if owners.setdefault(slug, rawg_id) == rawg_id:
+                kept.append(row if slug == row["slug"] else {**row, "slug": slug})
+                break
+        else:
+            skipped.append(row)
+
+    return kept, skipped
+
+
+async def upsert_games(
+    db: AsyncSession, rows: List[dict]
+) -> Tuple[int, int, int, List[dict]]:
+    """
+    Inserta o actualiza juegos del catálogo por rawg_id en una sola sentencia
+    (INSERT ... ON CONFLICT DO UPDATE). No hace commit.
+
+    El ON CONFLICT solo cubre rawg_id: los slugs pasan antes por
+    assign_catalog_slugs, así un slug ya tomado por otro juego no hace
+    fallar la página entera.
+
+    La actualización solo se aplica si alguna columna del catálogo cambió
+    (IS DISTINCT FROM): las filas iguales no se reescriben ni generan WAL.
+    Una description nula no borra la existente (el listado de RAWG no la trae).
+
+    Args:
+        db: Sesión de base de datos
+        rows: Dicts con rawg_id y las columnas de CATALOG_COLUMNS (más
+            price, stock e is_active para los juegos nuevos)
+
+    Returns:
+        Tuple de (insertados, actualizados, sin cambios, filas descartadas
+        por slug tomado)
+    """
+    if not rows:
+        return 0, 0, 0, []
+
+    # Un rawg_id repetido en la misma sentencia haría fallar el ON CONFLICT
+    rows = list({row["rawg_id"]: row for row in rows}.values())
+    rows, skipped = await assign_catalog_slugs(db, rows)
+    if not rows:
+        return 0, 0, 0, skipped
+
+    counts = await _upsert_catalog(db, insert(Game).values(rows), len(rows))
+    return (*counts, skipped)
+
+
+async def merge_staged_games(
+    db: AsyncSession, staging: Table, total: int
+) -> Tuple[int, int, int]:
+    """
+    Versión de upsert_games para cargas masivas: las filas ya están en una
+    tabla de staging (cargada con COPY) con rawg_id único y slugs ya
+    pasados por assign_catalog_slugs. No hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        staging: Tabla con rawg_id, CATALOG_COLUMNS e id, price, stock,
+            reserved, is_active, created_at, updated_at
+        total: Filas en staging (para calcular las sin cambios)
+
+    Returns:
+        Tuple de (insertados, actualizados, sin cambios)
+    """
+    names = [c.name for c in staging.columns]
+    stmt = insert(Game).from_select(names, select(*staging.columns))
+    return await _upsert_catalog(db, stmt, total)
+
+
+async def _upsert_catalog(db: AsyncSession, stmt, total: int) -> Tuple[int, int, int]:
+    excluded = stmt.excluded
+    new_values = {name: excluded[name] for name in CATALOG_COLUMNS}
+    new_values["description"] = func.coalesce(excluded.description, Game.description)
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Game.rawg_id],
+        set_={**new_values, "updated_at": func.now()},
+        where=or_(
+            *(
+                getattr(Game, name).is_distinct_from(value)
+                for name, value in new_values.items()
+            )
+        ),
+    ).returning(
+        # xmax = 0 solo en filas recién insertadas
+        literal_column("xmax = 0").label("inserted")
+    )
+
+    result = await db.execute(stmt)
+    written = result.scalars().all()
+    inserted = sum(1 for is_new in written if is_new)
+    updated = len(written) - inserted
+    return inserted, updated, total - len(written)
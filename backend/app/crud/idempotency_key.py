@@ -0,0 +1,135 @@
+from sqlalchemy import select, update, delete, or_, and_, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey
+
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_COMPLETED = "completed"
+
+
+async def claim_key(
+    db: AsyncSession, user_id: uuid.UUID, key: str, fingerprint: str
+) -> bool:
+    """
+    Intenta reservar una clave para ejecutar la petición.
+
+    Un solo INSERT ... ON CONFLICT DO UPDATE: gana si la clave no existía,
+    si ya expiró, o si quedó "in_progress" más tiempo que el lock timeout
+    (la ejecución original murió sin terminar). Hace commit para que otras
+    peticiones vean la reserva de inmediato.
+
+    Returns:
+        True si esta petición debe ejecutarse, False si ya hay un registro
+    """
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    abandoned_before = now - timedelta(
+        seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS
+    )
+
+    stmt = insert(IdempotencyKey).values(
+        user_id=user_id,
+        key=key,
+        fingerprint=fingerprint,
+        status=STATUS_IN_PROGRESS,
+        created_at=now,
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            "fingerprint": stmt.excluded.fingerprint,
+            "status": STATUS_IN_PROGRESS,
+            "response_status": None,
+            "response_content_type": None,
+            "response_body": None,
+            "created_at": stmt.excluded.created_at,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=or_(
+            IdempotencyKey.expires_at <= now,
+            and_(
+                IdempotencyKey.status == STATUS_IN_PROGRESS,
+                IdempotencyKey.created_at <= abandoned_before,
+            ),
+        ),
+    ).returning(IdempotencyKey.user_id)
+
+    result = await db.execute(stmt)
+    claimed = result.scalar_one_or_none() is not None
+    await db.commit()
+    return claimed
+
+
+async def get_key(
+    db: AsyncSession, user_id: uuid.UUID, key: str
+) -> Optional[IdempotencyKey]:
+    """Obtiene el registro de una clave (None si no existe o expiró)"""
+    stmt = select(IdempotencyKey).where(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.expires_at > datetime.now(timezone.utc),
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def save_response(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    key: str,
+    status_code: int,
+    content_type: Optional[str],
+    body: bytes,
+):
+    """Marca la clave como completada y guarda la respuesta para replays"""
+    stmt = (
+        update(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .values(
+            status=STATUS_COMPLETED,
+            response_status=status_code,
+            response_content_type=content_type,
+            response_body=body,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def release_key(db: AsyncSession, user_id: uuid.UUID, key: str):
+    """
+    Elimina una reserva sin respuesta guardada (la ejecución falló con
+    error de servidor): el cliente puede reintentar con la misma clave.
+    """
+    stmt = delete(IdempotencyKey).where(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.status == STATUS_IN_PROGRESS,
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def purge_expired_keys(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Elimina un lote de claves expiradas. Returns: cantidad eliminada"""
+    expired = (
+        select(IdempotencyKey.user_id, IdempotencyKey.key)
+        .where(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        delete(IdempotencyKey)
+        .where(tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(expired))
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
@@ -1,41 +1,108 @@
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func, insert, update, delete, tuple_, true, any_, literal
+from sqlalchemy import column
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from typing import List, Tuple, Optional
+from typing import AsyncIterator, Dict, List, Tuple, Optional
+import base64
+import binascii
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
+from app.core.database import AsyncSessionLocal, select_read_engine
+from app.core.events import ORDER_CREATED, ORDER_STATUS_CHANGED
+from app.core.ids import uuid7, uuid7_datetime, to_crockford32
 from app.models.order import Order, OrderItem, OrderStatus
 from app.models.cart import Cart, CartItem
-from app.schemas.order import OrderCreate, OrderStatusUpdate
-
-
-def generate_order_number() -> str:
+from app.models.game import Game
+from app.models.outbox_event import OutboxEvent
+from app.schemas.order import (
+    OrderCreate,
+    OrderStatusUpdate,
+    OrderResponse,
+)
+from app.crud.game import decrement_stock
+from app.crud.stock_hold import consume_cart_holds
+from app.crud.sales_stats import (
+    SaleLine,
+    apply_order_sales,
+    subtract_orders_sales,
+)
+from app.crud.outbox import add_events
+
+# Transiciones de estado permitidas (origen -> destinos), tanto en
+# update_order_status como en update_orders_status_batch
+ALLOWED_TRANSITIONS: Dict[OrderStatus, Tuple[OrderStatus, ...]] = {
+    OrderStatus.PENDING: (OrderStatus.PROCESSING, OrderStatus.CANCELLED),
+    OrderStatus.PROCESSING: (OrderStatus.COMPLETED, OrderStatus.CANCELLED),
+    OrderStatus.COMPLETED: (),
+    OrderStatus.CANCELLED: (),
+}
+
+
+def generate_order_number(order_id: uuid.UUID) -> str:
     """
-    Genera número de orden único.
-    Formato: ORD-YYYYMMDD-RANDOM
+    Genera el número de orden a partir de su ID (UUIDv7).
+    Formato: ORD-YYYYMMDD-<ID en Crockford Base32>
+
+    Es único porque codifica el ID completo, y ordenable por tiempo
+    igual que el ID: no depende de un sufijo aleatorio.
 
     Returns:
-        Order number (ej: ORD-20250120-A1B2C3)
+        Order number (ej: ORD-20250120-01JJ4Z6W3M8Q2X5T7V9B1C3D4E)
     """
-    date_str = datetime.now(timezone.utc).strftime("%Y%m%d")
-    random_str = uuid.uuid4().hex[:6].upper()
-    return f"ORD-{date_str}-{random_str}"
+    date_str = uuid7_datetime(order_id).strftime("%Y%m%d")
+    return f"ORD-{date_str}-{to_crockford32(order_id)}"
+
+
+def _status_changed_event(
+    order_id: uuid.UUID,
+    previous_status: OrderStatus,
+    new_status: OrderStatus,
+    changed_at: datetime,
+) -> dict:
+    """Evento de outbox para un cambio de estado"""
+    return {
+        "event_type": ORDER_STATUS_CHANGED,
+        "aggregate_id": order_id,
+        "payload": {
+            "order_id": str(order_id),
+            "previous_status": previous_status.value,
+            "status": new_status.value,
+            "changed_at": changed_at.isoformat(),
+        },
+    }
+
+
+# Sentencias de create_order_from_cart, sin importar el tamaño del carrito
+# (pasos 1 a 7 de su docstring). Lo verifica app.scripts.bench_checkout
+CHECKOUT_QUERIES = 10
 
 
 async def create_order_from_cart(
     db: AsyncSession, user_id: uuid.UUID, order_data: OrderCreate
-) -> Order:
+) -> OrderResponse:
     """
     Crea una orden desde el carrito del usuario.
 
-    Proceso:
-    1. Validar que el carrito tenga items
-    2. Verificar stock de todos los items
-    3. Crear orden
-    4. Crear order items
-    5. Reducir stock de juegos
-    6. Vaciar carrito
+    Proceso (número fijo de round-trips, sin importar el tamaño del carrito):
+    1. Leer las líneas del carrito junto con los datos del juego (1 query)
+    2. Convertir los holds del carrito en descuento: reducir stock de
+       todos los juegos en un solo UPDATE atómico (si falta stock en
+       cualquier línea, rollback y error)
+    3. Crear orden (1 INSERT, con el snapshot JSONB de sus líneas)
+    4. Crear order items (1 INSERT multi-fila, fuente relacional para
+       analytics)
+    5. Vaciar carrito (1 DELETE)
+    6. Sumar la venta a los rollups de analytics (3 upserts)
+    7. Registrar el evento order.created en el outbox (1 INSERT)
+    8. Commit
+
+    El stock nunca se lee y se escribe desde Python: la verificación
+    (stock >= cantidad) y el descuento ocurren en la misma sentencia,
+    por lo que checkouts concurrentes no pueden sobrevender.
+
+    La respuesta se construye con los datos ya en memoria: no hay
+    refresh ni recarga de la orden después del commit.
 
     Args:
         db: Sesión de base de datos
@@ -48,153 +115,394 @@ async def create_order_from_cart(
     Raises:
         ValueError: Si el carrito está vacío o no hay stock
     """
-    # Obtener carrito con items
+    # Obtener líneas del carrito con los datos del juego en una sola query
     stmt = (
-        select(Cart)
+        select(
+            CartItem.cart_id,
+            CartItem.game_id,
+            CartItem.quantity,
+            CartItem.price_at_addition,
+            Game.slug,
+            Game.name,
+            Game.image_url,
+            Game.genres,
+        )
+        .join(Cart, Cart.id == CartItem.cart_id)
+        .join(Game, Game.id == CartItem.game_id)
         .where(Cart.user_id == user_id)
-        .options(selectinload(Cart.items).selectinload(CartItem.game))
+        .order_by(CartItem.created_at)
     )
     result = await db.execute(stmt)
-    cart = result.scalar_one_or_none()
+    lines = result.all()
 
-    if not cart or not cart.items:
+    if not lines:
         raise ValueError("Cart is empty")
 
-    # Verificar stock de todos los items
-    for cart_item in cart.items:
-        if cart_item.game.stock < cart_item.quantity:
-            raise ValueError(
-                f"Insufficient stock for {cart_item.game.name}. "
-                f"Available: {cart_item.game.stock}, requested: {cart_item.quantity}"
-            )
+    cart_id = lines[0].cart_id
+
+    # Agrupar cantidades por juego
+    quantities: dict[uuid.UUID, int] = {}
+    for line in lines:
+        quantities[line.game_id] = quantities.get(line.game_id, 0) + line.quantity
+
+    # Convertir holds en descuento: reducir stock de todos los juegos en una
+    # sola sentencia (todo o nada)
+    held = await consume_cart_holds(db, cart_id)
+    updated = await decrement_stock(db, quantities, held)
+
+    if len(updated) != len(quantities):
+        missing = [game_id for game_id in quantities if game_id not in updated]
+        stmt = (
+            select(Game.id, Game.name, Game.stock - Game.reserved)
+            .where(Game.id.in_(missing))
+            .order_by(Game.name)
+        )
+        result = await db.execute(stmt)
+        row = result.first()
+        await db.rollback()
+        if row is None:
+            # El juego se borró entre la lectura del carrito y el UPDATE
+            raise ValueError("Insufficient stock: a game in the cart no longer exists")
+
+        game_id, name, available = row
+        available = max(available + held.get(game_id, 0), 0)
+        raise ValueError(
+            f"Insufficient stock for {name}. "
+            f"Available: {available}, requested: {quantities[game_id]}"
+        )
 
     # Calcular total
-    total_amount = sum(
-        cart_item.price_at_addition * cart_item.quantity for cart_item in cart.items
+    total_amount = sum(line.price_at_addition * line.quantity for line in lines)
+
+    # Crear orden (ID y timestamps generados aquí para no necesitar refresh).
+    # created_at sale del mismo UUIDv7, así el ID y la fecha siempre coinciden
+    order_id = uuid7()
+    now = uuid7_datetime(order_id)
+    order_number = generate_order_number(order_id)
+    shipping_address = order_data.shipping_address.model_dump()
+
+    # Snapshot inmutable de las líneas (con los datos del juego al comprar).
+    # Los IDs de los items se generan aquí para que coincidan con order_items
+    item_ids = [uuid7() for _ in lines]
+    items_snapshot = [
+        {
+            "id": str(item_id),
+            "game_id": str(line.game_id),
+            "quantity": line.quantity,
+            "price_at_purchase": str(line.price_at_addition),
+            "game": {
+                "id": str(line.game_id),
+                "slug": line.slug,
+                "name": line.name,
+                "image_url": line.image_url,
+            },
+        }
+        for item_id, line in zip(item_ids, lines)
+    ]
+
+    await db.execute(
+        insert(Order).values(
+            id=order_id,
+            user_id=user_id,
+            order_number=order_number,
+            status=OrderStatus.PENDING,
+            total_amount=total_amount,
+            shipping_address=shipping_address,
+            items_snapshot=items_snapshot,
+            created_at=now,
+            updated_at=now,
+        )
     )
 
-    # Crear orden
-    order = Order(
+    # Crear order items (relacionales, para analytics) en un solo INSERT
+    await db.execute(
+        insert(OrderItem),
+        [
+            {
+                "id": item_id,
+                "order_id": order_id,
+                "game_id": line.game_id,
+                "quantity": line.quantity,
+                "price_at_purchase": line.price_at_addition,
+                "genres": line.genres,
+                "created_at": now,
+            }
+            for item_id, line in zip(item_ids, lines)
+        ],
+    )
+
+    # Vaciar carrito con un solo DELETE
+    await db.execute(delete(CartItem).where(CartItem.cart_id == cart_id))
+
+    # Rollups de ventas en la misma transacción que la orden
+    await apply_order_sales(
+        db,
+        user_id,
+        now,
+        [
+            SaleLine(line.game_id, line.genres, line.quantity, line.price_at_addition)
+            for line in lines
+        ],
+    )
+
+    # Evento para procesos posteriores (emails, índices, caché): se
+    # confirma con la orden y lo entrega el relay, fuera de la petición
+    await add_events(
+        db,
+        [
+            {
+                "event_type": ORDER_CREATED,
+                "aggregate_id": order_id,
+                "payload": {
+                    "order_id": str(order_id),
+                    "order_number": order_number,
+                    "user_id": str(user_id),
+                    "total_amount": str(total_amount),
+                    "created_at": now.isoformat(),
+                    "items": [
+                        {
+                            "game_id": str(line.game_id),
+                            "quantity": line.quantity,
+                            "price": str(line.price_at_addition),
+                        }
+                        for line in lines
+                    ],
+                },
+            }
+        ],
+    )
+
+    await db.commit()
+
+    # Construir la respuesta con los datos ya en memoria
+    return OrderResponse(
+        id=order_id,
         user_id=user_id,
-        order_number=generate_order_number(),
+        order_number=order_number,
         status=OrderStatus.PENDING,
         total_amount=total_amount,
-        shipping_address=order_data.shipping_address.model_dump(),
+        shipping_address=shipping_address,
+        items=items_snapshot,
+        created_at=now,
+        updated_at=now,
     )
 
-    db.add(order)
-    await db.flush()  # Genera el ID de la orden sin hacer commit
 
-    # Crear order items y reducir stock
-    for cart_item in cart.items:
-        # Crear order item
-        order_item = OrderItem(
-            order_id=order.id,
-            game_id=cart_item.game_id,
-            quantity=cart_item.quantity,
-            price_at_purchase=cart_item.price_at_addition,
+def encode_cursor(created_at: datetime, order_id: uuid.UUID) -> str:
+    """Codifica la posición (created_at, id) de la última orden de una página"""
+    raw = f"{created_at.isoformat()}|{order_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at_str, order_id_str = (
+            base64.urlsafe_b64decode(padded).decode().split("|")
         )
-        db.add(order_item)
+        return datetime.fromisoformat(created_at_str), uuid.UUID(order_id_str)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError("Invalid cursor")
 
-        # Reducir stock del juego
-        cart_item.game.stock -= cart_item.quantity
 
-    # Vaciar carrito
-    for cart_item in cart.items:
-        await db.delete(cart_item)
+# Margen alrededor del instante codificado en un UUIDv7 para acotar
+# created_at (órdenes creadas fuera del checkout pueden diferir por ms)
+ID_TIME_WINDOW = timedelta(days=1)
 
-    await db.commit()
-    await db.refresh(order)
 
-    # Cargar items con datos de juegos de la orden creada
+def _created_at_bounds(order_ids: List[uuid.UUID]) -> list:
+    """
+    Condiciones sobre created_at deducidas de IDs UUIDv7.
+
+    orders está particionada por mes sobre created_at: filtrar solo por
+    ID revisaría el índice de cada partición. Con UUIDv7 el ID lleva la
+    fecha de creación, así que acotar created_at deja al planner leer
+    solo la partición que corresponde. IDs legacy (v4) no se acotan, ni
+    los que traen un instante fuera del rango de datetime (IDs inventados
+    por el cliente): esos simplemente no existen y el lookup da 404.
+    """
+    if not order_ids or any(order_id.version != 7 for order_id in order_ids):
+        return []
+    try:
+        instants = [uuid7_datetime(order_id) for order_id in order_ids]
+        lower = min(instants) - ID_TIME_WINDOW
+        upper = max(instants) + ID_TIME_WINDOW
+    except (ValueError, OverflowError):
+        return []
+    return [Order.created_at >= lower, Order.created_at < upper]
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Las fechas sin zona horaria en filtros se interpretan como UTC"""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+async def _list_orders(
+    db: AsyncSession,
+    filters: list,
+    limit: int,
+    cursor: Optional[str],
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Lista órdenes con paginación keyset sobre (created_at, id) descendente.
+
+    El conteo de items y la suma de cantidades salen de un subquery
+    LATERAL agregado en la misma sentencia: solo se agregan los items de
+    las órdenes de la página, sin cargar objetos OrderItem.
+
+    Se pide limit + 1 filas para saber si hay página siguiente sin COUNT.
+    """
+    item_totals = (
+        select(
+            func.count(OrderItem.id).label("total_items"),
+            func.coalesce(func.sum(OrderItem.quantity), 0).label("total_quantity"),
+        )
+        .where(
+            OrderItem.order_id == Order.id,
+            # Mismo created_at que la orden: solo su partición de order_items
+            OrderItem.created_at == Order.created_at,
+        )
+        .lateral("item_totals")
+    )
+
     stmt = (
-        select(Order)
-        .where(Order.id == order.id)
-        .options(selectinload(Order.items).selectinload(OrderItem.game))
+        select(
+            Order.id,
+            Order.order_number,
+            Order.status,
+            Order.total_amount,
+            Order.created_at,
+            item_totals.c.total_items,
+            item_totals.c.total_quantity,
+        )
+        .join(item_totals, true())
+        .where(*filters)
+        .order_by(Order.created_at.desc(), Order.id.desc())
+        .limit(limit + 1)
     )
+
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Order.created_at, Order.id) < tuple_(cursor_created_at, cursor_id),
+            # Redundante con la comparación de tuplas, pero permite
+            # partition pruning (el planner no poda con row comparisons)
+            Order.created_at <= cursor_created_at,
+        )
+
+    if created_from:
+        stmt = stmt.where(Order.created_at >= _as_utc(created_from))
+
+    if created_to:
+        stmt = stmt.where(Order.created_at < _as_utc(created_to))
+
     result = await db.execute(stmt)
-    order = result.scalar_one()
+    rows = [dict(row) for row in result.mappings().all()]
 
-    return order
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+
+    return rows, next_cursor
 
 
 async def get_user_orders(
-    db: AsyncSession, user_id: uuid.UUID, skip: int = 0, limit: int = 20
-) -> Tuple[List[Order], int]:
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Tuple[List[dict], Optional[str]]:
     """
-    Obtiene las órdenes de un usuario.
+    Obtiene las órdenes de un usuario (más recientes primero).
 
     Args:
         db: Sesión de base de datos
         user_id: ID del usuario
-        skip: Registros a saltar
         limit: Registros por página
+        cursor: Cursor de la página anterior (next_cursor)
+        created_from: Solo órdenes creadas desde esta fecha (inclusive)
+        created_to: Solo órdenes creadas antes de esta fecha (exclusive)
 
     Returns:
-        Tuple de (lista de órdenes, total)
+        Tuple de (lista de órdenes, cursor de la siguiente página o None)
+
+    Raises:
+        ValueError: Si el cursor no es válido
     """
-    stmt = (
-        select(Order).where(Order.user_id == user_id).order_by(desc(Order.created_at))
+    return await _list_orders(
+        db, [Order.user_id == user_id], limit, cursor, created_from, created_to
     )
 
-    # Contar total
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar()
-
-    # Aplicar paginación
-    stmt = stmt.offset(skip).limit(limit)
-
-    result = await db.execute(stmt)
-    orders = result.scalars().all()
-
-    return list(orders), total
-
 
 async def get_all_orders(
     db: AsyncSession,
-    skip: int = 0,
     limit: int = 20,
     status: Optional[OrderStatus] = None,
-) -> Tuple[List[Order], int]:
+    cursor: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Tuple[List[dict], Optional[str]]:
     """
-    Obtiene todas las órdenes (admin).
+    Obtiene todas las órdenes (admin), más recientes primero.
 
     Args:
         db: Sesión de base de datos
-        skip: Registros a saltar
         limit: Registros por página
         status: Filtrar por estado (opcional)
+        cursor: Cursor de la página anterior (next_cursor)
+        created_from: Solo órdenes creadas desde esta fecha (inclusive)
+        created_to: Solo órdenes creadas antes de esta fecha (exclusive)
 
     Returns:
-        Tuple de (lista de órdenes, total)
-    """
-    stmt = select(Order).order_by(desc(Order.created_at))
+        Tuple de (lista de órdenes, cursor de la siguiente página o None)
 
-    # Filtro por estado
-    if status:
-        stmt = stmt.where(Order.status == status)
-
-    # Contar total
-    count_stmt = select(func.count()).select_from(stmt.subquery())
-    total_result = await db.execute(count_stmt)
-    total = total_result.scalar()
-
-    # Aplicar paginación
-    stmt = stmt.offset(skip).limit(limit)
-
-    result = await db.execute(stmt)
-    orders = result.scalars().all()
-
-    return list(orders), total
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    filters = [Order.status == status] if status else []
+    return await _list_orders(db, filters, limit, cursor, created_from, created_to)
+
+
+def _order_response(order: Order) -> OrderResponse:
+    """Respuesta completa de una orden a partir de su fila (snapshot de items)"""
+    return OrderResponse(
+        id=order.id,
+        user_id=order.user_id,
+        order_number=order.order_number,
+        status=order.status,
+        total_amount=order.total_amount,
+        shipping_address=order.shipping_address,
+        items=order.items_snapshot,
+        created_at=order.created_at,
+        updated_at=order.updated_at,
+    )
 
 
 async def get_order_by_id(
     db: AsyncSession, order_id: uuid.UUID, user_id: Optional[uuid.UUID] = None
-) -> Optional[Order]:
+) -> Optional[OrderResponse]:
     """
     Obtiene una orden por ID.
 
+    Una sola lectura por primary key: los items salen del snapshot
+    guardado en la orden al comprar (items_snapshot), no de order_items
+    ni de games, así que renombrar o desactivar un juego no cambia
+    órdenes históricas.
+
     Args:
         db: Sesión de base de datos
         order_id: ID de la orden
@@ -203,26 +511,29 @@ async def get_order_by_id(
     Returns:
         Orden o None
     """
-    stmt = (
-        select(Order)
-        .where(Order.id == order_id)
-        .options(selectinload(Order.items).selectinload(OrderItem.game))
-    )
+    stmt = select(Order).where(Order.id == order_id, *_created_at_bounds([order_id]))
 
     # Si no es admin, verificar ownership
     if user_id:
         stmt = stmt.where(Order.user_id == user_id)
 
     result = await db.execute(stmt)
-    return result.scalar_one_or_none()
+    order = result.scalar_one_or_none()
+    return _order_response(order) if order else None
 
 
 async def update_order_status(
     db: AsyncSession, order_id: uuid.UUID, status_data: OrderStatusUpdate
-) -> Optional[Order]:
+) -> Optional[OrderResponse]:
     """
     Actualiza el estado de una orden (admin).
 
+    Solo se aceptan las transiciones de ALLOWED_TRANSITIONS (una orden
+    cancelada o completada no cambia más). Cancelar una orden la resta de
+    los rollups de ventas en la misma transacción, junto con el evento
+    order.status_changed del outbox. La orden se bloquea (FOR UPDATE) para
+    que dos cambios simultáneos no ajusten dos veces.
+
     Args:
         db: Sesión de base de datos
         order_id: ID de la orden
@@ -230,25 +541,271 @@ async def update_order_status(
 
     Returns:
         Orden actualizada o None
+
+    Raises:
+        ValueError: Si la transición no está permitida
     """
-    stmt = select(Order).where(Order.id == order_id)
+    stmt = (
+        select(Order)
+        .where(Order.id == order_id, *_created_at_bounds([order_id]))
+        .with_for_update()
+    )
     result = await db.execute(stmt)
     order = result.scalar_one_or_none()
 
     if not order:
         return None
 
+    if status_data.status not in ALLOWED_TRANSITIONS[order.status]:
+        raise ValueError(
+            f"Cannot change order status from '{order.status.value}' "
+            f"to '{status_data.status.value}'"
+        )
+
+    if status_data.status == OrderStatus.CANCELLED:
+        await subtract_orders_sales(db, [order_id])
+
+    await add_events(
+        db,
+        [
+            _status_changed_event(
+                order_id,
+                order.status,
+                status_data.status,
+                datetime.now(timezone.utc),
+            )
+        ],
+    )
+
     order.status = status_data.status
+    order.updated_at = datetime.now(timezone.utc)
     await db.commit()
-    await db.refresh(order)
 
-    # Cargar items con datos de juegos para el response
-    stmt = (
-        select(Order)
-        .where(Order.id == order_id)
-        .options(selectinload(Order.items).selectinload(OrderItem.game))
+    # La fila ya está en memoria (expire_on_commit=False) y trae el
+    # snapshot de items: no hace falta recargar la orden
+    return _order_response(order)
+
+
+async def update_orders_status_batch(
+    db: AsyncSession,
+    new_status: OrderStatus,
+    order_ids: Optional[List[uuid.UUID]] = None,
+    status_filter: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    limit: int = 1000,
+) -> List[dict]:
+    """
+    Cambia el estado de varias órdenes en una sola sentencia (admin).
+
+    Las órdenes se eligen por ID o por filtro (estado actual + rango de
+    creación, hasta limit). Una sola sentencia con CTEs:
+    - target: bloquea las órdenes elegidas (FOR UPDATE, en orden de ID)
+      y conserva su estado previo y su created_at
+    - updated: UPDATE ... WHERE status IN (estados de origen permitidos)
+      RETURNING id; une por la PK completa (id, created_at) para que cada
+      fila se busque solo en su partición. La validación de la transición
+      ocurre en SQL
+    - el SELECT final une ambos para dar el resultado de cada orden
+
+    Si el destino es cancelled, las órdenes actualizadas se restan de los
+    rollups de ventas en la misma transacción. Cada orden actualizada
+    registra un evento order.status_changed en el outbox.
+
+    Returns:
+        Lista de dicts {id, result, previous_status}; result es "updated",
+        "invalid_transition" o "not_found" (solo al elegir por ID)
+    """
+    allowed_from = [
+        source
+        for source, targets in ALLOWED_TRANSITIONS.items()
+        if new_status in targets
+    ]
+
+    target = (
+        select(Order.id, Order.created_at, Order.status)
+        .order_by(Order.id)
+        .with_for_update()
     )
+    if order_ids is not None:
+        target = target.where(
+            Order.id == any_(literal(order_ids, ARRAY(UUID(as_uuid=True)))),
+            *_created_at_bounds(order_ids),
+        )
+    else:
+        target = target.where(Order.status == status_filter).limit(limit)
+        if created_from:
+            target = target.where(Order.created_at >= _as_utc(created_from))
+        if created_to:
+            target = target.where(Order.created_at < _as_utc(created_to))
+    target = target.cte("target")
+
+    updated = (
+        update(Order)
+        .where(
+            Order.id == target.c.id,
+            Order.created_at == target.c.created_at,
+            target.c.status.in_(allowed_from),
+        )
+        .values(status=new_status, updated_at=datetime.now(timezone.utc))
+        .returning(Order.id)
+        .cte("updated")
+    )
+
+    stmt = select(
+        target.c.id,
+        target.c.status,
+        updated.c.id.is_not(None).label("updated"),
+    ).select_from(target.outerjoin(updated, updated.c.id == target.c.id))
     result = await db.execute(stmt)
-    order = result.scalar_one()
 
-    return order
+    found = {
+        row.id: {
+            "id": row.id,
+            "result": "updated" if row.updated else "invalid_transition",
+            "previous_status": row.status,
+        }
+        for row in result.all()
+    }
+    updated_ids = [
+        order_id for order_id, item in found.items() if item["result"] == "updated"
+    ]
+
+    if new_status == OrderStatus.CANCELLED:
+        await subtract_orders_sales(db, updated_ids)
+
+    changed_at = datetime.now(timezone.utc)
+    await add_events(
+        db,
+        [
+            _status_changed_event(
+                order_id, found[order_id]["previous_status"], new_status, changed_at
+            )
+            for order_id in updated_ids
+        ],
+    )
+
+    await db.commit()
+
+    if order_ids is None:
+        return list(found.values())
+
+    return [
+        found.get(order_id, {"id": order_id, "result": "not_found"})
+        for order_id in dict.fromkeys(order_ids)
+    ]
+
+
+# Filas por lote al exportar (lo que el cursor del servidor entrega por fetch)
+EXPORT_BATCH_SIZE = 2000
+
+
+async def stream_orders_export(
+    created_from: datetime,
+    created_to: datetime,
+    status: Optional[OrderStatus] = None,
+    flatten_items: bool = True,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[list]:
+    """
+    Recorre las órdenes de un rango en lotes, con memoria constante.
+
+    Usa su propia sesión (la respuesta sigue enviándose después de que la
+    sesión de la petición se cierra) y una transacción REPEATABLE READ
+    READ ONLY: todo el export ve un mismo snapshot aunque lleguen órdenes
+    nuevas mientras se descarga. Las filas salen de un cursor del servidor
+    (AsyncSession.stream + yield_per) en orden (created_at, id). Si hay
+    réplicas de lectura, el export corre en una de ellas.
+
+    Args:
+        created_from: Desde (inclusive)
+        created_to: Hasta (exclusive)
+        status: Filtrar por estado (opcional)
+        flatten_items: True = una fila por item (items del snapshot de la
+            orden); False = una fila por orden con items_snapshot
+        batch_size: Filas por lote
+
+    Yields:
+        Listas de filas (RowMapping)
+    """
+    columns = [
+        Order.id.label("order_id"),
+        Order.order_number,
+        Order.created_at,
+        Order.status,
+        Order.user_id,
+        Order.total_amount,
+    ]
+
+    if flatten_items:
+        item = (
+            func.jsonb_array_elements(Order.items_snapshot)
+            .table_valued(column("value", JSONB))
+            .render_derived(name="item")
+        )
+        value = item.c.value
+        stmt = select(
+            *columns,
+            value["id"].astext.label("item_id"),
+            value["game_id"].astext.label("game_id"),
+            value["game"]["slug"].astext.label("game_slug"),
+            value["game"]["name"].astext.label("game_name"),
+            value["quantity"].astext.label("quantity"),
+            value["price_at_purchase"].astext.label("price_at_purchase"),
+        ).outerjoin(item, true())
+    else:
+        stmt = select(*columns, Order.items_snapshot)
+
+    stmt = (
+        stmt.where(
+            Order.created_at >= _as_utc(created_from),
+            Order.created_at < _as_utc(created_to),
+        )
+        .order_by(Order.created_at, Order.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if status:
+        stmt = stmt.where(Order.status == status)
+
+    async with AsyncSessionLocal(bind=select_read_engine()) as db:
+        await db.connection(
+            execution_options={
+                "isolation_level": "REPEATABLE READ",
+                "postgresql_readonly": True,
+            }
+        )
+
+        result = await db.stream(stmt)
+        async for partition in result.mappings().partitions():
+            yield partition
+
+
+async def delete_user_orders(db: AsyncSession, user_ids: List[uuid.UUID]) -> int:
+    """
+    Borra las órdenes de estos usuarios junto con lo que dejaron fuera de
+    orders/order_items: resta de los rollups las que no estaban canceladas
+    (las canceladas ya se restaron) y borra sus eventos del outbox.
+
+    Pensada para limpiar los datos de los scripts de prueba y benchmark;
+    los compradores quedan en el HLL (no admite borrados). No hace commit.
+
+    Returns:
+        Órdenes borradas
+    """
+    result = await db.execute(
+        select(Order.id, Order.status).where(Order.user_id.in_(user_ids))
+    )
+    orders = result.all()
+    if not orders:
+        return 0
+
+    order_ids = [order_id for order_id, _ in orders]
+    await subtract_orders_sales(
+        db,
+        [order_id for order_id, status in orders if status != OrderStatus.CANCELLED],
+    )
+    await db.execute(delete(OutboxEvent).where(OutboxEvent.aggregate_id.in_(order_ids)))
+    await db.execute(
+        delete(Order).where(Order.id.in_(order_ids), *_created_at_bounds(order_ids))
+    )
+    return len(order_ids)
@@ -0,0 +1,131 @@
+from sqlalchemy import select, insert, update, delete, values, column, func
+from sqlalchemy import DateTime, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Tuple
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.events import Event
+from app.core.ids import uuid7
+from app.models.outbox_event import OutboxEvent
+
+
+async def add_events(db: AsyncSession, events: List[dict]) -> None:
+    """
+    Agrega eventos al outbox en un solo INSERT multi-fila. No hace commit:
+    los eventos se confirman (o descartan) junto con el cambio que los
+    origina.
+
+    Args:
+        db: Sesión de base de datos
+        events: Dicts con event_type, aggregate_id y payload (JSON)
+    """
+    if not events:
+        return
+
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        insert(OutboxEvent),
+        [
+            {"id": uuid7(), "available_at": now, "created_at": now, **event}
+            for event in events
+        ],
+    )
+
+
+async def claim_events(db: AsyncSession, batch_size: int) -> List[Event]:
+    """
+    Toma un lote de eventos disponibles para entregarlos.
+
+    Un solo UPDATE sobre un SELECT ... FOR UPDATE SKIP LOCKED: varios
+    relays pueden correr en paralelo sin tomar los mismos eventos. Los
+    eventos tomados quedan con un lease (available_at en el futuro) y se
+    hace commit, así la entrega no mantiene una transacción abierta; si el
+    relay muere, el evento vuelve a estar disponible al vencer el lease.
+
+    Returns:
+        Eventos tomados, en orden de creación
+    """
+    now = datetime.now(timezone.utc)
+    pending = (
+        select(OutboxEvent.id)
+        .where(OutboxEvent.failed_at.is_(None), OutboxEvent.available_at <= now)
+        .order_by(OutboxEvent.available_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(OutboxEvent)
+        .where(OutboxEvent.id.in_(pending))
+        .values(
+            available_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+            attempts=OutboxEvent.attempts + 1,
+        )
+        .returning(
+            OutboxEvent.id,
+            OutboxEvent.event_type,
+            OutboxEvent.aggregate_id,
+            OutboxEvent.payload,
+            OutboxEvent.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(stmt)
+    events = sorted((Event(*row) for row in result.all()), key=lambda e: e.id)
+    await db.commit()
+    return events
+
+
+async def complete_events(db: AsyncSession, event_ids: List[uuid.UUID]) -> None:
+    """Elimina los eventos entregados con éxito"""
+    if not event_ids:
+        return
+
+    await db.execute(
+        delete(OutboxEvent)
+        .where(OutboxEvent.id.in_(event_ids))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+async def fail_events(db: AsyncSession, failures: List[Tuple[Event, str]]) -> None:
+    """
+    Reprograma eventos fallidos con backoff exponencial (2^intentos
+    segundos, hasta OUTBOX_MAX_BACKOFF_SECONDS). Al agotar
+    OUTBOX_MAX_ATTEMPTS quedan como dead letter (failed_at). Todo el lote
+    en un UPDATE, como los demás updates por lotes.
+    """
+    if not failures:
+        return
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for event, error in failures:
+        available_at, failed_at = None, now
+        if event.attempts < settings.OUTBOX_MAX_ATTEMPTS:
+            backoff = min(2**event.attempts, settings.OUTBOX_MAX_BACKOFF_SECONDS)
+            available_at, failed_at = now + timedelta(seconds=backoff), None
+        rows.append((event.id, available_at, failed_at, error[:2000]))
+
+    # Un solo UPDATE ... FROM (VALUES ...) para todo el lote
+    failed = values(
+        column("id", UUID(as_uuid=True)),
+        column("available_at", DateTime(timezone=True)),
+        column("failed_at", DateTime(timezone=True)),
+        column("error", Text),
+        name="failed",
+    ).data(rows)
+    await db.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id == failed.c.id)
+        .values(
+            available_at=func.coalesce(failed.c.available_at, OutboxEvent.available_at),
+            failed_at=failed.c.failed_at,
+            last_error=failed.c.error,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
@@ -0,0 +1,111 @@
+from sqlalchemy import select, update, values, column, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Set, Tuple
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+
+from app.core.pricing import evaluate_prices
+from app.models.game import Game
+from app.schemas.pricing import PricingRules, PriceChange
+
+# Filas por UPDATE ... FROM (VALUES ...): 3 parámetros por fila, lejos del
+# límite de 32767 parámetros por sentencia de asyncpg
+REPRICE_BATCH_SIZE = 5000
+
+
+async def reprice_catalog(
+    db: AsyncSession, rules: PricingRules, dry_run: bool, diff_limit: int
+) -> Tuple[int, int, List[PriceChange]]:
+    """
+    Recalcula el precio de todos los juegos activos.
+
+    Lee solo las columnas que usan las reglas, evalúa el catálogo completo
+    en un pase vectorizado (app.core.pricing) y, si no es dry run, guarda
+    los cambios con UPDATE ... FROM (VALUES ...) por lotes, todo en una
+    transacción. Un juego cuyo precio cambió entre la lectura y el UPDATE
+    (p. ej. editado por otro admin) no se pisa: se cuenta como saltado y
+    queda fuera del diff. Las filas cambiadas reciben updated_at nuevo.
+    Hace commit.
+
+    Returns:
+        Tuple de (evaluados, cambiados, saltados, primeros diff_limit
+        cambios por mayor diferencia absoluta). En dry run, cambiados son
+        los que cambiarían y saltados siempre es 0.
+    """
+    result = await db.execute(
+        select(
+            Game.id,
+            Game.slug,
+            Game.name,
+            Game.price,
+            Game.metacritic,
+            Game.rating,
+            Game.released,
+            Game.genres,
+        ).where(Game.is_active == True)
+    )
+    rows = result.all()
+    if not rows:
+        return 0, 0, 0, []
+
+    ids, slugs, names, prices, metacritic, rating, released, genres = zip(*rows)
+
+    new_cents = evaluate_prices(
+        rules,
+        metacritic,
+        rating,
+        released,
+        genres,
+        datetime.now(timezone.utc).date(),
+    )
+    old_cents = np.array([int(price * 100) for price in prices], dtype=np.int64)
+    changed = np.flatnonzero(new_cents != old_cents)
+
+    skipped = 0
+    if not dry_run and changed.size:
+        written: Set = set()
+        now = datetime.now(timezone.utc)
+        for start in range(0, changed.size, REPRICE_BATCH_SIZE):
+            batch = changed[start : start + REPRICE_BATCH_SIZE]
+            new_prices = values(
+                column("id", UUID(as_uuid=True)),
+                column("old", Numeric(10, 2)),
+                column("p", Numeric(10, 2)),
+                name="v",
+            ).data(
+                [(ids[i], prices[i], Decimal(int(new_cents[i])) / 100) for i in batch]
+            )
+
+            result = await db.execute(
+                update(Game)
+                .where(Game.id == new_prices.c.id, Game.price == new_prices.c.old)
+                .values(price=new_prices.c.p, updated_at=now)
+                .returning(Game.id)
+                .execution_options(synchronize_session=False)
+            )
+            written.update(result.scalars())
+        await db.commit()
+
+        skipped = int(changed.size) - len(written)
+        if skipped:
+            changed = np.array(
+                [i for i in changed if ids[i] in written], dtype=changed.dtype
+            )
+
+    # Diff: los cambios más grandes primero
+    deltas = np.abs(new_cents[changed] - old_cents[changed])
+    top = changed[np.argsort(-deltas, kind="stable")]
+    changes = [
+        PriceChange(
+            game_id=ids[i],
+            slug=slugs[i],
+            name=names[i],
+            old_price=prices[i],
+            new_price=Decimal(int(new_cents[i])) / 100,
+        )
+        for i in top[:diff_limit]
+    ]
+    return len(ids), int(changed.size), skipped, changes
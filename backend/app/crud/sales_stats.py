@@ -0,0 +1,377 @@
+from sqlalchemy import select, delete, update, func, text, cast, true, literal_column
+from sqlalchemy import and_, any_, literal, SmallInteger
+from sqlalchemy.dialects.postgresql import insert, array, ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from app.core.hll import (
+    HLL_REGISTERS,
+    empty_registers,
+    hll_add,
+    hll_estimate,
+    hll_merge,
+    hll_position,
+)
+from app.models.game import Game
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.sales_rollup import SalesDaily, SalesDailyGame, SalesDailyGenre
+
+
+class SaleLine(NamedTuple):
+    """Línea de una orden, con lo necesario para los rollups"""
+
+    game_id: uuid.UUID
+    genres: Optional[List[str]]
+    quantity: int
+    price: Decimal
+
+
+# Día (UTC) al que pertenece una orden, en SQL. 'UTC' va como literal para
+# que SELECT y GROUP BY rendericen la misma expresión (sin parámetros)
+_order_day = func.date(func.timezone(literal_column("'UTC'"), Order.created_at))
+
+
+def sales_day(created_at: datetime) -> date:
+    """Día (UTC) al que pertenece una orden"""
+    return created_at.astimezone(timezone.utc).date()
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time(), timezone.utc)
+
+
+def _counters(lines: Iterable[SaleLine]) -> Tuple[dict, dict, dict]:
+    """Agrega las líneas de una orden en contadores por día, juego y género"""
+    total = {"revenue": Decimal("0"), "units": 0, "orders": 1}
+    by_game: Dict[uuid.UUID, dict] = {}
+    by_genre: Dict[str, dict] = {}
+
+    for line in lines:
+        revenue = line.price * line.quantity
+        units = line.quantity
+        total["revenue"] += revenue
+        total["units"] += units
+
+        targets = [(by_game, line.game_id)]
+        targets += [(by_genre, genre) for genre in set(line.genres or [])]
+        for bucket, key in targets:
+            counters = bucket.setdefault(
+                key, {"revenue": Decimal("0"), "units": 0, "orders": 1}
+            )
+            counters["revenue"] += revenue
+            counters["units"] += units
+
+    return total, by_game, by_genre
+
+
+def _increment(model, stmt) -> dict:
+    return {
+        "revenue": model.revenue + stmt.excluded.revenue,
+        "units": model.units + stmt.excluded.units,
+        "orders": model.orders + stmt.excluded.orders,
+    }
+
+
+async def apply_order_sales(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    created_at: datetime,
+    lines: List[SaleLine],
+) -> None:
+    """
+    Suma una orden nueva a los rollups de su día (para restar órdenes
+    canceladas, subtract_orders_sales).
+
+    Tres upserts con ON CONFLICT DO UPDATE, sin importar cuántas líneas
+    tenga la orden: el incremento ocurre en la base de datos, así que
+    checkouts concurrentes del mismo día no pierden actualizaciones.
+    El comprador se agrega al HyperLogLog del día. No hace commit.
+    """
+    day = sales_day(created_at)
+    total, by_game, by_genre = _counters(lines)
+
+    # Registros vacíos + el comprador, construidos en SQL para no enviar
+    # el arreglo completo en cada checkout
+    empty = func.array_fill(cast(0, SmallInteger), array([HLL_REGISTERS]))
+    index, rank = hll_position(user_id)
+
+    stmt = insert(SalesDaily).values(
+        day=day, buyers_hll=func.hll_add(empty, index + 1, rank), **total
+    )
+    set_ = _increment(SalesDaily, stmt)
+    set_["buyers_hll"] = func.hll_add(SalesDaily.buyers_hll, index + 1, rank)
+    await db.execute(
+        stmt.on_conflict_do_update(index_elements=[SalesDaily.day], set_=set_)
+    )
+
+    for model, key_column, bucket in (
+        (SalesDailyGame, "game_id", by_game),
+        (SalesDailyGenre, "genre", by_genre),
+    ):
+        if not bucket:
+            continue
+        stmt = insert(model).values(
+            [
+                {"day": day, key_column: key, **counters}
+                for key, counters in bucket.items()
+            ]
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[model.day, getattr(model, key_column)],
+                set_=_increment(model, stmt),
+            )
+        )
+
+
+# Géneros con los que cuenta una línea en los rollups: los guardados al
+# comprar; órdenes anteriores a order_items.genres usan los del juego
+_line_genres = func.coalesce(OrderItem.genres, Game.genres)
+
+
+def _period_start(day: date, group_by: str) -> date:
+    if group_by == "week":
+        return day - timedelta(days=day.weekday())
+    if group_by == "month":
+        return day.replace(day=1)
+    return day
+
+
+async def get_sales_stats(
+    db: AsyncSession,
+    date_from: date,
+    date_to: date,
+    group_by: str = "day",
+    limit: int = 50,
+) -> dict:
+    """
+    Reporte de ventas leído solo de los rollups.
+
+    Args:
+        db: Sesión de base de datos
+        date_from: Primer día (inclusive, UTC)
+        date_to: Último día (inclusive, UTC)
+        group_by: day, week, month, game o genre
+        limit: Máximo de filas para game/genre (ordenadas por revenue)
+
+    Returns:
+        Dict con totals (incluye compradores distintos aproximados) y rows
+    """
+    stmt = (
+        select(SalesDaily)
+        .where(SalesDaily.day >= date_from, SalesDaily.day <= date_to)
+        .order_by(SalesDaily.day)
+    )
+    result = await db.execute(stmt)
+    days = result.scalars().all()
+
+    totals = {
+        "revenue": sum((d.revenue for d in days), Decimal("0")),
+        "units": sum(d.units for d in days),
+        "orders": sum(d.orders for d in days),
+        "buyers": hll_estimate(hll_merge(d.buyers_hll for d in days)),
+    }
+
+    if group_by in ("game", "genre"):
+        rows = await _get_sales_by_key(db, date_from, date_to, group_by, limit)
+        return {"totals": totals, "rows": rows}
+
+    # Agrupar días en periodos; los compradores se combinan por periodo
+    periods: Dict[date, list] = {}
+    for d in days:
+        periods.setdefault(_period_start(d.day, group_by), []).append(d)
+
+    rows = [
+        {
+            "key": start.isoformat(),
+            "label": None,
+            "revenue": sum((d.revenue for d in period), Decimal("0")),
+            "units": sum(d.units for d in period),
+            "orders": sum(d.orders for d in period),
+            "buyers": hll_estimate(hll_merge(d.buyers_hll for d in period)),
+        }
+        for start, period in periods.items()
+    ]
+    return {"totals": totals, "rows": rows}
+
+
+async def _get_sales_by_key(
+    db: AsyncSession, date_from: date, date_to: date, group_by: str, limit: int
+) -> List[dict]:
+    if group_by == "game":
+        model, key, label = SalesDailyGame, SalesDailyGame.game_id, Game.name
+    else:
+        model, key, label = SalesDailyGenre, SalesDailyGenre.genre, None
+
+    revenue = func.sum(model.revenue).label("revenue")
+    stmt = (
+        select(
+            key.label("key"),
+            (label if label is not None else key).label("label"),
+            revenue,
+            func.sum(model.units).label("units"),
+            func.sum(model.orders).label("orders"),
+        )
+        .where(model.day >= date_from, model.day <= date_to)
+        .group_by(key, *([label] if label is not None else []))
+        .order_by(revenue.desc())
+        .limit(limit)
+    )
+    if group_by == "game":
+        stmt = stmt.join(Game, Game.id == SalesDailyGame.game_id)
+
+    result = await db.execute(stmt)
+    return [
+        {**row, "key": str(row["key"]), "buyers": None}
+        for row in result.mappings().all()
+    ]
+
+
+def _totals_by(where: list, sign: int, *keys):
+    """
+    SELECT de (day, *keys, revenue, units, orders) agregado desde
+    orders/order_items, multiplicado por sign (1 o -1).
+    """
+    day = _order_day.label("day")
+    stmt = (
+        select(
+            day,
+            *keys,
+            (func.sum(OrderItem.price_at_purchase * OrderItem.quantity) * sign).label(
+                "revenue"
+            ),
+            (func.sum(OrderItem.quantity) * sign).label("units"),
+            (func.count(func.distinct(Order.id)) * sign).label("orders"),
+        )
+        .select_from(Order)
+        .join(
+            OrderItem,
+            and_(
+                OrderItem.order_id == Order.id,
+                OrderItem.created_at == Order.created_at,
+            ),
+        )
+        .where(*where)
+        .group_by(_order_day, *keys)
+    )
+    return stmt
+
+
+def _genre_totals_by(where: list, sign: int):
+    genre = func.unnest(_line_genres).table_valued("genre").render_derived()
+    return (
+        _totals_by(where, sign, genre.c.genre)
+        .join(Game, Game.id == OrderItem.game_id)
+        .join(genre, true())
+    )
+
+
+async def subtract_orders_sales(db: AsyncSession, order_ids: List[uuid.UUID]) -> None:
+    """
+    Resta órdenes canceladas de los rollups.
+
+    Un UPDATE ... FROM (SELECT agregado) por tabla: la agregación por día,
+    juego y género ocurre en Postgres sin importar cuántas órdenes sean.
+    Solo se restan filas que existen: si el rollup de ese día/juego/género
+    no está (p. ej. se reconstruyó sin la orden) no se crea uno negativo.
+    Los géneros son los de la compra (order_items.genres). Los compradores
+    quedan en el HLL (no admite borrados). No hace commit.
+    """
+    if not order_ids:
+        return
+
+    where = [Order.id == any_(literal(order_ids, ARRAY(UUID(as_uuid=True))))]
+
+    for model, keys, select_stmt in (
+        (SalesDaily, (), _totals_by(where, -1)),
+        (SalesDailyGame, ("game_id",), _totals_by(where, -1, OrderItem.game_id)),
+        (SalesDailyGenre, ("genre",), _genre_totals_by(where, -1)),
+    ):
+        totals = select_stmt.subquery("totals")
+        await db.execute(
+            update(model)
+            .where(
+                model.day == totals.c.day,
+                *(getattr(model, key) == totals.c[key] for key in keys),
+            )
+            .values(
+                revenue=model.revenue + totals.c.revenue,
+                units=model.units + totals.c.units,
+                orders=model.orders + totals.c.orders,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def rebuild_rollups(db: AsyncSession, day_from: date, day_to: date) -> int:
+    """
+    Recalcula los rollups de [day_from, day_to) desde orders/order_items.
+
+    Bloquea las tablas de rollups (SHARE ROW EXCLUSIVE) durante el tramo:
+    los checkouts en curso terminan antes de recalcular y los nuevos
+    esperan al commit, así ninguna orden se cuenta dos veces ni se pierde.
+    Por eso conviene llamarla en tramos cortos. Hace commit.
+
+    Returns:
+        Días con ventas recalculados
+    """
+    await db.execute(
+        text(
+            "LOCK TABLE sales_daily, sales_daily_games, sales_daily_genres "
+            "IN SHARE ROW EXCLUSIVE MODE"
+        )
+    )
+
+    for model in (SalesDaily, SalesDailyGame, SalesDailyGenre):
+        await db.execute(delete(model).where(model.day >= day_from, model.day < day_to))
+
+    in_range = [
+        Order.status != OrderStatus.CANCELLED,
+        Order.created_at >= _day_start(day_from),
+        Order.created_at < _day_start(day_to),
+    ]
+
+    # Totales por día + HLL de compradores (calculado en Python)
+    result = await db.execute(_totals_by(in_range, 1))
+    daily = {day: (revenue, units, orders) for day, revenue, units, orders in result}
+
+    registers: Dict[date, List[int]] = {}
+    stmt = select(_order_day, Order.user_id).where(*in_range).distinct()
+    result = await db.execute(stmt)
+    for day, user_id in result:
+        hll_add(registers.setdefault(day, empty_registers()), user_id)
+
+    if daily:
+        await db.execute(
+            insert(SalesDaily),
+            [
+                {
+                    "day": day,
+                    "revenue": revenue,
+                    "units": units,
+                    "orders": orders,
+                    "buyers_hll": registers.get(day, empty_registers()),
+                }
+                for day, (revenue, units, orders) in daily.items()
+            ],
+        )
+
+    # Por juego y por género: INSERT ... SELECT sin pasar por Python
+    await db.execute(
+        insert(SalesDailyGame).from_select(
+            ["day", "game_id", "revenue", "units", "orders"],
+            _totals_by(in_range, 1, OrderItem.game_id),
+        )
+    )
+    await db.execute(
+        insert(SalesDailyGenre).from_select(
+            ["day", "genre", "revenue", "units", "orders"],
+            _genre_totals_by(in_range, 1),
+        )
+    )
+
+    await db.commit()
+    return len(daily)
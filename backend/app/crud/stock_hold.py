@@ -0,0 +1,184 @@
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.ids import uuid7
+from app.models.game import Game
+from app.models.stock_hold import StockHold
+from app.crud.game import release_reserved
+
+
+async def hold_stock(
+    db: AsyncSession, cart_id: uuid.UUID, game_id: uuid.UUID, quantity: int
+) -> None:
+    """
+    Crea, ajusta o extiende el hold de un juego para un carrito.
+
+    Cada llamada cuesta un número fijo de sentencias (O(1) por línea):
+    1. Upsert del hold que bloquea su fila y devuelve lo ya apartado
+       (solo compite con peticiones del mismo carrito)
+    2. Ajustar games.reserved por la diferencia, con verificación atómica
+       de disponibilidad (stock - reserved >= delta) en el mismo UPDATE
+    3. Guardar la nueva cantidad y expiración del hold
+
+    Si la cantidad no cambia, solo se extiende la expiración y la fila
+    del juego (la más disputada) no se toca. No hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        cart_id: ID del carrito
+        game_id: ID del juego
+        quantity: Cantidad total que debe quedar apartada
+
+    Raises:
+        ValueError: Si no hay stock disponible para apartar
+    """
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(minutes=settings.STOCK_HOLD_TTL_MINUTES)
+
+    # Un hold nuevo nace con cantidad 0; si ya existe, el DO UPDATE lo
+    # bloquea y devuelve su cantidad actual (peticiones concurrentes del
+    # mismo carrito esperan aquí en vez de apartar dos veces)
+    stmt = (
+        insert(StockHold)
+        .values(
+            id=uuid7(),
+            cart_id=cart_id,
+            game_id=game_id,
+            quantity=0,
+            expires_at=expires_at,
+            created_at=now,
+        )
+        .on_conflict_do_update(
+            constraint="uq_stock_holds_cart_game",
+            set_={"quantity": StockHold.quantity},
+        )
+        .returning(StockHold.quantity)
+    )
+    result = await db.execute(stmt)
+    held = result.scalar_one()
+    delta = quantity - held
+
+    if delta > 0:
+        stmt = (
+            update(Game)
+            .where(Game.id == game_id, Game.stock - Game.reserved >= delta)
+            .values(reserved=Game.reserved + delta)
+            .returning(Game.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+
+        if result.scalar_one_or_none() is None:
+            stmt = select(Game.stock - Game.reserved).where(Game.id == game_id)
+            result = await db.execute(stmt)
+            available = max((result.scalar_one_or_none() or 0) + held, 0)
+            raise ValueError(
+                f"Insufficient stock. Available: {available}, requested: {quantity}"
+            )
+    elif delta < 0:
+        stmt = (
+            update(Game)
+            .where(Game.id == game_id)
+            .values(reserved=Game.reserved + delta)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(stmt)
+
+    stmt = (
+        update(StockHold)
+        .where(StockHold.cart_id == cart_id, StockHold.game_id == game_id)
+        .values(quantity=quantity, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(stmt)
+
+
+async def release_hold(
+    db: AsyncSession, cart_id: uuid.UUID, game_id: uuid.UUID
+) -> None:
+    """
+    Libera el hold de un juego en un carrito (si existe). No hace commit.
+    """
+    stmt = (
+        delete(StockHold)
+        .where(StockHold.cart_id == cart_id, StockHold.game_id == game_id)
+        .returning(StockHold.quantity)
+    )
+    result = await db.execute(stmt)
+    held = result.scalar_one_or_none()
+
+    if held:
+        await release_reserved(db, {game_id: held})
+
+
+async def release_cart_holds(db: AsyncSession, cart_id: uuid.UUID) -> None:
+    """
+    Libera todos los holds de un carrito. No hace commit.
+    """
+    held = await consume_cart_holds(db, cart_id)
+    await release_reserved(db, held)
+
+
+async def consume_cart_holds(
+    db: AsyncSession, cart_id: uuid.UUID
+) -> Dict[uuid.UUID, int]:
+    """
+    Elimina los holds de un carrito y devuelve lo que estaba apartado.
+
+    No toca games.reserved: el llamador debe descontarlo (checkout lo hace
+    en el mismo UPDATE que reduce el stock) o liberarlo. No hace commit.
+
+    Returns:
+        Mapa {game_id: unidades apartadas}
+    """
+    stmt = (
+        delete(StockHold)
+        .where(StockHold.cart_id == cart_id)
+        .returning(StockHold.game_id, StockHold.quantity)
+    )
+    result = await db.execute(stmt)
+    return {game_id: quantity for game_id, quantity in result.all()}
+
+
+async def release_expired_holds(db: AsyncSession, batch_size: int = 500) -> int:
+    """
+    Libera un lote de holds expirados y devuelve las unidades a los juegos.
+
+    Usa FOR UPDATE SKIP LOCKED: varios reapers (uno por worker) pueden
+    correr a la vez sin pisarse, y nunca esperan a un carrito que está
+    modificando su propio hold.
+
+    Args:
+        db: Sesión de base de datos
+        batch_size: Máximo de holds a liberar en esta llamada
+
+    Returns:
+        Cantidad de holds liberados
+    """
+    expired = (
+        select(StockHold.id)
+        .where(StockHold.expires_at <= datetime.now(timezone.utc))
+        .order_by(StockHold.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        delete(StockHold)
+        .where(StockHold.id.in_(expired))
+        .returning(StockHold.game_id, StockHold.quantity)
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
+
+    released: Dict[uuid.UUID, int] = {}
+    for game_id, quantity in rows:
+        released[game_id] = released.get(game_id, 0) + quantity
+
+    await release_reserved(db, released)
+    await db.commit()
+    return len(rows)
@@ -0,0 +1,101 @@
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime, timezone
+
+from app.models.sync_state import SyncState
+
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+
+
+async def get_sync_state(db: AsyncSession, name: str) -> Optional[SyncState]:
+    """Obtiene el checkpoint de un sync"""
+    result = await db.execute(select(SyncState).where(SyncState.name == name))
+    return result.scalar_one_or_none()
+
+
+async def start_sync(
+    db: AsyncSession,
+    name: str,
+    ordering: str,
+    page_size: int,
+    since: Optional[datetime],
+    limit: Optional[int],
+) -> SyncState:
+    """
+    Registra el inicio de una ejecución nueva (desde la página 1).
+    Conserva synced_until de las ejecuciones anteriores. Hace commit.
+    """
+    values = {
+        "ordering": ordering,
+        "page_size": page_size,
+        "since": since,
+        "limit": limit,
+        "status": STATUS_RUNNING,
+        "last_page": 0,
+        "written": 0,
+        "last_updated": None,
+        "started_at": datetime.now(timezone.utc),
+        "finished_at": None,
+    }
+    stmt = (
+        insert(SyncState)
+        .values(name=name, **values)
+        .on_conflict_do_update(index_elements=[SyncState.name], set_=values)
+        .returning(SyncState)
+    )
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    state = result.scalar_one()
+    await db.commit()
+    return state
+
+
+async def checkpoint_sync(
+    db: AsyncSession,
+    name: str,
+    last_page: int,
+    last_updated: Optional[datetime],
+    written: int,
+) -> None:
+    """
+    Avanza el checkpoint y suma los juegos guardados de la página. No hace
+    commit: se confirma junto con los datos de la página, así el checkpoint
+    nunca queda por delante de lo guardado.
+    """
+    await db.execute(
+        update(SyncState)
+        .where(SyncState.name == name)
+        .values(
+            last_page=last_page,
+            written=SyncState.written + written,
+            # GREATEST ignora NULL
+            last_updated=func.greatest(SyncState.last_updated, last_updated),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def finish_sync(db: AsyncSession, name: str, advance_watermark: bool) -> None:
+    """
+    Marca la ejecución como completada. Hace commit.
+
+    Args:
+        advance_watermark: Si la ejecución recorrió todo lo pedido (sin
+            límite ni páginas fallidas), el próximo sync incremental parte
+            del mayor 'updated' visto
+    """
+    values = {"status": STATUS_COMPLETED, "finished_at": datetime.now(timezone.utc)}
+    if advance_watermark:
+        values["synced_until"] = func.greatest(
+            SyncState.synced_until, SyncState.last_updated
+        )
+
+    await db.execute(
+        update(SyncState)
+        .where(SyncState.name == name)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
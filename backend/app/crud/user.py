@@ -1,4 +1,5 @@
-from sqlalchemy import select
+from sqlalchemy import select, lambda_stmt
+from sqlalchemy.sql import StatementLambdaElement
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import uuid
@@ -8,20 +9,31 @@ from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash, verify_password
 
 
+# Queries calientes como lambda_stmt: el select() se arma y se compila una
+# sola vez por proceso; en cada llamada solo cambian los parámetros
+# (ver app.scripts.bench_statements)
+
+
+def user_by_email_stmt(email: str) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.email == email))
+
+
+def user_by_id_stmt(user_id: uuid.UUID) -> StatementLambdaElement:
+    return lambda_stmt(lambda: select(User).where(User.id == user_id))
+
+
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """
     Busca un usuario por email.
     Retorna None si no existe.
     """
-    stmt = select(User).where(User.email == email)
-    result = await db.execute(stmt)
+    result = await db.execute(user_by_email_stmt(email))
     return result.scalar_one_or_none()
 
 
 async def get_user_by_id(db: AsyncSession, user_id: uuid.UUID) -> Optional[User]:
     """Busca un usuario por ID"""
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
+    result = await db.execute(user_by_id_stmt(user_id))
     return result.scalar_one_or_none()
 
 
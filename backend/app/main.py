@@ -1,8 +1,36 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.prometheus import mark_process_dead, render_metrics
 
 from app.api.v1.endpoints.router import api_router
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
+from app.middleware.server_timing import ServerTimingMiddleware
+from app.middleware.prometheus import PrometheusMiddleware
+from app.workers.stock_hold_reaper import run_stock_hold_reaper
+from app.workers.idempotency_janitor import run_idempotency_janitor
+from app.workers.outbox_relay import run_outbox_relay
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arranca y detiene las tareas en segundo plano de la API"""
+    stop_event = asyncio.Event()
+    tasks = [
+        asyncio.create_task(run_stock_hold_reaper(stop_event)),
+        asyncio.create_task(run_idempotency_janitor(stop_event)),
+        asyncio.create_task(run_outbox_relay(stop_event)),
+    ]
+
+    yield
+
+    stop_event.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    mark_process_dead()
+
 
 # Crear instancia de FastAPI
 app = FastAPI(
@@ -12,8 +40,24 @@ app = FastAPI(
     docs_url=f"{settings.API_V1_PREFIX}/docs",
     redoc_url=f"{settings.API_V1_PREFIX}/redoc",
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    lifespan=lifespan,
 )
 
+# Idempotency-Key (se registra antes que CORS para quedar por dentro y que
+# las respuestas repetidas también lleven headers CORS)
+app.add_middleware(IdempotencyMiddleware)
+
+# Cookie read-your-writes (por fuera de Idempotency-Key: las respuestas
+# repetidas también marcan al cliente)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Queries por request (Server-Timing + log); por fuera de los anteriores
+# para contar también las queries de Idempotency-Key
+app.add_middleware(ServerTimingMiddleware)
+
+# Latencia por ruta y requests en curso para /metrics
+app.add_middleware(PrometheusMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -41,4 +85,11 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas en formato Prometheus (todos los workers en modo multiproceso)"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 app.include_router(api_router)
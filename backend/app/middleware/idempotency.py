@@ -0,0 +1,301 @@
+"""
+Middleware ASGI para el header Idempotency-Key.
+
+Los clientes (sobre todo móviles) reintentan POST /orders cuando la red
+falla. Con Idempotency-Key cada reintento con la misma clave:
+- si la primera ejecución terminó: recibe la respuesta guardada, sin
+  volver a ejecutar el endpoint (ni tocar el carrito o el stock)
+- si la primera ejecución sigue en curso: espera a que termine
+- si el body/ruta no coinciden con la primera petición: 422
+
+Las claves son por usuario (sub del JWT) y expiran tras
+IDEMPOTENCY_KEY_TTL_HOURS. Solo se guardan las respuestas 2xx y los 422
+(body inválido: repetirlo da lo mismo). El resto libera la clave y el
+cliente puede reintentar con ella: 5xx, 401/403 (token vencido o rol
+que puede cambiar), 409 y los 400 de stock (conflictos que se resuelven
+solos o editando el carrito).
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+import uuid
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.security import get_token_subject
+from app.crud import idempotency_key as crud_idempotency
+from app.crud.idempotency_key import STATUS_COMPLETED
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# Respuestas no-2xx que se guardan: las que reintentar no puede cambiar
+STORED_ERROR_STATUSES = frozenset({422})
+
+# Endpoints mutantes que aceptan Idempotency-Key
+IDEMPOTENT_ROUTES = [
+    (method, re.compile(f"^{settings.API_V1_PREFIX}{path}$"))
+    for method, path in [
+        ("POST", "/orders"),
+        ("PUT", "/orders/[^/]+/status"),
+        ("POST", "/orders/status:batch"),
+        ("POST", "/cart/items"),
+        ("POST", "/games"),
+        ("PUT", "/games/[^/]+"),
+        ("DELETE", "/games/[^/]+"),
+    ]
+]
+
+
+def _is_idempotent_route(method: str, path: str) -> bool:
+    return any(
+        method == route_method and pattern.match(path)
+        for route_method, pattern in IDEMPOTENT_ROUTES
+    )
+
+
+def _get_header(scope: Scope, name: bytes) -> Optional[str]:
+    for header_name, value in scope["headers"]:
+        if header_name == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _get_user_id(scope: Scope) -> Optional[uuid.UUID]:
+    """Usuario del Bearer token; None si falta o es inválido"""
+    authorization = _get_header(scope, b"authorization")
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+
+    subject = get_token_subject(authorization[7:])
+    try:
+        return uuid.UUID(subject) if subject else None
+    except ValueError:
+        return None
+
+
+def _is_stored(status_code: int) -> bool:
+    return 200 <= status_code < 300 or status_code in STORED_ERROR_STATUSES
+
+
+def _fingerprint(scope: Scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    digest.update(scope["method"].encode())
+    digest.update(b"\0" + scope["path"].encode())
+    digest.update(b"\0" + scope.get("query_string", b""))
+    digest.update(b"\0" + body)
+    return digest.hexdigest()
+
+
+async def _send_json(send: Send, status_code: int, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """Aplica Idempotency-Key a los endpoints de IDEMPOTENT_ROUTES"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Ejecuciones en curso en este proceso: los duplicados esperan el
+        # evento en vez de consultar la base de datos en bucle
+        self._inflight: dict[tuple[uuid.UUID, str], asyncio.Event] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not _is_idempotent_route(
+            scope["method"], scope["path"]
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = _get_header(scope, IDEMPOTENCY_HEADER)
+        user_id = _get_user_id(scope) if key else None
+
+        # Sin clave o sin usuario válido: flujo normal (el endpoint responde 401)
+        if not key or user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        if len(key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, "Idempotency-Key is too long")
+            return
+
+        body = await self._read_body(receive)
+        fingerprint = _fingerprint(scope, body)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS
+        delay = 0.05
+
+        while True:
+            async with AsyncSessionLocal() as db:
+                claimed = await crud_idempotency.claim_key(
+                    db, user_id, key, fingerprint
+                )
+                record = (
+                    None
+                    if claimed
+                    else await crud_idempotency.get_key(db, user_id, key)
+                )
+
+            if claimed:
+                await self._execute(scope, body, receive, send, user_id, key)
+                return
+
+            remaining = deadline - time.monotonic()
+
+            if record is None:
+                # Expiró o se liberó entre el claim y la lectura: reintentar,
+                # con backoff y dentro del mismo plazo que la espera
+                if remaining <= 0:
+                    await _send_json(
+                        send, 409, "A request with this Idempotency-Key is in progress"
+                    )
+                    return
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, 1.0)
+                continue
+
+            if record.fingerprint != fingerprint:
+                await _send_json(
+                    send,
+                    422,
+                    "Idempotency-Key was already used with a different request",
+                )
+                return
+
+            if record.status == STATUS_COMPLETED:
+                await self._replay(send, record)
+                return
+
+            # Primera ejecución en curso: esperar a que termine
+            if remaining <= 0:
+                await _send_json(
+                    send, 409, "A request with this Idempotency-Key is in progress"
+                )
+                return
+
+            event = self._inflight.get((user_id, key))
+            try:
+                if event is not None:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                else:
+                    await asyncio.sleep(min(delay, remaining))
+                    delay = min(delay * 2, 1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _execute(
+        self,
+        scope: Scope,
+        body: bytes,
+        receive: Receive,
+        send: Send,
+        user_id: uuid.UUID,
+        key: str,
+    ):
+        """Ejecuta el endpoint y guarda su respuesta"""
+        event = asyncio.Event()
+        self._inflight[(user_id, key)] = event
+
+        body_sent = False
+        status_code = 500
+        content_type: Optional[str] = None
+        response_chunks: list[bytes] = []
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def capture_send(message: Message):
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        async def release():
+            async with AsyncSessionLocal() as db:
+                await crud_idempotency.release_key(db, user_id, key)
+
+        async def finish():
+            async with AsyncSessionLocal() as db:
+                if not _is_stored(status_code):
+                    await crud_idempotency.release_key(db, user_id, key)
+                else:
+                    await crud_idempotency.save_response(
+                        db,
+                        user_id,
+                        key,
+                        status_code,
+                        content_type,
+                        b"".join(response_chunks),
+                    )
+
+        # BaseException: si el cliente se desconecta (CancelledError) la
+        # clave también se libera, si no quedaría in_progress hasta que la
+        # limpie el janitor. shield: una segunda cancelación no corta el
+        # release/guardado a medias
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        except BaseException:
+            await asyncio.shield(release())
+            raise
+        else:
+            await asyncio.shield(finish())
+        finally:
+            self._inflight.pop((user_id, key), None)
+            event.set()
+
+    async def _replay(self, send: Send, record):
+        """Devuelve la respuesta guardada sin ejecutar el endpoint"""
+        body = record.response_body or b""
+        headers = [
+            (b"content-length", str(len(body)).encode()),
+            (b"idempotent-replayed", b"true"),
+        ]
+        if record.response_content_type:
+            headers.append(
+                (b"content-type", record.response_content_type.encode("latin-1"))
+            )
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": record.response_status,
+                "headers": headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
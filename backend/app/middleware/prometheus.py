@@ -0,0 +1,52 @@
+"""
+Middleware ASGI de métricas HTTP para /metrics.
+
+Mide la latencia de cada request por método, ruta y status, y lleva el
+gauge de requests en curso. La ruta es la plantilla del endpoint
+("/api/v1/games/{slug}"), no la URL: una serie por endpoint, no una por
+slug. Lo que no matchea ninguna ruta cae en "unmatched".
+
+La latencia se mide hasta el último byte (incluye streaming).
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.prometheus import observe_request, requests_in_progress
+
+
+class PrometheusMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        in_progress = requests_in_progress(method)
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            # FastAPI deja la ruta que matcheó en el scope
+            route = scope.get("route")
+            observe_request(
+                method,
+                route.path if route is not None else "unmatched",
+                status_code,
+                elapsed,
+            )
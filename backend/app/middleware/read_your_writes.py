@@ -0,0 +1,47 @@
+"""
+Middleware ASGI de read-your-writes para réplicas de lectura.
+
+Después de una petición que escribe (POST/PUT/PATCH/DELETE), marca al
+cliente con una cookie de vida corta; mientras exista, get_read_db manda
+sus lecturas al primario. Así un usuario que acaba de comprar ve su orden
+en GET /orders/me aunque la réplica aún no la tenga.
+
+La cookie expira sola (Max-Age = READ_YOUR_WRITES_SECONDS), sin estado en
+el servidor, y funciona igual con varios workers. Solo se activa si hay
+réplicas configuradas.
+"""
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.database import PRIMARY_STICKY_COOKIE
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.cookie = (
+            f"{PRIMARY_STICKY_COOKIE}=1; Max-Age={settings.READ_YOUR_WRITES_SECONDS}; "
+            f"Path=/; HttpOnly; SameSite=Lax"
+        ).encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in WRITE_METHODS
+            or not settings.database_read_urls
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 500:
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", self.cookie),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,68 @@
+"""
+Middleware ASGI que mide las queries SQL de cada request.
+
+Abre un QueryStats (app.core.query_stats) para el request y, al empezar
+la respuesta, agrega:
+
+    Server-Timing: db;dur=12.4;desc="5 queries"
+
+Al terminar deja una línea de log con cantidad de queries, tiempo total en
+la base y la query más lenta. En una respuesta en streaming el header solo
+cubre lo hecho antes del primer byte; el log cubre todo.
+"""
+
+import logging
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.query_stats import track_queries
+
+logger = logging.getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if settings.SQL_SERVER_TIMING:
+                        timing = (
+                            f"db;dur={stats.total_seconds * 1000:.1f};"
+                            f'desc="{stats.count} queries"'
+                        )
+                        message["headers"] = [
+                            *message.get("headers", []),
+                            (b"server-timing", timing.encode("latin-1")),
+                        ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if stats.count:
+                    log = logger.warning if stats.over_budget else logger.info
+                    log(
+                        "sql method=%s path=%s status=%d queries=%d budget=%s "
+                        "db_ms=%.1f slowest_ms=%.1f slowest=%r",
+                        scope["method"],
+                        scope["path"],
+                        status_code,
+                        stats.count,
+                        stats.budget,
+                        stats.total_seconds * 1000,
+                        stats.slowest_seconds * 1000,
+                        stats.slowest_statement,
+                    )
@@ -3,6 +3,11 @@ from app.models.user import User, UserRole
 from app.models.game import Game
 from app.models.cart import Cart, CartItem
 from app.models.order import Order, OrderItem, OrderStatus
+from app.models.stock_hold import StockHold
+from app.models.idempotency_key import IdempotencyKey
+from app.models.outbox_event import OutboxEvent
+from app.models.sales_rollup import SalesDaily, SalesDailyGame, SalesDailyGenre
+from app.models.sync_state import SyncState
 
 __all__ = [
     "Base",
@@ -14,4 +19,11 @@ __all__ = [
     "Order",
     "OrderItem",
     "OrderStatus",
-]
\ No newline at end of file
+    "StockHold",
+    "IdempotencyKey",
+    "OutboxEvent",
+    "SalesDaily",
+    "SalesDailyGame",
+    "SalesDailyGenre",
+    "SyncState",
+]
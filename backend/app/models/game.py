@@ -9,6 +9,7 @@ from sqlalchemy import String, Text, Numeric, Integer, Boolean, Date, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from app.core.database import Base
+from app.core.ids import uuid7
 
 if TYPE_CHECKING:
     from app.models.cart import CartItem
@@ -24,7 +25,7 @@ class Game(Base):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
         index=True,
     )
 
@@ -61,6 +62,13 @@ class Game(Base):
         nullable=False,
         comment="Cantidad disponible en inventario",
     )
+    reserved: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="Unidades apartadas por holds de carritos (suma de stock_holds)",
+    )
 
     # Images
     image_url: Mapped[Optional[str]] = mapped_column(
@@ -137,5 +145,10 @@ class Game(Base):
         back_populates="game",
     )
 
+    @property
+    def available_stock(self) -> int:
+        """Stock que aún puede apartarse: stock - holds activos"""
+        return max(self.stock - (self.reserved or 0), 0)
+
     def __repr__(self) -> str:
         return f"<Game(id={self.id}, name={self.name}, price={self.price})>"
@@ -0,0 +1,64 @@
+"""
+Modelo de claves de idempotencia (header Idempotency-Key).
+Guarda la respuesta de la primera ejecución para repetirla en reintentos.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import String, Integer, LargeBinary, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    """Ejecución registrada de una petición con Idempotency-Key"""
+
+    __tablename__ = "idempotency_keys"
+
+    # Primary Key compuesta: la clave es única por usuario
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+    )
+    key: Mapped[str] = mapped_column(
+        String(255),
+        primary_key=True,
+        comment="Valor del header Idempotency-Key",
+    )
+
+    fingerprint: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+        comment="SHA-256 de método, ruta, query y body",
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        comment="in_progress | completed",
+    )
+
+    # Respuesta almacenada (solo cuando status = completed)
+    response_status: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response_content_type: Mapped[Optional[str]] = mapped_column(
+        String(255), nullable=True
+    )
+    response_body: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<IdempotencyKey(user_id={self.user_id}, key={self.key}, "
+            f"status={self.status})>"
+        )
@@ -1,12 +1,22 @@
 import uuid
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Optional
-from sqlalchemy import String, ForeignKey, Integer, Numeric, DateTime, JSON
+from sqlalchemy import (
+    String,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Integer,
+    Numeric,
+    DateTime,
+    JSON,
+    Index,
+)
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, JSONB
 import enum
 from app.core.database import Base
+from app.core.ids import uuid7
 
 if TYPE_CHECKING:
     from app.models.user import User
@@ -22,20 +32,33 @@ class OrderStatus(str, enum.Enum):
 
 
 class Order(Base):
-    """Orden de compra"""
+    """
+    Orden de compra.
+
+    La tabla está particionada por mes sobre created_at (ver migración
+    e7a2c5f9d318 y app/scripts/manage_partitions.py), por eso created_at
+    forma parte de la primary key.
+    """
     __tablename__ = "orders"
+    __table_args__ = (
+        # Índices para paginación por cursor (created_at, id) descendente
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_orders_created_at_id", "created_at", "id"),
+    )
 
     # Primary Key
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
     )
 
-    # Order Number (formato: ORD-20250118-ABC123)
+    # Order Number (formato: ORD-20250118-<ID en Base32>).
+    # Único por construcción (codifica el ID); un índice UNIQUE en una
+    # tabla particionada tendría que incluir created_at
     order_number: Mapped[str] = mapped_column(
         String(50),
-        unique=True,
         index=True,
         nullable=False,
         comment="Número de orden único y legible",
@@ -46,7 +69,6 @@ class Order(Base):
         UUID(as_uuid=True),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
 
     # Order Info
@@ -54,7 +76,6 @@ class Order(Base):
         SQLEnum(OrderStatus, name="order_status"),
         default=OrderStatus.PENDING,
         nullable=False,
-        index=True,
     )
 
     total_amount: Mapped[float] = mapped_column(
@@ -70,11 +91,24 @@ class Order(Base):
         comment="Dirección de envío: {street, city, state, zip, country}",
     )
 
-    # Timestamps
+    # Snapshot inmutable de las líneas al comprar (con nombre, slug e imagen
+    # del juego): el detalle de la orden se lee solo de esta fila.
+    # order_items se mantiene como fuente relacional para analytics
+    items_snapshot: Mapped[list] = mapped_column(
+        JSONB,
+        nullable=False,
+        default=list,
+        comment=(
+            "[{id, game_id, quantity, price_at_purchase, "
+            "game: {id, slug, name, image_url}}]"
+        ),
+    )
+
+    # Timestamps (created_at es la llave de partición)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         default=lambda: datetime.now(timezone.utc),
-        index=True,
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -95,20 +129,31 @@ class Order(Base):
 
 
 class OrderItem(Base):
-    """Item individual dentro de una orden"""
+    """
+    Item individual dentro de una orden.
+
+    Particionada igual que orders: created_at es el de su orden, así cada
+    item vive en la misma partición mensual y la FK es (order_id, created_at).
+    """
     __tablename__ = "order_items"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["order_id", "created_at"],
+            ["orders.id", "orders.created_at"],
+            ondelete="CASCADE",
+        ),
+    )
 
     # Primary Key
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        default=uuid7,
     )
 
     # Foreign Keys
     order_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
-        ForeignKey("orders.id", ondelete="CASCADE"),
         nullable=False,
         index=True,
     )
@@ -133,9 +178,18 @@ class OrderItem(Base):
         comment="Precio al momento de compra (histórico, no cambia)",
     )
 
-    # Timestamps
+    # Géneros del juego al comprar: los rollups por género de la orden no
+    # cambian si después se editan los géneros del juego
+    genres: Mapped[Optional[list[str]]] = mapped_column(
+        ARRAY(String),
+        nullable=True,
+        comment="Géneros al momento de compra (NULL: orden anterior al snapshot)",
+    )
+
+    # Timestamps (igual al created_at de la orden; llave de partición)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         default=lambda: datetime.now(timezone.utc),
     )
 
@@ -144,4 +198,4 @@ class OrderItem(Base):
     game: Mapped["Game"] = relationship("Game", back_populates="order_items")
 
     def __repr__(self) -> str:
-        return f"<OrderItem(game_id={self.game_id}, quantity={self.quantity})>"
\ No newline at end of file
+        return f"<OrderItem(game_id={self.game_id}, quantity={self.quantity})>"
@@ -0,0 +1,81 @@
+"""
+Modelo de eventos del outbox transaccional.
+
+Los eventos se insertan en la misma transacción que el cambio que los
+origina (orden creada, estado cambiado) y un relay en segundo plano los
+entrega a los handlers (app.core.events). Si la transacción hace rollback,
+el evento tampoco existe; si el handler falla, se reintenta.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import String, Integer, Text, DateTime, JSON, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+from app.core.ids import uuid7
+
+
+class OutboxEvent(Base):
+    """
+    Evento pendiente de entregar.
+
+    Se borra al entregarse con éxito. Tras OUTBOX_MAX_ATTEMPTS fallos
+    queda con failed_at (dead letter) para revisión manual.
+    """
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # Solo los pendientes: el relay los toma en orden de disponibilidad
+        Index(
+            "ix_outbox_events_pending",
+            "available_at",
+            postgresql_where=text("failed_at IS NULL"),
+        ),
+    )
+
+    # Primary Key (UUIDv7: también da el orden de creación)
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid7,
+    )
+
+    event_type: Mapped[str] = mapped_column(
+        String(100),
+        nullable=False,
+        comment="Tipo de evento: order.created, order.status_changed",
+    )
+    aggregate_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+        comment="ID de la entidad que originó el evento (orden)",
+    )
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    # Entrega
+    attempts: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        comment="No se entrega antes de esta fecha (lease o backoff)",
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    failed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Se agotaron los reintentos (dead letter)",
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<OutboxEvent(id={self.id}, event_type={self.event_type})>"
@@ -0,0 +1,72 @@
+"""
+Rollups de ventas para el dashboard de admin.
+
+Se actualizan en la misma transacción que crea o cancela la orden, así
+los reportes leen unas pocas filas por día en vez de agregar orders y
+order_items. Las órdenes canceladas no cuentan como venta.
+"""
+
+import uuid
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import String, Integer, Numeric, Date, SmallInteger, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from app.core.database import Base
+
+
+class SalesDaily(Base):
+    """Ventas totales por día (UTC)"""
+
+    __tablename__ = "sales_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    units: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    orders: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    buyers_hll: Mapped[list[int]] = mapped_column(
+        ARRAY(SmallInteger),
+        nullable=False,
+        comment="Registros HyperLogLog de compradores distintos (app.core.hll)",
+    )
+
+    def __repr__(self) -> str:
+        return f"<SalesDaily(day={self.day}, revenue={self.revenue})>"
+
+
+class SalesDailyGame(Base):
+    """Ventas por día y juego"""
+
+    __tablename__ = "sales_daily_games"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    game_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("games.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    units: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    orders: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<SalesDailyGame(day={self.day}, game_id={self.game_id})>"
+
+
+class SalesDailyGenre(Base):
+    """
+    Ventas por día y género.
+    Un juego con varios géneros suma su venta completa a cada uno.
+    """
+
+    __tablename__ = "sales_daily_genres"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    genre: Mapped[str] = mapped_column(String(255), primary_key=True)
+    revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    units: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    orders: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<SalesDailyGenre(day={self.day}, genre={self.genre})>"
@@ -0,0 +1,70 @@
+"""
+Modelo de reservas temporales de stock (holds).
+Un hold aparta unidades de un juego para un carrito hasta que expira.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import ForeignKey, Integer, DateTime, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+from app.core.ids import uuid7
+
+
+class StockHold(Base):
+    """
+    Reserva de stock de un juego para un carrito.
+
+    Invariante: games.reserved == SUM(stock_holds.quantity) por juego.
+    Crear, extender o liberar un hold ajusta ese contador en la misma
+    transacción, así el stock disponible (stock - reserved) se lee en O(1).
+    """
+
+    __tablename__ = "stock_holds"
+    __table_args__ = (
+        UniqueConstraint("cart_id", "game_id", name="uq_stock_holds_cart_game"),
+    )
+
+    # Primary Key
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid7,
+    )
+
+    # Sin FK a carts: si el carrito desaparece, el reaper libera el hold
+    # al expirar y el contador games.reserved se mantiene consistente.
+    cart_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+    )
+
+    game_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("games.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    quantity: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        comment="Unidades apartadas",
+    )
+
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True,
+        comment="Momento en que el reaper puede liberar el hold",
+    )
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+    def __repr__(self) -> str:
+        return f"<StockHold(game_id={self.game_id}, quantity={self.quantity})>"
@@ -0,0 +1,83 @@
+"""
+Modelo de checkpoints de sincronización con catálogos externos (RAWG).
+Permite retomar un import interrumpido y hacer syncs incrementales.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+class SyncState(Base):
+    """Estado de la última ejecución de un sync"""
+
+    __tablename__ = "sync_state"
+
+    # Primary Key: nombre del sync (p. ej. "rawg_games")
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+
+    # Parámetros de la ejecución (un resume debe repetirlos exactamente)
+    ordering: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="Ordenamiento pedido a la API: -rating, -updated, etc",
+    )
+    page_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    since: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Filtro updated >= since de la ejecución (incremental)",
+    )
+    limit: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="Máximo de juegos de la ejecución (NULL: catálogo completo)",
+    )
+
+    # Progreso
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        comment="running | completed",
+    )
+    last_page: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        nullable=False,
+        comment="Última página guardada sin huecos antes de ella",
+    )
+    written: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="Juegos guardados en la ejecución (cuenta contra limit al retomar)",
+    )
+    last_updated: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Mayor 'updated' de RAWG visto en la ejecución",
+    )
+    synced_until: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Punto de partida del próximo sync incremental",
+    )
+
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<SyncState(name={self.name}, status={self.status}, "
+            f"last_page={self.last_page})>"
+        )
@@ -54,6 +54,7 @@ class GameCartInfo(BaseModel):
     image_url: str | None
     price: Decimal  # Precio actual (puede diferir de price_at_addition)
     stock: int
+    available_stock: int  # stock - unidades apartadas en carritos (holds)
 
     model_config = ConfigDict(from_attributes=True)
 
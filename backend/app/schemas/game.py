@@ -123,6 +123,7 @@ class GameDetail(GameBase):
     rawg_id: Optional[int]
     description: Optional[str]
     stock: int
+    available_stock: int
     background_image: Optional[str]
     genres: List[str]
     metacritic: Optional[int]
@@ -0,0 +1,44 @@
+"""
+Schemas Pydantic para métricas internas (admin).
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class HistogramBucket(BaseModel):
+    """Observaciones <= le (acumulado)"""
+
+    le: Optional[float] = Field(..., description="Límite en segundos (null = +Inf)")
+    count: int
+
+
+class Histogram(BaseModel):
+    buckets: List[HistogramBucket]
+    count: int
+    sum: float
+
+
+class PoolMetrics(BaseModel):
+    """Estado de un pool de conexiones en este worker"""
+
+    name: str
+    size: int = Field(..., description="Conexiones permanentes (pool_size)")
+    max_overflow: int
+    timeout: float
+    checked_out: int = Field(..., description="Conexiones en uso")
+    checked_in: int = Field(..., description="Conexiones libres en el pool")
+    overflow: int = Field(..., description="Conexiones abiertas por encima de size")
+    checkouts: int
+    timeouts: int = Field(..., description="Checkouts que agotaron pool_timeout")
+    wait_seconds: Histogram = Field(..., description="Espera por checkout")
+    hold_seconds: Histogram = Field(
+        ..., description="Tiempo con la conexión tomada (checkout -> checkin)"
+    )
+
+
+class PoolMetricsResponse(BaseModel):
+    """Métricas de los pools de este worker (cada proceso tiene los suyos)"""
+
+    pid: int
+    pools: List[PoolMetrics]
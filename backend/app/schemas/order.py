@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 from datetime import datetime
 from decimal import Decimal
-from typing import List
+from typing import List, Literal, Optional
+import enum
 import uuid
 
 from app.models.order import OrderStatus
@@ -32,6 +33,42 @@ class OrderStatusUpdate(BaseModel):
     status: OrderStatus
 
 
+class OrderStatusBatchFilter(BaseModel):
+    """Selección de órdenes por estado actual y rango de creación"""
+
+    status: OrderStatus
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+
+class OrderStatusBatchUpdate(BaseModel):
+    """
+    Schema para cambiar el estado de varias órdenes (admin).
+    Enviar order_ids o filter, no ambos.
+    """
+
+    status: OrderStatus
+    order_ids: Optional[List[uuid.UUID]] = Field(None, min_length=1, max_length=1000)
+    filter: Optional[OrderStatusBatchFilter] = None
+    limit: int = Field(
+        1000, ge=1, le=1000, description="Máximo de órdenes afectadas con filter"
+    )
+
+    @model_validator(mode="after")
+    def check_target(self):
+        """Exactamente uno de order_ids o filter"""
+        if (self.order_ids is None) == (self.filter is None):
+            raise ValueError("Provide either order_ids or filter")
+        return self
+
+
+class OrderExportFormat(str, enum.Enum):
+    """Formatos de export de órdenes"""
+
+    CSV = "csv"  # Una fila por item
+    NDJSON = "ndjson"  # Un objeto JSON por orden, con sus items
+
+
 # schemas de response
 
 
@@ -79,7 +116,7 @@ class OrderResponse(BaseModel):
 class OrderListItem(BaseModel):
     """
     Schema ligero para listado de órdenes.
-    Sin items, solo info básica.
+    Sin items: solo info básica y totales calculados en SQL.
     """
 
     id: uuid.UUID
@@ -87,18 +124,34 @@ class OrderListItem(BaseModel):
     status: OrderStatus
     total_amount: Decimal
     created_at: datetime
-
-    @property
-    def total_items(self) -> int:
-        return len(self.items) if hasattr(self, "items") else 0
+    total_items: int = Field(0, description="Líneas distintas en la orden")
+    total_quantity: int = Field(0, description="Suma de cantidades")
 
     model_config = ConfigDict(from_attributes=True)
 
 
 class OrderListResponse(BaseModel):
-    """Schema para lista paginada de órdenes"""
+    """
+    Schema para lista paginada de órdenes (paginación por cursor).
+    Para la siguiente página, enviar next_cursor como ?cursor=.
+    """
 
     items: List[OrderListItem]
-    total: int
-    skip: int
     limit: int
+    next_cursor: Optional[str] = None
+
+
+class OrderStatusBatchResult(BaseModel):
+    """Resultado por orden de un cambio de estado masivo"""
+
+    id: uuid.UUID
+    result: Literal["updated", "invalid_transition", "not_found"]
+    previous_status: Optional[OrderStatus] = None
+
+
+class OrderStatusBatchResponse(BaseModel):
+    """Schema de respuesta de un cambio de estado masivo"""
+
+    status: OrderStatus
+    updated: int
+    results: List[OrderStatusBatchResult]
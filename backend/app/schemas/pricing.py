@@ -0,0 +1,100 @@
+"""
+Schemas Pydantic para el repricing del catálogo (admin).
+"""
+
+from pydantic import BaseModel, Field, model_validator
+from decimal import Decimal
+from typing import Annotated, Dict, List, Optional
+import uuid
+
+# Máximo que cabe en games.price (Numeric(10, 2))
+MAX_PRICE = Decimal("99999999.99")
+
+
+class PriceTier(BaseModel):
+    """
+    Tramo de precio base. Aplica si el juego cumple todos los mínimos
+    definidos (un mínimo en None no se evalúa).
+    """
+
+    min_metacritic: Optional[int] = Field(None, ge=0, le=100)
+    min_rating: Optional[float] = Field(None, ge=0, le=5)
+    price: Decimal = Field(..., gt=0, le=MAX_PRICE, decimal_places=2)
+
+
+class AgeDiscount(BaseModel):
+    """Descuento para juegos lanzados hace al menos min_years años"""
+
+    min_years: float = Field(..., ge=0)
+    discount: float = Field(..., ge=0, lt=1, description="0.25 = 25% menos")
+
+
+class PricingRules(BaseModel):
+    """
+    Reglas de precio, evaluadas en este orden:
+    1. Precio base: el primer tramo que aplica (si ninguno, default_price)
+    2. Multiplicadores por género: se multiplican todos los del juego
+    3. Descuento por antigüedad: el de mayor min_years que aplica
+    4. Redondeo a .99 (opcional) y límites min_price/max_price
+
+    Los defaults reproducen los tramos fijos del importador de RAWG.
+    """
+
+    tiers: List[PriceTier] = Field(
+        default_factory=lambda: [
+            PriceTier(min_metacritic=90, price=Decimal("59.99")),
+            PriceTier(min_metacritic=80, price=Decimal("49.99")),
+            PriceTier(min_metacritic=70, price=Decimal("39.99")),
+            PriceTier(min_rating=4.5, price=Decimal("44.99")),
+        ]
+    )
+    default_price: Decimal = Field(
+        Decimal("29.99"), gt=0, le=MAX_PRICE, decimal_places=2
+    )
+    genre_multipliers: Dict[str, Annotated[float, Field(gt=0, le=10)]] = Field(
+        default_factory=dict, description="{'Indie': 0.8, 'RPG': 1.1}"
+    )
+    age_discounts: List[AgeDiscount] = Field(default_factory=list)
+    round_to_99: bool = True
+    min_price: Decimal = Field(Decimal("0.99"), gt=0, le=MAX_PRICE, decimal_places=2)
+    max_price: Optional[Decimal] = Field(None, gt=0, le=MAX_PRICE, decimal_places=2)
+
+    @model_validator(mode="after")
+    def check_price_range(self) -> "PricingRules":
+        if self.max_price is not None and self.max_price < self.min_price:
+            raise ValueError("max_price must be greater than or equal to min_price")
+        return self
+
+
+class RepriceRequest(BaseModel):
+    """Schema para recalcular los precios del catálogo activo"""
+
+    rules: PricingRules = Field(default_factory=PricingRules)
+    dry_run: bool = Field(True, description="Solo calcular el diff, sin guardar")
+    diff_limit: int = Field(100, ge=0, le=1000)
+
+
+class PriceChange(BaseModel):
+    """Cambio de precio de un juego"""
+
+    game_id: uuid.UUID
+    slug: str
+    name: str
+    old_price: Decimal
+    new_price: Decimal
+
+
+class RepriceResponse(BaseModel):
+    """Resultado del repricing"""
+
+    dry_run: bool
+    evaluated: int
+    changed: int
+    skipped: int = Field(
+        ...,
+        description="Editados entre la lectura y el UPDATE: conservan su precio",
+    )
+    unchanged: int
+    changes: List[PriceChange] = Field(
+        ..., description="Hasta diff_limit cambios, los de mayor diferencia primero"
+    )
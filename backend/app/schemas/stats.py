@@ -0,0 +1,52 @@
+"""
+Schemas Pydantic para reportes de ventas (admin).
+"""
+
+from pydantic import BaseModel, Field
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+import enum
+
+
+class SalesGroupBy(str, enum.Enum):
+    """Agrupaciones disponibles para el reporte de ventas"""
+
+    DAY = "day"
+    WEEK = "week"  # Semanas ISO (inician en lunes)
+    MONTH = "month"
+    GAME = "game"
+    GENRE = "genre"
+
+
+class SalesTotals(BaseModel):
+    """Totales del rango consultado"""
+
+    revenue: Decimal
+    units: int
+    orders: int
+    buyers: int = Field(..., description="Compradores distintos (aproximado, HLL)")
+
+
+class SalesStatsRow(BaseModel):
+    """
+    Fila del reporte.
+    key: fecha de inicio del periodo, ID del juego o nombre del género.
+    """
+
+    key: str
+    label: Optional[str] = None
+    revenue: Decimal
+    units: int
+    orders: int
+    buyers: Optional[int] = Field(None, description="Solo en agrupaciones por tiempo")
+
+
+class SalesStatsResponse(BaseModel):
+    """Reporte de ventas leído de los rollups"""
+
+    date_from: date
+    date_to: date
+    group_by: SalesGroupBy
+    totals: SalesTotals
+    rows: List[SalesStatsRow]
@@ -0,0 +1,130 @@
+"""
+Benchmark de latencia del checkout para carritos de 1, 10 y 50 líneas.
+
+Para cada tamaño llena el carrito de un usuario de prueba (fuera del
+tiempo medido), ejecuta create_order_from_cart y reporta latencia
+(media, p50, p95) y número de sentencias SQL enviadas por checkout.
+
+Cada checkout corre dentro de assert_max_queries(CHECKOUT_QUERIES): si
+alguno envía más sentencias el script falla con QueryBudgetExceeded
+(exit code distinto de 0), con la lista de sentencias.
+
+Uso:
+    python -m app.scripts.bench_checkout --iterations 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from decimal import Decimal
+from sqlalchemy import delete, insert
+from app.core.database import AsyncSessionLocal
+from app.core.query_stats import assert_max_queries
+from app.crud import order as crud_order
+from app.models.user import User
+from app.models.game import Game
+from app.models.cart import Cart, CartItem
+from app.schemas.order import OrderCreate, ShippingAddress
+
+CART_SIZES = (1, 10, 50)
+
+SHIPPING = OrderCreate(
+    shipping_address=ShippingAddress(
+        street="Bench 1", city="Test", country="MX", postal_code="00000"
+    )
+)
+
+
+async def setup(max_lines: int):
+    """Crea un usuario con carrito y max_lines juegos con stock amplio"""
+    run_id = uuid.uuid4().hex[:8]
+
+    async with AsyncSessionLocal() as db:
+        games = [
+            Game(
+                rawg_id=-(uuid.uuid4().int % 2**31),  # IDs negativos: fuera de RAWG
+                slug=f"bench-{run_id}-{i}",
+                name=f"Bench Game {run_id} {i}",
+                price=Decimal("19.99"),
+                stock=10**6,
+            )
+            for i in range(max_lines)
+        ]
+        user = User(
+            email=f"bench-{run_id}@example.com",
+            password_hash="x",
+            full_name="Bench User",
+        )
+        cart = Cart(user=user)
+        db.add_all([*games, user, cart])
+        await db.commit()
+        return user.id, cart.id, [game.id for game in games]
+
+
+async def fill_cart(cart_id: uuid.UUID, game_ids: list[uuid.UUID]):
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            insert(CartItem),
+            [
+                {
+                    "cart_id": cart_id,
+                    "game_id": game_id,
+                    "quantity": 1,
+                    "price_at_addition": Decimal("19.99"),
+                }
+                for game_id in game_ids
+            ],
+        )
+        await db.commit()
+
+
+async def cleanup(user_id: uuid.UUID, game_ids: list[uuid.UUID]):
+    async with AsyncSessionLocal() as db:
+        await crud_order.delete_user_orders(db, [user_id])
+        await db.execute(delete(User).where(User.id == user_id))
+        await db.execute(delete(Game).where(Game.id.in_(game_ids)))
+        await db.commit()
+
+
+async def bench(iterations: int):
+    user_id, cart_id, game_ids = await setup(max(CART_SIZES))
+
+    print(f"🛒 Checkout benchmark ({iterations} iterations per size)\n")
+    print(f"{'lines':>6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'stmts':>6}")
+
+    try:
+        for size in CART_SIZES:
+            timings = []
+            statements = 0
+
+            for _ in range(iterations):
+                await fill_cart(cart_id, game_ids[:size])
+
+                async with AsyncSessionLocal() as db:
+                    with assert_max_queries(crud_order.CHECKOUT_QUERIES) as stats:
+                        start = time.perf_counter()
+                        await crud_order.create_order_from_cart(db, user_id, SHIPPING)
+                        timings.append((time.perf_counter() - start) * 1000)
+                    statements = stats.count
+
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(
+                f"{size:>6} {statistics.mean(timings):>9.2f} "
+                f"{statistics.median(timings):>9.2f} {p95:>9.2f} {statements:>6}"
+            )
+    finally:
+        await cleanup(user_id, game_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(bench(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
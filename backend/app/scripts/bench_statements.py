@@ -0,0 +1,182 @@
+"""
+Benchmark del costo en Python de las queries calientes de app/crud.
+
+Compara, para cada query, la versión con select() armado en cada llamada
+(como estaba antes) contra la lambda_stmt actual. Mide lo que se paga en
+cada db.execute antes de tocar la red: construir el statement, calcular
+su cache key y buscar la forma compilada en el cache del dialecto
+(postgresql+asyncpg). No necesita base de datos.
+
+Con --db además ejecuta cada query contra la base en una sola conexión y
+verifica que asyncpg reutiliza los prepared statements: tiene que haber
+uno por query, no uno por ejecución.
+
+Uso:
+    python -m app.scripts.bench_statements --calls 20000
+    python -m app.scripts.bench_statements --db --executions 200
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.orm import selectinload
+
+from app.crud import cart as crud_cart, game as crud_game, user as crud_user
+from app.models.cart import Cart, CartItem
+from app.models.game import Game
+from app.models.user import User
+
+
+def _ids():
+    return uuid.uuid4(), uuid.uuid4()
+
+
+# (nombre, versión anterior, versión actual); cada una recibe dos uuids
+STATEMENTS = [
+    (
+        "user_by_id",
+        lambda a, b: select(User).where(User.id == a),
+        lambda a, b: crud_user.user_by_id_stmt(a),
+    ),
+    (
+        "user_by_email",
+        lambda a, b: select(User).where(User.email == f"{a}@bench.local"),
+        lambda a, b: crud_user.user_by_email_stmt(f"{a}@bench.local"),
+    ),
+    (
+        "game_by_id",
+        lambda a, b: select(Game).where(Game.id == a),
+        lambda a, b: crud_game.game_by_id_stmt(a),
+    ),
+    (
+        "active_game_by_id",
+        lambda a, b: select(Game).where(Game.id == a, Game.is_active == True),
+        lambda a, b: crud_game.active_game_by_id_stmt(a),
+    ),
+    (
+        "game_by_slug",
+        lambda a, b: select(Game).where(Game.slug == str(a), Game.is_active == True),
+        lambda a, b: crud_game.game_by_slug_stmt(str(a)),
+    ),
+    (
+        "slug_exists",
+        lambda a, b: select(Game).where(Game.slug == str(a)).where(Game.id != b),
+        lambda a, b: crud_game.slug_exists_stmt(str(a), b),
+    ),
+    (
+        "cart_with_items",
+        lambda a, b: select(Cart)
+        .where(Cart.user_id == a)
+        .options(selectinload(Cart.items).selectinload(CartItem.game)),
+        lambda a, b: crud_cart.cart_with_items_stmt(a),
+    ),
+    (
+        "cart_item_by_game",
+        lambda a, b: select(CartItem).where(
+            CartItem.cart_id == a, CartItem.game_id == b
+        ),
+        lambda a, b: crud_cart.cart_item_by_game_stmt(a, b),
+    ),
+    (
+        "owned_cart_item",
+        lambda a, b: select(CartItem)
+        .join(Cart)
+        .where(CartItem.id == a, Cart.user_id == b),
+        lambda a, b: crud_cart.owned_cart_item_stmt(a, b),
+    ),
+    (
+        "owned_cart_item_with_game",
+        lambda a, b: select(CartItem)
+        .join(Cart)
+        .where(CartItem.id == a, Cart.user_id == b)
+        .options(selectinload(CartItem.game)),
+        lambda a, b: crud_cart.owned_cart_item_stmt(a, b, with_game=True),
+    ),
+]
+
+
+def per_call_overhead(builder, calls: int) -> float:
+    """Microsegundos por llamada: construir + cache key + compilado cacheado"""
+    dialect = asyncpg_dialect()
+    compiled_cache = {}
+    args = [_ids() for _ in range(calls)]
+
+    # La primera compilación llena el cache y no cuenta
+    builder(*args[0])._compile_w_cache(
+        dialect, compiled_cache=compiled_cache, column_keys=[]
+    )
+
+    start = time.perf_counter()
+    for a, b in args:
+        builder(a, b)._compile_w_cache(
+            dialect, compiled_cache=compiled_cache, column_keys=[]
+        )
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run_offline(calls: int) -> None:
+    print(f"{'statement':<28}{'select() µs':>12}{'lambda µs':>12}{'speedup':>10}")
+    for name, before, after in STATEMENTS:
+        before_us = per_call_overhead(before, calls)
+        after_us = per_call_overhead(after, calls)
+        speedup = before_us / after_us
+        print(f"{name:<28}{before_us:>12.1f}{after_us:>12.1f}{speedup:>9.1f}x")
+
+
+async def run_db(executions: int) -> None:
+    from app.core.database import AsyncSessionLocal, engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            # Prepared statements existentes antes (p. ej. del ping inicial)
+            baseline = (
+                await db.execute(text("SELECT count(*) FROM pg_prepared_statements"))
+            ).scalar()
+
+            for name, _, after in STATEMENTS:
+                for _ in range(executions):
+                    await db.execute(after(*_ids()))
+
+            prepared = (
+                await db.execute(text("SELECT count(*) FROM pg_prepared_statements"))
+            ).scalar()
+            await db.rollback()
+    finally:
+        await engine.dispose()
+
+    # Cuenta también el propio SELECT count(*) y los selectinload que
+    # no llegan a ejecutarse (sin filas no hay segunda query)
+    new = prepared - baseline
+    total = executions * len(STATEMENTS)
+    print(f"{total:,} executions -> {new} new prepared statements on the connection")
+    if new > len(STATEMENTS) + 1:
+        print(
+            "⚠️  Prepared statements are not being reused "
+            "(DB_STATEMENT_CACHE_SIZE = 0?)"
+        )
+    else:
+        print("✅ Prepared statements reused")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument(
+        "--db", action="store_true", help="Verificar prepared statements"
+    )
+    parser.add_argument("--executions", type=int, default=200)
+    args = parser.parse_args()
+
+    run_offline(args.calls)
+    if args.db:
+        asyncio.run(run_db(args.executions))
+
+
+if __name__ == "__main__":
+    main()
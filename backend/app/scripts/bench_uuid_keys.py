@@ -0,0 +1,112 @@
+"""
+Benchmark de primary keys: UUIDv4 (aleatorio) vs UUIDv7 (ordenado por tiempo).
+
+Crea dos tablas temporales con la misma forma que order_items, inserta
+las mismas filas en lotes y reporta throughput de inserción, tamaño del
+índice de la primary key y su densidad (avg_leaf_density si pgstattuple
+está disponible).
+
+Uso:
+    python -m app.scripts.bench_uuid_keys --rows 200000 --batch 1000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from sqlalchemy import text
+from app.core.database import engine
+from app.core.ids import uuid7
+
+GENERATORS = {
+    "uuid4": uuid.uuid4,
+    "uuid7": uuid7,
+}
+
+
+async def bench_generator(name: str, generator, rows: int, batch: int) -> dict:
+    table = f"bench_pk_{name}"
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        await conn.execute(
+            text(
+                f"CREATE TABLE {table} ("
+                " id uuid PRIMARY KEY,"
+                " order_id uuid NOT NULL,"
+                " quantity integer NOT NULL,"
+                " created_at timestamptz NOT NULL DEFAULT now())"
+            )
+        )
+
+    insert = text(
+        f"INSERT INTO {table} (id, order_id, quantity) VALUES (:id, :order_id, :q)"
+    )
+    start = time.perf_counter()
+
+    for offset in range(0, rows, batch):
+        params = [
+            {"id": generator(), "order_id": generator(), "q": 1}
+            for _ in range(min(batch, rows - offset))
+        ]
+        async with engine.begin() as conn:
+            await conn.execute(insert, params)
+
+    elapsed = time.perf_counter() - start
+
+    async with engine.begin() as conn:
+        index_size = (
+            await conn.execute(text(f"SELECT pg_relation_size('{table}_pkey')"))
+        ).scalar()
+
+    # Densidad de hojas del índice (requiere la extensión pgstattuple)
+    note = ""
+    try:
+        async with engine.begin() as conn:
+            density = (
+                await conn.execute(
+                    text(f"SELECT avg_leaf_density FROM pgstatindex('{table}_pkey')")
+                )
+            ).scalar()
+    except Exception:
+        density = None
+        note = " (pgstattuple not installed)"
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+    return {
+        "name": name,
+        "rows_per_sec": rows / elapsed,
+        "elapsed": elapsed,
+        "index_mb": index_size / 1024 / 1024,
+        "density": density,
+        "note": note,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"🔑 Primary key benchmark: {args.rows} rows, batches of {args.batch}\n")
+    print(f"{'key':>6} {'rows/s':>10} {'secs':>8} {'pk MB':>8} {'leaf density':>13}")
+
+    try:
+        for name, generator in GENERATORS.items():
+            result = await bench_generator(name, generator, args.rows, args.batch)
+            density = (
+                f"{result['density']:.1f}%" if result["density"] is not None else "n/a"
+            )
+            print(
+                f"{name:>6} {result['rows_per_sec']:>10.0f} {result['elapsed']:>8.2f} "
+                f"{result['index_mb']:>8.2f} {density:>13}{result['note']}"
+            )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
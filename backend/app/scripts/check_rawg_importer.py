@@ -0,0 +1,355 @@
+"""
+Verificación offline del importador de RAWG: lo corre contra páginas
+grabadas (app/scripts/fixtures/rawg) a través de replay_transport, sin red
+ni API key, y comprueba:
+- import completo con detalles (description de /games/{id})
+- re-import sin cambios (ninguna fila reescrita)
+- reintentos: 503 y 429 con Retry-After se reintentan y la página se guarda
+- página que falla tras agotar los reintentos: el sync queda abierto y la
+  ejecución siguiente lo retoma desde el checkpoint hasta completarlo
+- cache en disco: la segunda pasada en modo offline no toca la red, y un
+  miss offline detiene el import en vez de pedir páginas sin fin
+- token bucket: no deja pasar más requests que la cuota
+- slug tomado por otro rawg_id: el juego se guarda con <slug>-<rawg_id>
+
+Los juegos grabados se cargan con rawg_id negativo y slug único por
+ejecución, con su propia fila de sync_state: no tocan el catálogo real y
+se borran al terminar. Necesita una base con las migraciones aplicadas.
+
+Si alguna comprobación falla, termina con exit code 1 (sirve como paso de
+CI, igual que stress_checkout).
+
+Uso:
+    python -m app.scripts.check_rawg_importer
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import delete, select
+
+from app.core.database import AsyncSessionLocal, engine
+from app.crud.sync_state import STATUS_COMPLETED, STATUS_RUNNING, get_sync_state
+from app.models.game import Game
+from app.models.sync_state import SyncState
+from app.scripts.rawg_client import (
+    RateLimitTransport,
+    RetryTransport,
+    TokenBucket,
+    replay_transport,
+)
+from app.scripts.rawg_importer import ImportProgress, RAWGImporter
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "rawg"
+CHECK_SYNC_NAME = "rawg_games_check"
+PAGE_SIZE = 3  # El de las páginas grabadas
+
+
+def load_fixtures(run_id: str) -> Tuple[Dict[int, dict], Dict[int, dict]]:
+    """
+    Páginas ({número: respuesta de /games}) y detalles ({rawg_id: respuesta
+    de /games/{id}}) grabados, con rawg_id negativos y slugs de esta ejecución
+    """
+
+    def isolate(game: dict) -> dict:
+        return {**game, "id": -game["id"], "slug": f"check-{run_id}-{game['slug']}"}
+
+    pages = {}
+    for path in FIXTURES_DIR.glob("games_page_*.json"):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        number = int(path.stem.rsplit("_", 1)[1])
+        pages[number] = {**data, "results": [isolate(g) for g in data["results"]]}
+
+    details = {}
+    for path in FIXTURES_DIR.glob("game_*.json"):
+        detail = isolate(json.loads(path.read_text(encoding="utf-8")))
+        details[detail["id"]] = detail
+
+    return pages, details
+
+
+class ScriptedTransport(httpx.AsyncBaseTransport):
+    """
+    Antepone respuestas de error a las de otro transport: por cada página
+    de /games, la lista de (status, headers) a devolver antes de delegar.
+    Con raise_on_request, cualquier request que llegue es un error (para
+    comprobar que el cache responde todo).
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        failures: Optional[Dict[int, List[Tuple[int, dict]]]] = None,
+        raise_on_request: bool = False,
+    ):
+        self.transport = transport
+        self.failures = {page: list(queue) for page, queue in (failures or {}).items()}
+        self.raise_on_request = raise_on_request
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.raise_on_request:
+            raise httpx.ConnectError("Network used in offline check", request=request)
+
+        if request.url.path.endswith("/games"):
+            queue = self.failures.get(int(request.url.params.get("page", 1)))
+            if queue:
+                status, headers = queue.pop(0)
+                return httpx.Response(
+                    status,
+                    headers=headers,
+                    json={"detail": "scripted"},
+                    request=request,
+                )
+        return await self.transport.handle_async_request(request)
+
+
+class Check:
+    """Una corrida de la verificación (datos aislados por run_id)"""
+
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:8]
+        self.pages, self.details = load_fixtures(self.run_id)
+        self.total = sum(len(page["results"]) for page in self.pages.values())
+        self.problems: List[str] = []
+
+    def expect(self, scenario: str, condition: bool, message: str) -> None:
+        if not condition:
+            self.problems.append(f"{scenario}: {message}")
+
+    def replay(self, failures=None, raise_on_request=False) -> ScriptedTransport:
+        return ScriptedTransport(
+            replay_transport(self.pages, self.details), failures, raise_on_request
+        )
+
+    async def run_import(
+        self, transport: httpx.AsyncBaseTransport, **options
+    ) -> Tuple[ImportProgress, RAWGImporter]:
+        fetch_details = options.pop("fetch_details", False)
+        importer = RAWGImporter(
+            transport=transport,
+            concurrency=2,
+            rate_per_second=1000,
+            sync_name=CHECK_SYNC_NAME,
+            **options,
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                progress = await importer.import_games(
+                    db, page_size=PAGE_SIZE, fetch_details=fetch_details
+                )
+        finally:
+            await importer.close()
+        return progress, importer
+
+    async def sync_state(self) -> Optional[SyncState]:
+        async with AsyncSessionLocal() as db:
+            return await get_sync_state(db, CHECK_SYNC_NAME)
+
+    async def full_import(self) -> None:
+        scenario = "full import"
+        progress, _ = await self.run_import(self.replay(), fetch_details=True)
+        self.expect(
+            scenario, progress.inserted == self.total, f"{progress.inserted} new"
+        )
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Game.rawg_id, Game.description).where(
+                    Game.rawg_id.in_(list(self.details))
+                )
+            )
+            described = {rawg_id for rawg_id, description in result if description}
+        self.expect(
+            scenario,
+            described == set(self.details),
+            f"descriptions for {sorted(described)}, expected {sorted(self.details)}",
+        )
+
+        state = await self.sync_state()
+        self.expect(scenario, state.status == STATUS_COMPLETED, f"sync {state.status}")
+
+    async def reimport_unchanged(self) -> None:
+        scenario = "re-import"
+        progress, _ = await self.run_import(self.replay())
+        self.expect(
+            scenario,
+            progress.unchanged == self.total and progress.written == self.total,
+            f"{progress.inserted} new, {progress.updated} updated, "
+            f"{progress.unchanged} unchanged",
+        )
+
+    async def retries(self) -> None:
+        scenario = "retries"
+        transport = self.replay(
+            {1: [(503, {}), (429, {"Retry-After": "1"})], 2: [(502, {})]}
+        )
+        started = time.monotonic()
+        progress, importer = await self.run_import(transport)
+        elapsed = time.monotonic() - started
+
+        self.expect(scenario, progress.failed_pages == 0, "a page failed")
+        self.expect(
+            scenario, progress.written == self.total, f"{progress.written} saved"
+        )
+        self.expect(
+            scenario,
+            importer.transport.retries == 3,
+            f"{importer.transport.retries} retries, expected 3",
+        )
+        self.expect(scenario, elapsed >= 1.0, f"Retry-After ignored ({elapsed:.2f}s)")
+
+    async def failed_page_resume(self) -> None:
+        scenario = "failed page"
+        # Siempre 500 (Retry-After: 0 para no esperar el backoff)
+        failures = {2: [(500, {"Retry-After": "0"})] * 100}
+        progress, _ = await self.run_import(self.replay(failures))
+        state = await self.sync_state()
+        self.expect(
+            scenario, progress.failed_pages == 1, f"{progress.failed_pages} failed"
+        )
+        self.expect(
+            scenario,
+            state.status == STATUS_RUNNING and state.last_page == 1,
+            f"sync {state.status} at page {state.last_page}, expected open at 1",
+        )
+
+        scenario = "resume"
+        transport = self.replay()
+        progress, _ = await self.run_import(transport)
+        state = await self.sync_state()
+        self.expect(scenario, progress.pages == 1, f"{progress.pages} pages fetched")
+        self.expect(scenario, state.status == STATUS_COMPLETED, f"sync {state.status}")
+
+    async def disk_cache(self) -> None:
+        scenario = "disk cache"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            await self.run_import(self.replay(), cache_dir=cache_dir)
+
+            network = self.replay(raise_on_request=True)
+            progress, importer = await self.run_import(
+                network, cache_dir=cache_dir, offline=True
+            )
+            self.expect(scenario, network.requests == 0, f"{network.requests} requests")
+            self.expect(
+                scenario,
+                progress.written == self.total and importer.cache.misses == 0,
+                f"{progress.written} saved, {importer.cache.misses} misses",
+            )
+
+        scenario = "offline miss"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            progress, _ = await asyncio.wait_for(
+                self.run_import(self.replay(), cache_dir=cache_dir, offline=True),
+                timeout=30,
+            )
+            self.expect(
+                scenario,
+                progress.pages == 0 and progress.failed_pages > 0,
+                f"{progress.pages} pages, {progress.failed_pages} failed",
+            )
+
+    async def slug_taken(self) -> None:
+        scenario = "slug taken"
+        # Un juego nuevo con el slug de uno ya importado
+        taken = self.pages[1]["results"][0]
+        clash = {**taken, "id": taken["id"] - 1_000_000}
+        pages = {1: {"count": 1, "next": None, "results": [clash]}}
+        progress, _ = await self.run_import(
+            ScriptedTransport(replay_transport(pages, {}))
+        )
+
+        async with AsyncSessionLocal() as db:
+            slug = await db.scalar(select(Game.slug).where(Game.rawg_id == clash["id"]))
+        self.expect(
+            scenario,
+            progress.inserted == 1 and slug == f"{taken['slug']}-{clash['id']}",
+            f"{progress.inserted} new, slug {slug!r}",
+        )
+
+    async def token_bucket(self) -> None:
+        scenario = "token bucket"
+        rate, burst, requests = 20.0, 2, 12
+        mock = httpx.MockTransport(lambda request: httpx.Response(200, json={}))
+        transport = RateLimitTransport(mock, TokenBucket(rate, burst))
+
+        started = time.monotonic()
+        async with httpx.AsyncClient(transport=transport) as client:
+            await asyncio.gather(
+                *(client.get("https://rawg.test/games") for _ in range(requests))
+            )
+        elapsed = time.monotonic() - started
+
+        minimum = (requests - burst) / rate
+        self.expect(
+            scenario,
+            elapsed >= minimum * 0.95,
+            f"{requests} requests in {elapsed:.2f}s, quota allows {minimum:.2f}s",
+        )
+
+        scenario = "retries exhausted"
+        statuses = iter([503] * 3)
+        mock = httpx.MockTransport(lambda request: httpx.Response(next(statuses)))
+        transport = RetryTransport(
+            mock, max_retries=2, backoff_base=0.01, max_backoff=0.1
+        )
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("https://rawg.test/games")
+        self.expect(
+            scenario,
+            response.status_code == 503 and transport.retries == 2,
+            f"status {response.status_code} after {transport.retries} retries",
+        )
+
+    async def cleanup(self) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(Game).where(Game.slug.like(f"check-{self.run_id}-%"))
+            )
+            await db.execute(delete(SyncState).where(SyncState.name == CHECK_SYNC_NAME))
+            await db.commit()
+
+
+async def main() -> int:
+    check = Check()
+    print(
+        f"🧪 Run {check.run_id}: {len(check.pages)} recorded pages, {check.total} games"
+    )
+
+    scenarios = (
+        check.token_bucket,
+        check.full_import,
+        check.reimport_unchanged,
+        check.retries,
+        check.failed_page_resume,
+        check.disk_cache,
+        check.slug_taken,
+    )
+    try:
+        await check.cleanup()
+        for scenario in scenarios:
+            await scenario()
+    finally:
+        await check.cleanup()
+        await engine.dispose()
+
+    if check.problems:
+        print("\n💥 RAWG importer check failed:")
+        for problem in check.problems:
+            print(f"   - {problem}")
+        return 1
+
+    print("\n🎉 RAWG importer behaves as expected offline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
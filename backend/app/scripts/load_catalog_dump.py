@@ -0,0 +1,304 @@
+"""
+Carga masiva de un dump del catálogo (formato de RAWG /games) a games.
+
+Etapas, por lotes de --batch-size juegos:
+1. Leer el archivo de forma incremental (memoria constante): NDJSON un
+   juego por línea, o JSON con un array de juegos (o {"results": [...]})
+2. Mapear cada juego con RAWGImporter.parse_game_data
+3. COPY del lote a una tabla temporal de staging (copy_records_to_table)
+4. Un solo INSERT ... SELECT ... ON CONFLICT desde staging a games, con la
+   misma regla que el importador (solo se reescriben filas que cambiaron)
+
+Cada lote es una transacción: si el proceso muere, los lotes anteriores
+quedan cargados y volver a correr el script es seguro.
+
+Uso:
+    python -m app.scripts.load_catalog_dump dump.ndjson
+    python -m app.scripts.load_catalog_dump dump.json.gz --batch-size 20000
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import IO, Iterator, List
+
+from sqlalchemy import Table, MetaData, Column, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.core.ids import uuid7
+from app.crud.game import assign_catalog_slugs, merge_staged_games
+from app.models.game import Game
+from app.scripts.rawg_importer import RAWGImporter
+
+STAGING_TABLE = "games_staging"
+READ_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+# Columnas que se copian a staging (y de ahí a games)
+STAGING_COLUMNS = (
+    "id",
+    "rawg_id",
+    "slug",
+    "name",
+    "description",
+    "price",
+    "stock",
+    "reserved",
+    "image_url",
+    "background_image",
+    "genres",
+    "platforms",
+    "rating",
+    "metacritic",
+    "released",
+    "is_active",
+    "created_at",
+    "updated_at",
+)
+
+staging = Table(
+    STAGING_TABLE,
+    MetaData(),
+    *(Column(name, Game.__table__.c[name].type) for name in STAGING_COLUMNS),
+)
+
+
+def open_dump(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def iter_ndjson(stream: IO[str]) -> Iterator[dict]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+class _JSONReader:
+    """
+    Lector incremental de JSON sobre un archivo de texto: decodifica un
+    valor a la vez leyendo chunks a medida que hacen falta. Solo el valor
+    actual y el chunk quedan en memoria.
+    """
+
+    def __init__(self, stream: IO[str]):
+        self._stream = stream
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Descarta lo ya leído y agrega un chunk; False al final del archivo"""
+        if self._eof:
+            return False
+        chunk = self._stream.read(READ_CHUNK_SIZE)
+        self._eof = not chunk
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return not self._eof
+
+    def peek(self) -> str:
+        """Siguiente carácter que no es espacio ("" al final del archivo)"""
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position] in " \t\r\n"
+            ):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._fill():
+                return ""
+
+    def expect(self, allowed: str) -> str:
+        """Consume el siguiente carácter, que debe ser uno de allowed"""
+        char = self.peek()
+        if not char or char not in allowed:
+            found = repr(char) if char else "end of file"
+            raise ValueError(
+                f"Invalid dump: expected one of {allowed!r}, found {found}"
+            )
+        self._position += 1
+        return char
+
+    def value(self):
+        """Decodifica el siguiente valor JSON completo"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Un número al final del buffer puede seguir en el próximo chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._position = end
+            return value
+
+
+def iter_json_array(stream: IO[str]) -> Iterator[dict]:
+    """
+    Recorre un array JSON grande juego por juego, leyendo el archivo en
+    chunks (memoria constante).
+
+    Acepta un array en la raíz o un objeto con la clave "results" (como la
+    respuesta de RAWG): las claves anteriores ("count", "filters", ...) se
+    leen y se descartan. Cualquier otra forma, o un elemento que no sea un
+    objeto, es un error.
+    """
+    reader = _JSONReader(stream)
+
+    if reader.expect("[{") == "{":
+        while True:
+            if reader.peek() != '"':
+                raise ValueError("Invalid dump: expected an object key")
+            key = reader.value()
+            reader.expect(":")
+            if key == "results":
+                reader.expect("[")
+                break
+            reader.value()
+            if reader.expect(",}") == "}":
+                raise ValueError('Invalid dump: object without a "results" key')
+
+    if reader.peek() == "]":
+        return
+
+    while True:
+        record = reader.value()
+        if not isinstance(record, dict):
+            raise ValueError(
+                f"Invalid dump: expected game objects, found {type(record).__name__}"
+            )
+        yield record
+        if reader.expect(",]") == "]":
+            return
+
+
+def iter_records(path: Path, file_format: str) -> Iterator[dict]:
+    with open_dump(path) as stream:
+        if file_format == "ndjson":
+            yield from iter_ndjson(stream)
+        else:
+            yield from iter_json_array(stream)
+
+
+def to_staging_row(game_data: dict, now: datetime) -> dict:
+    """Juego del dump -> fila con las columnas de STAGING_COLUMNS"""
+    row = RAWGImporter.parse_game_data(game_data)
+    if row["rating"] is not None:
+        row["rating"] = Decimal(str(row["rating"]))
+    row.update(id=uuid7(), reserved=0, created_at=now, updated_at=now)
+    return row
+
+
+def iter_batches(records: Iterator[dict], batch_size: int) -> Iterator[List[dict]]:
+    """
+    Lotes con rawg_id único (un duplicado reemplaza al anterior del lote).
+    Los slugs repetidos los resuelve assign_catalog_slugs al cargar.
+    """
+    now = datetime.now(timezone.utc)
+    batch = {}
+
+    for game_data in records:
+        row = to_staging_row(game_data, now)
+        batch[row["rawg_id"]] = row
+        if len(batch) >= batch_size:
+            yield list(batch.values())
+            batch = {}
+
+    if batch:
+        yield list(batch.values())
+
+
+async def load(path: Path, file_format: str, batch_size: int) -> None:
+    started = time.monotonic()
+    inserted = updated = unchanged = skipped = 0
+
+    # Una sola conexión para todo el load: la tabla temporal vive en ella
+    async with engine.connect() as connection, AsyncSession(
+        bind=connection, expire_on_commit=False
+    ) as db:
+        raw = await connection.get_raw_connection()
+        await db.execute(
+            text(
+                f"CREATE TEMP TABLE {STAGING_TABLE} " f"(LIKE games INCLUDING DEFAULTS)"
+            )
+        )
+        await db.commit()
+
+        for batch in iter_batches(iter_records(path, file_format), batch_size):
+            # La lectura de slugs abre la transacción del lote: el COPY
+            # (directo sobre asyncpg) y el merge quedan dentro de ella
+            rows, rejected = await assign_catalog_slugs(db, batch)
+            for row in rejected:
+                print(
+                    f"⚠️ Skipped rawg_id {row['rawg_id']}: slug {row['slug']!r} taken"
+                )
+            skipped += len(rejected)
+
+            await db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+            await raw.driver_connection.copy_records_to_table(
+                STAGING_TABLE,
+                records=[tuple(row[name] for name in STAGING_COLUMNS) for row in rows],
+                columns=STAGING_COLUMNS,
+            )
+
+            counts = await merge_staged_games(db, staging, len(rows))
+            await db.commit()
+
+            inserted += counts[0]
+            updated += counts[1]
+            unchanged += counts[2]
+            total = inserted + updated + unchanged
+            elapsed = max(time.monotonic() - started, 1e-6)
+            print(
+                f"   {total:>10,} rows | {inserted:,} new, {updated:,} updated, "
+                f"{unchanged:,} unchanged | {total / elapsed:,.0f} rows/s"
+            )
+
+    elapsed = time.monotonic() - started
+    print(f"✅ Loaded {inserted + updated + unchanged:,} games in {elapsed:.1f}s")
+    if skipped:
+        print(f"⚠️ {skipped:,} games skipped (slug already taken)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--format",
+        choices=("json", "ndjson"),
+        default=None,
+        help="Default: según la extensión (.ndjson/.jsonl -> ndjson)",
+    )
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    file_format = args.format
+    if file_format is None:
+        suffixes = [s for s in args.path.suffixes if s != ".gz"]
+        is_ndjson = suffixes and suffixes[-1] in (".ndjson", ".jsonl")
+        file_format = "ndjson" if is_ndjson else "json"
+
+    print(f"📦 Loading {args.path} ({file_format}, batches of {args.batch_size:,})")
+    try:
+        await load(args.path, file_format, args.batch_size)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,297 @@
+"""
+Mantenimiento de las particiones mensuales de orders y order_items.
+
+- Crea por adelantado las particiones de los próximos meses, para que las
+  órdenes nuevas nunca caigan en la partición DEFAULT. Si ya cayeron (el
+  cron no corrió a tiempo), las mueve a la partición nueva.
+- Opcionalmente retira los meses más antiguos que --retain-months:
+  los desconecta (DETACH) y los mueve a un schema de archivo, o los borra
+  con --drop. Los rollups de ventas no se tocan, así que los reportes
+  siguen incluyendo esos meses.
+
+Pensado para correr a diario (cron); es idempotente.
+
+Uso:
+    python -m app.scripts.manage_partitions --months-ahead 3
+    python -m app.scripts.manage_partitions --retain-months 24 --archive-schema archive
+    python -m app.scripts.manage_partitions --retain-months 24 --drop --dry-run
+"""
+
+import argparse
+import asyncio
+import re
+from datetime import date, datetime, time, timezone
+from typing import Optional
+from sqlalchemy import text
+from app.core.database import engine
+
+# Se crean en este orden y se retiran en el inverso (order_items -> orders)
+PARENTS = ("orders", "order_items")
+PARTITION_NAME = re.compile(r"^(orders|order_items)_p(\d{4})(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(parent: str, month: date) -> str:
+    return f"{parent}_p{month:%Y%m}"
+
+
+async def list_partitions(conn, parent: str) -> dict[date, str]:
+    """Particiones mensuales existentes de una tabla: {mes: nombre}"""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": parent},
+    )
+    partitions = {}
+    for (name,) in result:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[2]), int(match[3]), 1)] = name
+    return partitions
+
+
+def month_bounds(month: date) -> dict:
+    return {
+        "start": datetime(month.year, month.month, 1, tzinfo=timezone.utc),
+        "end": datetime.combine(add_months(month, 1), time(), tzinfo=timezone.utc),
+    }
+
+
+async def default_partition(conn, parent: str) -> Optional[str]:
+    """Nombre de la partición DEFAULT de una tabla (None si no tiene)"""
+    result = await conn.execute(
+        text(
+            "SELECT CAST(NULLIF(partdefid, 0) AS regclass)::text "
+            "FROM pg_partitioned_table "
+            "WHERE partrelid = CAST(:parent AS regclass)"
+        ),
+        {"parent": parent},
+    )
+    return result.scalar()
+
+
+async def count_default_rows(conn, month: date) -> int:
+    """Órdenes de ese mes que cayeron en la partición DEFAULT"""
+    default = await default_partition(conn, "orders")
+    if default is None:
+        return 0
+    result = await conn.execute(
+        text(
+            f"SELECT count(*) FROM {default} "
+            "WHERE created_at >= :start AND created_at < :end"
+        ),
+        month_bounds(month),
+    )
+    return result.scalar()
+
+
+async def drop_orders_foreign_keys(conn, name: str) -> None:
+    """
+    Quita a una tabla de items desconectada la FK hacia orders que heredó:
+    si no, impide desconectar después la partición de orders que referencia
+    """
+    result = await conn.execute(
+        text(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = CAST(:name AS regclass) AND contype = 'f' "
+            "AND confrelid = CAST('orders' AS regclass)"
+        ),
+        {"name": name},
+    )
+    for (constraint,) in result.all():
+        await conn.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"'))
+
+
+async def create_partition(conn, parent: str, month: date) -> None:
+    bounds = month_bounds(month)
+    await conn.execute(
+        text(
+            f"CREATE TABLE {partition_name(parent, month)} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{bounds['start'].isoformat()}') "
+            f"TO ('{bounds['end'].isoformat()}')"
+        )
+    )
+
+
+async def create_from_default(conn, parents: list[str], month: date) -> int:
+    """
+    Crea las particiones de un mes del que la DEFAULT ya tiene filas
+    (Postgres rechaza el CREATE ... PARTITION OF en ese caso): desconecta
+    las DEFAULT, crea las particiones, mueve las filas del mes y vuelve a
+    conectar las DEFAULT. Todo en la transacción de conn, que bloquea
+    orders y order_items hasta el commit.
+
+    Returns:
+        Filas movidas (órdenes e items)
+    """
+    defaults = {parent: await default_partition(conn, parent) for parent in PARENTS}
+
+    # order_items primero: su FK apunta a orders
+    for parent in reversed(PARENTS):
+        await conn.execute(
+            text(f"ALTER TABLE {parent} DETACH PARTITION {defaults[parent]}")
+        )
+    await drop_orders_foreign_keys(conn, defaults["order_items"])
+
+    for parent in parents:
+        await create_partition(conn, parent, month)
+
+    # orders primero: los items movidos validan su FK contra las órdenes
+    moved = 0
+    for parent in PARENTS:
+        result = await conn.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {defaults[parent]} "
+                "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+                f"INSERT INTO {parent} SELECT * FROM moved"
+            ),
+            month_bounds(month),
+        )
+        moved += result.rowcount
+
+    # Al conectarse, la DEFAULT de items recupera la FK de order_items
+    for parent in PARENTS:
+        await conn.execute(
+            text(f"ALTER TABLE {parent} ATTACH PARTITION {defaults[parent]} DEFAULT")
+        )
+    return moved
+
+
+async def create_future_partitions(months_ahead: int, dry_run: bool) -> int:
+    """
+    Crea las particiones del mes actual y los months_ahead siguientes.
+
+    Un mes por transacción, ambas tablas juntas. Si la DEFAULT ya recibió
+    órdenes de ese mes (p. ej. el cron dejó de correr), sus filas se
+    mueven a la partición nueva (ver create_from_default).
+    """
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    created = 0
+
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        async with engine.begin() as conn:
+            missing = [
+                parent
+                for parent in PARENTS
+                if month not in await list_partitions(conn, parent)
+            ]
+            if not missing:
+                continue
+
+            in_default = await count_default_rows(conn, month)
+            for parent in missing:
+                print(f"   ➕ {partition_name(parent, month)}")
+            if in_default:
+                print(f"      moving {in_default} orders out of the DEFAULT partition")
+            created += len(missing)
+            if dry_run:
+                continue
+
+            if in_default:
+                await create_from_default(conn, missing, month)
+            else:
+                for parent in missing:
+                    await create_partition(conn, parent, month)
+
+    return created
+
+
+async def retire_partitions(
+    retain_months: int, drop: bool, archive_schema: str, dry_run: bool
+) -> int:
+    """Desconecta (y archiva o borra) los meses anteriores a la retención"""
+    cutoff = add_months(
+        datetime.now(timezone.utc).date().replace(day=1), -retain_months
+    )
+
+    async with engine.connect() as conn:
+        months = sorted(
+            month for month in await list_partitions(conn, "orders") if month < cutoff
+        )
+
+    for month in months:
+        print(
+            f"   📦 {month:%Y-%m}: {'drop' if drop else f'archive to {archive_schema}'}"
+        )
+        if dry_run:
+            continue
+
+        # Un mes por transacción: los DETACH bloquean brevemente las tablas
+        async with engine.begin() as conn:
+            if not drop:
+                await conn.execute(
+                    text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}")
+                )
+
+            for parent in reversed(PARENTS):
+                name = partition_name(parent, month)
+                exists = (
+                    await conn.execute(
+                        text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}
+                    )
+                ).scalar()
+                if not exists:
+                    continue
+
+                await conn.execute(
+                    text(f"ALTER TABLE {parent} DETACH PARTITION {name}")
+                )
+
+                await drop_orders_foreign_keys(conn, name)
+
+                if drop:
+                    await conn.execute(text(f"DROP TABLE {name}"))
+                else:
+                    await conn.execute(
+                        text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}")
+                    )
+
+    return len(months)
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--months-ahead", type=int, default=3)
+    parser.add_argument(
+        "--retain-months",
+        type=int,
+        default=None,
+        help="Meses completos a conservar (sin valor: no se retira nada)",
+    )
+    parser.add_argument("--drop", action="store_true", help="Borrar en vez de archivar")
+    parser.add_argument("--archive-schema", default="archive")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.archive_schema and not re.match(r"^[a-z_][a-z0-9_]*$", args.archive_schema):
+        parser.error("--archive-schema must be a plain lowercase identifier")
+
+    try:
+        print("🗓️  Creating future partitions")
+        created = await create_future_partitions(args.months_ahead, args.dry_run)
+        print(f"   {created} partitions created")
+
+        if args.retain_months is not None:
+            print(f"🧹 Retiring months older than {args.retain_months} months")
+            retired = await retire_partitions(
+                args.retain_months, args.drop, args.archive_schema, args.dry_run
+            )
+            print(f"   {retired} months retired")
+
+        print("✅ Done" + (" (dry run)" if args.dry_run else ""))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,326 @@
+"""
+Cliente HTTP para RAWG API.
+
+El comportamiento de red se arma apilando transports de httpx, de modo que
+cada capa se puede probar por separado y el importador no sabe nada de
+reintentos ni de cuotas:
+
+    DiskCacheTransport -> RetryTransport -> RateLimitTransport
+        -> AsyncHTTPTransport (pool)
+
+Un hit del cache no consume cuota ni toca la red.
+
+Para probar sin red se reemplaza la capa base por un httpx.MockTransport
+(ver replay_transport y app.scripts.check_rawg_importer, que lo usa con
+las páginas grabadas de app/scripts/fixtures/rawg).
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Callable, Mapping, Optional
+from urllib.parse import urlencode
+
+import httpx
+
+from app.core.config import settings
+
+# Respuestas que vale la pena reintentar
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Respuestas que se guardan en el cache (404 marca el final de las páginas)
+CACHEABLE_STATUSES = frozenset({200, 404})
+
+# Parámetros que no forman parte de la llave del cache
+UNCACHED_PARAMS = frozenset({"key"})
+
+
+class TokenBucket:
+    """
+    Rate limiter de token bucket.
+
+    Se recargan `rate` tokens por segundo hasta `capacity`; cada request
+    consume uno y espera si el bucket está vacío. Permite ráfagas cortas
+    sin pasar del promedio configurado.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Espera hasta que haya un token disponible y lo consume"""
+        # El lock mantiene el orden de llegada: nadie se adelanta a quien
+        # ya está esperando su token
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RateLimitTransport(httpx.AsyncBaseTransport):
+    """Toma un token del bucket antes de cada request (reintentos incluidos)"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, bucket: TokenBucket):
+        self.transport = transport
+        self.bucket = bucket
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self.bucket.acquire()
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """
+    Reintenta requests fallidos con backoff exponencial y jitter completo:
+    espera un valor aleatorio entre 0 y min(max_backoff, base * 2^intento).
+    Si la respuesta trae Retry-After (429), se respeta ese valor.
+
+    Solo para requests idempotentes (el importador únicamente hace GET).
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_retries: int,
+        backoff_base: float,
+        max_backoff: float,
+    ):
+        self.transport = transport
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.retries = 0  # Total de reintentos hechos (para el reporte)
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_backoff)
+
+        return random.uniform(0, min(self.max_backoff, self.backoff_base * 2**attempt))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                delay = self._delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    return response
+                delay = self._delay(attempt, response)
+                await response.aclose()
+
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class DiskCacheTransport(httpx.AsyncBaseTransport):
+    """
+    Cache en disco de respuestas GET.
+
+    La llave es el SHA-256 de método, URL y parámetros ordenados, sin la
+    API key: el mismo request da el mismo archivo en cualquier máquina.
+    Cada entrada es un JSON comprimido con gzip ({status, body}) en
+    <directorio>/<2 primeros caracteres>/<hash>.json.gz.
+
+    Args:
+        transport: Capa a la que se delega en un miss
+        directory: Directorio del cache
+        max_age: Segundos de validez de una entrada (None: no vencen)
+        offline: Solo replay; un miss responde 504 sin tocar la red
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        directory: str,
+        max_age: Optional[float] = None,
+        offline: bool = False,
+    ):
+        self.transport = transport
+        self.directory = Path(directory)
+        self.max_age = max_age
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(request: httpx.Request) -> str:
+        params = sorted(
+            (name, value)
+            for name, value in request.url.params.multi_items()
+            if name not in UNCACHED_PARAMS
+        )
+        raw = (
+            f"{request.method} {request.url.copy_with(query=None)}?{urlencode(params)}"
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def _read(self, path: Path) -> Optional[dict]:
+        try:
+            if not self.offline and self.max_age is not None:
+                if time.time() - path.stat().st_mtime > self.max_age:
+                    return None
+            return json.loads(gzip.decompress(path.read_bytes()))
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: Path, entry: dict) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escribir aparte y renombrar: un lector nunca ve un archivo a medias
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(gzip.compress(json.dumps(entry).encode(), compresslevel=6))
+        os.replace(tmp, path)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self.transport.handle_async_request(request)
+
+        path = self._path(self.cache_key(request))
+        entry = await asyncio.to_thread(self._read, path)
+        if entry is not None:
+            self.hits += 1
+            return httpx.Response(
+                entry["status"],
+                content=entry["body"].encode(),
+                headers={"Content-Type": "application/json", "X-Cache": "hit"},
+                request=request,
+            )
+
+        self.misses += 1
+        if self.offline:
+            return httpx.Response(
+                504,
+                json={"detail": "Not in cache (offline mode)."},
+                request=request,
+            )
+
+        response = await self.transport.handle_async_request(request)
+        if response.status_code in CACHEABLE_STATUSES:
+            body = await response.aread()
+            await asyncio.to_thread(
+                self._write,
+                path,
+                {"status": response.status_code, "body": body.decode()},
+            )
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def build_transport(
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    concurrency: Optional[int] = None,
+    rate_per_second: Optional[float] = None,
+) -> RetryTransport:
+    """
+    Apila reintentos y rate limit sobre la capa base.
+
+    Args:
+        transport: Capa base (default: pool de conexiones real). En tests,
+            un httpx.MockTransport
+        concurrency: Conexiones del pool (default: RAWG_CONCURRENCY)
+        rate_per_second: Requests/s sostenidos (default: RAWG_RATE_PER_SECOND)
+    """
+    concurrency = concurrency or settings.RAWG_CONCURRENCY
+    rate_per_second = rate_per_second or settings.RAWG_RATE_PER_SECOND
+
+    if transport is None:
+        # Un keep-alive por worker: las páginas reutilizan la conexión TLS.
+        # retries=0 porque los reintentos los maneja RetryTransport
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency,
+                keepalive_expiry=30.0,
+            ),
+            retries=0,
+        )
+
+    bucket = TokenBucket(rate_per_second, max(settings.RAWG_BURST, 1))
+    return RetryTransport(
+        RateLimitTransport(transport, bucket),
+        max_retries=settings.RAWG_MAX_RETRIES,
+        backoff_base=settings.RAWG_BACKOFF_BASE_SECONDS,
+        max_backoff=settings.RAWG_MAX_BACKOFF_SECONDS,
+    )
+
+
+def build_client(transport: httpx.AsyncBaseTransport) -> httpx.AsyncClient:
+    """
+    Crea el cliente compartido para RAWG sobre un transport de
+    build_transport (opcionalmente envuelto en DiskCacheTransport)
+    """
+    return httpx.AsyncClient(
+        base_url=settings.RAWG_BASE_URL,
+        transport=transport,
+        timeout=httpx.Timeout(30.0, connect=10.0),
+        headers={"User-Agent": f"{settings.PROJECT_NAME}/{settings.VERSION}"},
+    )
+
+
+def replay_transport(
+    pages: Mapping[int, dict], details: Optional[Mapping[int, dict]] = None
+) -> httpx.MockTransport:
+    """
+    Transport offline que responde /games con páginas grabadas.
+
+    Args:
+        pages: {número de página: JSON de la respuesta de /games}. Las
+            páginas que no estén responden 404, como RAWG al pasar la última
+        details: {rawg_id: JSON de /games/{id}} (opcional)
+    """
+    details = details or {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        last = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        if last.lstrip("-").isdigit() and int(last) in details:
+            return httpx.Response(200, json=details[int(last)])
+        if not request.url.path.endswith("/games"):
+            return httpx.Response(404, json={"detail": "Not found."})
+
+        page = int(request.url.params.get("page", 1))
+        if page not in pages:
+            return httpx.Response(404, json={"detail": "Invalid page."})
+        return httpx.Response(200, json=pages[page])
+
+    return httpx.MockTransport(handler)
@@ -1,26 +1,123 @@
 """
 Script para importar videojuegos desde RAWG API.
 Obtiene juegos populares y los guarda en la base de datos.
+
+Las páginas se descargan en paralelo (RAWG_CONCURRENCY) respetando la cuota
+con un token bucket y reintentando 429/5xx con backoff (ver rawg_client).
+Con RAWG_CACHE_DIR (o --cache-dir) las respuestas quedan en disco y un
+re-import no gasta cuota; --offline responde solo desde ese cache.
+
+Cada página guardada avanza un checkpoint (tabla sync_state) en la misma
+transacción: si el proceso muere, la siguiente ejecución retoma desde ahí.
+
+Uso:
+    python -m app.scripts.rawg_importer --limit 100
+    python -m app.scripts.rawg_importer                  # catálogo completo
+    python -m app.scripts.rawg_importer --incremental    # cambios desde el último sync
+    python -m app.scripts.rawg_importer --since 2026-01-01
+    python -m app.scripts.rawg_importer --restart        # ignora el checkpoint
+    python -m app.scripts.rawg_importer --details --cache-dir .rawg-cache
+    python -m app.scripts.rawg_importer --offline --cache-dir .rawg-cache
 """
 
+import argparse
 import asyncio
+import sys
+import time
 import httpx
-from datetime import datetime
+from datetime import date, datetime, timezone
 from decimal import Decimal
-from sqlalchemy import select
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal
-from app.models.game import Game
+from app.crud.game import upsert_games, get_described_rawg_ids
+from app.crud.sync_state import (
+    STATUS_RUNNING,
+    get_sync_state,
+    start_sync,
+    checkpoint_sync,
+    finish_sync,
+)
+from app.scripts.rawg_client import DiskCacheTransport, build_client, build_transport
+
+SYNC_NAME = "rawg_games"
+INCREMENTAL_ORDERING = "-updated"
+
+
+class ImportProgress:
+    """Contadores del import y reporte de throughput"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.pages = 0
+        self.failed_pages = 0
+        self.fetched = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = 0
+
+    @property
+    def written(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def report(self, page: int, games: int) -> None:
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        print(
+            f"📄 Page {page}: {games} games | {self.inserted} new, "
+            f"{self.updated} updated, {self.unchanged} unchanged | "
+            f"{self.pages / elapsed:.1f} pages/s, "
+            f"{self.fetched / elapsed:.1f} games/s"
+        )
 
 
 class RAWGImporter:
     """Importador de datos desde RAWG API"""
 
-    def __init__(self):
-        self.base_url = settings.RAWG_BASE_URL
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        concurrency: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_age: Optional[float] = None,
+        offline: Optional[bool] = None,
+        sync_name: str = SYNC_NAME,
+    ):
+        """
+        Args:
+            transport: Capa HTTP base; un httpx.MockTransport permite
+                importar sin red (ver rawg_client.replay_transport)
+            concurrency: Requests simultáneos (default: RAWG_CONCURRENCY)
+            rate_per_second: Cuota de requests/s (default: RAWG_RATE_PER_SECOND)
+            cache_dir: Cache en disco de respuestas (default: RAWG_CACHE_DIR)
+            cache_max_age: Validez del cache en segundos
+                (default: RAWG_CACHE_MAX_AGE_SECONDS)
+            offline: Solo replay desde el cache (default: RAWG_CACHE_OFFLINE)
+            sync_name: Fila de sync_state del checkpoint (otro nombre para
+                no pisar el del import real, p. ej. check_rawg_importer)
+        """
         self.api_key = settings.RAWG_API_KEY
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.sync_name = sync_name
+        self.concurrency = concurrency or settings.RAWG_CONCURRENCY
+        self.transport = build_transport(transport, self.concurrency, rate_per_second)
+        self.semaphore = asyncio.BoundedSemaphore(self.concurrency)
+
+        cache_dir = cache_dir or settings.RAWG_CACHE_DIR
+        offline = settings.RAWG_CACHE_OFFLINE if offline is None else offline
+        if offline and not cache_dir:
+            raise ValueError("Offline mode requires a cache directory")
+
+        self.cache = None
+        if cache_dir:
+            self.cache = DiskCacheTransport(
+                self.transport,
+                cache_dir,
+                max_age=cache_max_age or settings.RAWG_CACHE_MAX_AGE_SECONDS,
+                offline=offline,
+            )
+        self.client = build_client(self.cache or self.transport)
 
     async def close(self):
         """Cerrar cliente HTTP"""
@@ -31,6 +128,7 @@ class RAWGImporter:
         page: int = 1,
         page_size: int = 40,
         ordering: str = "-rating",
+        since: Optional[datetime] = None,
     ) -> dict:
         """
         Obtiene juegos desde RAWG API.
@@ -39,24 +137,74 @@ class RAWGImporter:
             page: Número de página
             page_size: Cantidad de juegos por página (max 40)
             ordering: Ordenamiento (-rating, -released, etc)
+            since: Solo juegos actualizados desde ese día (filtro updated)
 
         Returns:
             Respuesta JSON de la API
         """
-        url = f"{self.base_url}/games"
         params = {
             "key": self.api_key,
             "page": page,
             "page_size": page_size,
             "ordering": ordering,
         }
+        if since is not None:
+            # RAWG filtra por rango de días, ambos inclusive
+            today = datetime.now(timezone.utc).date()
+            params["updated"] = f"{since.date().isoformat()},{today.isoformat()}"
 
-        print(f"📡 Fetching page {page} from RAWG API...")
-        response = await self.client.get(url, params=params)
+        async with self.semaphore:
+            response = await self.client.get("/games", params=params)
         response.raise_for_status()
         return response.json()
 
-    def calculate_price(self, game_data: dict) -> Decimal:
+    async def fetch_game_detail(self, rawg_id: int) -> dict:
+        """
+        Obtiene el detalle de un juego (/games/{id}). Es el único endpoint
+        que trae description_raw; el listado no la incluye.
+        """
+        async with self.semaphore:
+            response = await self.client.get(
+                f"/games/{rawg_id}", params={"key": self.api_key}
+            )
+        response.raise_for_status()
+        return response.json()
+
+    async def add_details(self, db: AsyncSession, games_data: list) -> list:
+        """
+        Completa description_raw de los juegos de una página que aún no
+        tienen description guardada (los demás no gastan requests).
+        Un detalle que falla deja el juego sin description.
+        """
+        described = await get_described_rawg_ids(
+            db, [game_data["id"] for game_data in games_data]
+        )
+        missing = [
+            game_data for game_data in games_data if game_data["id"] not in described
+        ]
+
+        details = await asyncio.gather(
+            *(self.fetch_game_detail(game_data["id"]) for game_data in missing),
+            return_exceptions=True,
+        )
+        by_id = {}
+        for game_data, detail in zip(missing, details):
+            if isinstance(detail, Exception):
+                print(f"⚠️ Detail for {game_data['name']} failed: {detail!r}")
+                continue
+            by_id[game_data["id"]] = detail.get("description_raw")
+
+        return [
+            (
+                {**game_data, "description_raw": by_id[game_data["id"]]}
+                if game_data["id"] in by_id
+                else game_data
+            )
+            for game_data in games_data
+        ]
+
+    @staticmethod
+    def calculate_price(game_data: dict) -> Decimal:
         """
         Calcula un precio basado en el rating y metacritic del juego.
 
@@ -66,9 +214,12 @@ class RAWGImporter:
         - Juegos con metacritic 70-80: $39.99
         - Juegos con rating >4.5: $44.99
         - Otros: $29.99
+
+        Solo aplica a juegos nuevos: un re-import no cambia el precio de los
+        que ya existen.
         """
         metacritic = game_data.get("metacritic")
-        rating = game_data.get("rating", 0)
+        rating = game_data.get("rating") or 0
 
         if metacritic and metacritic >= 90:
             return Decimal("59.99")
@@ -81,7 +232,8 @@ class RAWGImporter:
         else:
             return Decimal("29.99")
 
-    def parse_game_data(self, game_data: dict) -> dict:
+    @staticmethod
+    def parse_game_data(game_data: dict) -> dict:
         """
         Transforma datos de RAWG a formato de nuestro modelo.
 
@@ -99,19 +251,11 @@ class RAWGImporter:
             except ValueError:
                 pass
 
-        # Extraer géneros
-        genres = [
-            {"id": genre["id"], "name": genre["name"]}
-            for genre in game_data.get("genres", [])
-        ]
-
-        # Extraer plataformas
+        # Extraer géneros y plataformas (solo nombres: columnas ARRAY(String))
+        genres = [genre["name"] for genre in game_data.get("genres") or []]
         platforms = [
-            {
-                "id": platform["platform"]["id"],
-                "name": platform["platform"]["name"],
-            }
-            for platform in game_data.get("platforms", [])
+            platform["platform"]["name"]
+            for platform in game_data.get("platforms") or []
         ]
 
         return {
@@ -119,7 +263,7 @@ class RAWGImporter:
             "slug": game_data["slug"],
             "name": game_data["name"],
             "description": game_data.get("description_raw"),  # Texto plano
-            "price": self.calculate_price(game_data),
+            "price": RAWGImporter.calculate_price(game_data),
             "stock": 100,  # Stock inicial
             "image_url": game_data.get("background_image"),
             "background_image": game_data.get("background_image"),
@@ -131,95 +275,306 @@ class RAWGImporter:
             "is_active": True,
         }
 
+    @staticmethod
+    def _last_updated(games_data: list) -> Optional[datetime]:
+        """Mayor fecha 'updated' de una página (UTC)"""
+        values = []
+        for game_data in games_data:
+            try:
+                updated = datetime.fromisoformat(game_data["updated"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if updated.tzinfo is None:
+                updated = updated.replace(tzinfo=timezone.utc)
+            values.append(updated)
+        return max(values, default=None)
+
+    async def _save_page(
+        self, db: AsyncSession, games_data: list, checkpoint: int
+    ) -> tuple:
+        """
+        Guarda una página completa con un solo upsert y avanza el checkpoint
+        en la misma transacción.
+
+        Returns:
+            Tuple de (insertados, actualizados, sin cambios, descartados)
+        """
+        *counts, skipped = await upsert_games(
+            db, [self.parse_game_data(game_data) for game_data in games_data]
+        )
+        for row in skipped:
+            print(f"⚠️ Skipped rawg_id {row['rawg_id']}: slug {row['slug']!r} taken")
+        await checkpoint_sync(
+            db, self.sync_name, checkpoint, self._last_updated(games_data), sum(counts)
+        )
+        await db.commit()
+        return (*counts, len(skipped))
+
     async def import_games(
         self,
         db: AsyncSession,
-        total_games: int = 100,
+        total_games: Optional[int] = None,
         page_size: int = 40,
-    ):
+        ordering: str = "-rating",
+        incremental: bool = False,
+        since: Optional[datetime] = None,
+        restart: bool = False,
+        fetch_details: bool = False,
+    ) -> ImportProgress:
         """
         Importa juegos desde RAWG a la base de datos.
 
+        Si la ejecución anterior quedó a medias (sync_state en 'running'),
+        la retoma con sus mismos parámetros desde la página siguiente al
+        checkpoint, salvo restart=True. Los juegos ya guardados por esa
+        ejecución (sync_state.written) cuentan contra su límite: retomar
+        un --limit N nunca importa más de N en total. Las páginas guardadas
+        después de un hueco se vuelven a pedir y cuentan de nuevo, así que
+        el total puede quedar por debajo de N, nunca por encima.
+
+        Mantiene hasta 2 * concurrency páginas en vuelo (el semáforo limita
+        los requests simultáneos; el resto queda listo para la siguiente
+        ranura) y las guarda a medida que llegan. Como llegan en desorden,
+        el checkpoint solo avanza hasta la última página sin huecos antes de
+        ella. Una página que falla tras agotar los reintentos se reporta y
+        el import continúa, pero la ejecución queda abierta para retomarse;
+        el final del catálogo (página vacía o 404) o una racha de 2 *
+        concurrency páginas fallidas seguidas (RAWG caído, o un miss en
+        modo offline) detiene el envío de páginas nuevas.
+
         Args:
             db: Sesión de base de datos
-            total_games: Total de juegos a importar
+            total_games: Máximo de juegos a importar (None: todos)
             page_size: Juegos por página (max 40)
-        """
-        imported_count = 0
-        skipped_count = 0
-        page = 1
+            ordering: Ordenamiento de un import completo
+            incremental: Solo juegos actualizados desde el último sync
+                completo (ordenados por -updated)
+            since: Solo juegos actualizados desde esa fecha (implica incremental)
+            restart: Ignorar el checkpoint y empezar desde la página 1
+            fetch_details: Pedir /games/{id} de los juegos sin description
 
-        print(f"🎮 Starting import of {total_games} games from RAWG...")
-
-        while imported_count < total_games:
-            try:
-                # Obtener datos de la API
-                data = await self.fetch_games(
-                    page=page,
-                    page_size=page_size,
-                )
+        Returns:
+            Contadores del import
 
-                games_data = data.get("results", [])
-                if not games_data:
-                    print("⚠️ No more games available from API")
+        Raises:
+            Cualquier error que no sea de una página (base de datos, etc.),
+            después de hacer rollback e imprimir el resumen
+        """
+        progress = ImportProgress()
+        state = await get_sync_state(db, self.sync_name)
+
+        if state and state.status == STATUS_RUNNING and not restart:
+            print(
+                f"⏯️  Resuming previous sync after page {state.last_page} "
+                f"(ordering={state.ordering}, since={state.since})"
+            )
+        else:
+            if incremental or since:
+                since = since or (state.synced_until if state else None)
+                if since is None:
+                    print("⚠️ No previous completed sync: importing the full catalog")
+                ordering = INCREMENTAL_ORDERING
+            state = await start_sync(
+                db, self.sync_name, ordering, page_size, since, total_games
+            )
+
+        ordering, page_size, since = state.ordering, state.page_size, state.since
+        total_games = state.limit
+        written_before = state.written
+        checkpoint = state.last_page
+        saved_pages = set()
+        pending = {}
+        next_page = checkpoint + 1
+        exhausted = False
+        failure_streak = 0
+
+        def remaining() -> Optional[int]:
+            if total_games is None:
+                return None
+            return max(total_games - written_before - progress.written, 0)
+
+        print(
+            f"🎮 Starting import of {total_games or 'all'} games from RAWG "
+            f"({self.concurrency} concurrent requests)..."
+        )
+
+        try:
+            while True:
+                while (
+                    not exhausted
+                    and (remaining() is None or remaining() > 0)
+                    and len(pending) < 2 * self.concurrency
+                ):
+                    task = asyncio.create_task(
+                        self.fetch_games(
+                            page=next_page,
+                            page_size=page_size,
+                            ordering=ordering,
+                            since=since,
+                        )
+                    )
+                    pending[task] = next_page
+                    next_page += 1
+
+                if not pending:
                     break
 
-                for game_data in games_data:
-                    if imported_count >= total_games:
-                        break
-
-                    # Verificar si ya existe
-                    stmt = select(Game).where(Game.rawg_id == game_data["id"])
-                    result = await db.execute(stmt)
-                    existing_game = result.scalar_one_or_none()
-
-                    if existing_game:
-                        skipped_count += 1
-                        print(f"⏭️  Skipped: {game_data['name']} (already exists)")
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    page = pending.pop(task)
+
+                    try:
+                        data = task.result()
+                    except httpx.HTTPError as e:
+                        if (
+                            isinstance(e, httpx.HTTPStatusError)
+                            and e.response.status_code == 404
+                        ):
+                            exhausted = True
+                            continue
+                        progress.failed_pages += 1
+                        failure_streak += 1
+                        print(f"❌ Page {page} failed: {e!r}")
+                        if failure_streak >= 2 * self.concurrency and not exhausted:
+                            print(
+                                f"⚠️ {failure_streak} failed pages in a row: stopping"
+                            )
+                            exhausted = True
                         continue
 
-                    # Parsear y crear juego
-                    parsed_data = self.parse_game_data(game_data)
-                    game = Game(**parsed_data)
-
-                    db.add(game)
-                    imported_count += 1
-                    print(f"✅ Imported: {game.name} (${game.price})")
-
-                # Commit después de cada página
-                await db.commit()
-                page += 1
-
-                # Delay para respetar rate limits (20k/month = ~666/day)
-                await asyncio.sleep(0.5)
-
-            except httpx.HTTPStatusError as e:
-                print(f"❌ HTTP Error: {e}")
-                break
-            except Exception as e:
-                print(f"❌ Error importing games: {e}")
-                await db.rollback()
-                break
-
+                    failure_streak = 0
+
+                    games_data = data.get("results", [])[: remaining()]
+                    if not games_data or not data.get("next"):
+                        exhausted = True
+
+                    saved_pages.add(page)
+                    while checkpoint + 1 in saved_pages:
+                        checkpoint += 1
+
+                    if fetch_details:
+                        games_data = await self.add_details(db, games_data)
+
+                    progress.pages += 1
+                    progress.fetched += len(games_data)
+                    inserted, updated, unchanged, skipped = await self._save_page(
+                        db, games_data, checkpoint
+                    )
+                    progress.inserted += inserted
+                    progress.updated += updated
+                    progress.unchanged += unchanged
+                    progress.skipped += skipped
+                    progress.report(page, len(games_data))
+
+            if progress.failed_pages:
+                print(f"⚠️ Sync left open at page {checkpoint}: run again to resume")
+            else:
+                await finish_sync(
+                    db, self.sync_name, advance_watermark=total_games is None
+                )
+        except Exception as e:
+            print(f"❌ Error importing games: {e}")
+            await db.rollback()
+            raise
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self._print_summary(progress)
+
+        return progress
+
+    def _print_summary(self, progress: ImportProgress) -> None:
+        elapsed = time.monotonic() - progress.started
         print(f"\n📊 Import Summary:")
-        print(f"   ✅ Imported: {imported_count}")
-        print(f"   ⏭️  Skipped: {skipped_count}")
-        print(f"   📦 Total in DB: {imported_count + skipped_count}")
-
-
-async def main():
-    """Función principal para ejecutar el script"""
-    importer = RAWGImporter()
+        print(f"   ✅ Inserted: {progress.inserted}")
+        print(f"   🔄 Updated: {progress.updated}")
+        print(f"   ⏸️  Unchanged: {progress.unchanged}")
+        if progress.skipped:
+            print(f"   ⚠️ Skipped (slug taken): {progress.skipped}")
+        print(f"   📄 Pages: {progress.pages} ({progress.failed_pages} failed)")
+        print(f"   🔁 Retries: {self.transport.retries}")
+        if self.cache:
+            print(f"   💾 Cache: {self.cache.hits} hits, {self.cache.misses} misses")
+        print(
+            f"   ⏱️  {elapsed:.1f}s, "
+            f"{progress.fetched / max(elapsed, 1e-6):.1f} games/s"
+        )
+
+
+async def main() -> int:
+    """
+    Función principal para ejecutar el script.
+
+    Returns:
+        Exit code: 0 si el sync terminó, 1 si quedó abierto por páginas
+        fallidas (un error inesperado se propaga y también sale con 1)
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Máximo de juegos (default: todos)"
+    )
+    parser.add_argument("--page-size", type=int, default=40)
+    parser.add_argument("--ordering", default="-rating")
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument(
+        "--since",
+        type=date.fromisoformat,
+        default=None,
+        help="YYYY-MM-DD: solo juegos actualizados desde ese día",
+    )
+    parser.add_argument("--restart", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument(
+        "--details",
+        action="store_true",
+        help="Pedir /games/{id} para obtener la description",
+    )
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--cache-max-age", type=int, default=None, help="Segundos")
+    parser.add_argument("--offline", action="store_true", default=None)
+    args = parser.parse_args()
+
+    if args.offline and not (args.cache_dir or settings.RAWG_CACHE_DIR):
+        parser.error("--offline requires --cache-dir or RAWG_CACHE_DIR")
+
+    since = (
+        datetime.combine(args.since, datetime.min.time(), timezone.utc)
+        if args.since
+        else None
+    )
+    importer = RAWGImporter(
+        concurrency=args.concurrency,
+        cache_dir=args.cache_dir,
+        cache_max_age=args.cache_max_age,
+        offline=args.offline,
+    )
 
     try:
         async with AsyncSessionLocal() as db:
-            # Importar 100 juegos populares
-            await importer.import_games(db, total_games=100)
+            progress = await importer.import_games(
+                db,
+                total_games=args.limit,
+                page_size=min(args.page_size, 40),
+                ordering=args.ordering,
+                incremental=args.incremental,
+                since=since,
+                restart=args.restart,
+                fetch_details=args.details,
+            )
     finally:
         await importer.close()
 
+    if progress.failed_pages:
+        return 1
+
     print("\n🎉 Import completed!")
+    return 0
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,73 @@
+"""
+Recalcula los rollups de ventas desde el historial de órdenes.
+
+Procesa el rango en tramos de --chunk-days días, cada uno en su propia
+transacción: los checkouts solo esperan mientras se recalcula el tramo
+actual, no durante todo el rebuild.
+
+Uso:
+    python -m app.scripts.rebuild_sales_rollups
+    python -m app.scripts.rebuild_sales_rollups --from 2025-01-01 --to 2025-06-30
+    python -m app.scripts.rebuild_sales_rollups --chunk-days 7
+"""
+
+import argparse
+import asyncio
+from datetime import date, timedelta
+from sqlalchemy import select, func
+from app.core.database import AsyncSessionLocal, engine
+from app.crud import sales_stats as crud_sales_stats
+from app.crud.sales_stats import sales_day
+from app.models.order import Order
+
+
+async def rebuild(date_from: date | None, date_to: date | None, chunk_days: int):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(func.min(Order.created_at), func.max(Order.created_at))
+        )
+        first, last = result.one()
+
+    if first is None and (date_from is None or date_to is None):
+        print("ℹ️  No orders found, nothing to rebuild")
+        return
+
+    date_from = date_from or sales_day(first)
+    date_to = date_to or sales_day(last)
+
+    print(
+        f"📊 Rebuilding sales rollups {date_from} → {date_to} ({chunk_days}-day chunks)"
+    )
+
+    start = date_from
+    total_days = 0
+    while start <= date_to:
+        end = min(start + timedelta(days=chunk_days), date_to + timedelta(days=1))
+        async with AsyncSessionLocal() as db:
+            days = await crud_sales_stats.rebuild_rollups(db, start, end)
+        total_days += days
+        print(f"   {start} → {end - timedelta(days=1)}: {days} days with sales")
+        start = end
+
+    print(f"✅ Done: {total_days} days with sales")
+
+
+def parse_date(value: str) -> date:
+    return date.fromisoformat(value)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--from", dest="date_from", type=parse_date, default=None)
+    parser.add_argument("--to", dest="date_to", type=parse_date, default=None)
+    parser.add_argument("--chunk-days", type=int, default=7)
+    args = parser.parse_args()
+
+    try:
+        await rebuild(args.date_from, args.date_to, args.chunk_days)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
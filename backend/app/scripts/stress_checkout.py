@@ -0,0 +1,170 @@
+"""
+Prueba de concurrencia del checkout: verifica que no haya sobreventa.
+
+Crea dos juegos con stock limitado y muchos usuarios con el mismo carrito
+(ambos juegos, en orden distinto para forzar bloqueos cruzados), lanza
+todos los checkouts en paralelo y comprueba que:
+- el stock final y las unidades reservadas nunca son negativos
+- nunca se venden más unidades que el stock inicial
+- unidades vendidas == stock inicial - stock final
+- no hubo deadlocks ni errores inesperados
+
+Si alguna comprobación falla, termina con exit code 1 (sirve como paso de
+CI contra un Postgres con las migraciones aplicadas).
+
+Uso:
+    python -m app.scripts.stress_checkout --users 200 --stock 50
+
+En CI:
+    alembic upgrade head
+    python -m app.scripts.stress_checkout --users 200 --stock 50
+"""
+
+import argparse
+import asyncio
+import sys
+import uuid
+from decimal import Decimal
+from sqlalchemy import select, delete
+from app.core.database import AsyncSessionLocal, engine
+from app.crud import order as crud_order
+from app.models.user import User
+from app.models.game import Game
+from app.models.cart import Cart, CartItem
+from app.schemas.order import OrderCreate, ShippingAddress
+
+SHIPPING = OrderCreate(
+    shipping_address=ShippingAddress(
+        street="Stress 1", city="Test", country="MX", postal_code="00000"
+    )
+)
+
+
+async def setup(users: int, stock: int, quantity: int):
+    """Crea juegos, usuarios y carritos de prueba"""
+    run_id = uuid.uuid4().hex[:8]
+
+    async with AsyncSessionLocal() as db:
+        games = [
+            Game(
+                rawg_id=-(uuid.uuid4().int % 2**31),  # IDs negativos: fuera de RAWG
+                slug=f"stress-{run_id}-{i}",
+                name=f"Stress Game {run_id} {i}",
+                price=Decimal("9.99"),
+                stock=stock,
+            )
+            for i in range(2)
+        ]
+        db.add_all(games)
+
+        users_created = []
+        for i in range(users):
+            user = User(
+                email=f"stress-{run_id}-{i}@example.com",
+                password_hash="x",
+                full_name="Stress User",
+            )
+            cart = Cart(user=user)
+            # Orden alterno de líneas para provocar bloqueos cruzados
+            ordered = games if i % 2 == 0 else list(reversed(games))
+            cart.items = [
+                CartItem(game=game, quantity=quantity, price_at_addition=game.price)
+                for game in ordered
+            ]
+            db.add(user)
+            users_created.append(user)
+
+        await db.commit()
+        return run_id, [game.id for game in games], [user.id for user in users_created]
+
+
+async def checkout(user_id: uuid.UUID) -> str:
+    """Ejecuta un checkout en su propia sesión"""
+    async with AsyncSessionLocal() as db:
+        try:
+            await crud_order.create_order_from_cart(db, user_id, SHIPPING)
+            return "ok"
+        except ValueError:
+            return "out_of_stock"
+        except Exception as e:
+            await db.rollback()
+            return f"error: {type(e).__name__}"
+
+
+async def cleanup(game_ids, user_ids):
+    async with AsyncSessionLocal() as db:
+        await crud_order.delete_user_orders(db, user_ids)
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.execute(delete(Game).where(Game.id.in_(game_ids)))
+        await db.commit()
+
+
+def check(results, final_stocks, initial_stock: int, quantity: int) -> list[str]:
+    """Problemas encontrados (vacío si el checkout se comportó bien)"""
+    problems = []
+    errors = {r for r in results if r.startswith("error")}
+    if errors:
+        problems.append(f"Unexpected errors: {errors}")
+
+    sold = results.count("ok") * quantity
+    if sold > initial_stock:
+        problems.append(f"Oversold: {sold} units sold, initial stock {initial_stock}")
+
+    for game_id, stock, reserved in final_stocks:
+        if stock < 0:
+            problems.append(f"Oversold: negative stock {stock} for {game_id}")
+        if reserved < 0:
+            problems.append(f"Negative reserved {reserved} for {game_id}")
+        if initial_stock - stock != sold:
+            problems.append(
+                f"Sold units do not match stock for {game_id}: "
+                f"sold {sold}, stock went {initial_stock} -> {stock}"
+            )
+    return problems
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--stock", type=int, default=50)
+    parser.add_argument("--quantity", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="No borrar datos")
+    args = parser.parse_args()
+
+    run_id, game_ids, user_ids = await setup(args.users, args.stock, args.quantity)
+    print(f"🧪 Run {run_id}: {args.users} concurrent checkouts, stock={args.stock}")
+
+    try:
+        results = await asyncio.gather(*(checkout(uid) for uid in user_ids))
+
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(
+                select(Game.id, Game.stock, Game.reserved).where(Game.id.in_(game_ids))
+            )
+            final_stocks = rows.all()
+
+        errors = [r for r in results if r.startswith("error")]
+
+        print(f"   ✅ Orders: {results.count('ok')}")
+        print(f"   ⛔ Out of stock: {results.count('out_of_stock')}")
+        print(f"   ❌ Errors: {len(errors)} {set(errors) or ''}")
+        print(f"   📦 Final stock: {[stock for _, stock, _ in final_stocks]}")
+
+        problems = check(results, final_stocks, args.stock, args.quantity)
+    finally:
+        if not args.keep:
+            await cleanup(game_ids, user_ids)
+        await engine.dispose()
+
+    if problems:
+        print("\n💥 Checkout is not safe under concurrency:")
+        for problem in problems:
+            print(f"   - {problem}")
+        return 1
+
+    print("\n🎉 No overselling detected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
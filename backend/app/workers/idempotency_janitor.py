@@ -0,0 +1,31 @@
+"""
+Tarea en segundo plano que elimina claves de idempotencia expiradas.
+"""
+
+import asyncio
+import logging
+
+from app.core.database import AsyncSessionLocal
+from app.crud.idempotency_key import purge_expired_keys
+from app.workers.periodic import run_periodic
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL_SECONDS = 300
+PURGE_BATCH_SIZE = 1000
+
+
+async def purge_batch() -> bool:
+    """Purga un lote; True si salió lleno"""
+    async with AsyncSessionLocal() as db:
+        purged = await purge_expired_keys(db, PURGE_BATCH_SIZE)
+    if purged:
+        logger.info("Purged %d expired idempotency keys", purged)
+    return purged >= PURGE_BATCH_SIZE
+
+
+async def run_idempotency_janitor(stop_event: asyncio.Event):
+    """Purga claves expiradas en lotes hasta que se active stop_event"""
+    await run_periodic(
+        "Idempotency janitor", purge_batch, PURGE_INTERVAL_SECONDS, stop_event
+    )
@@ -0,0 +1,76 @@
+"""
+Relay del outbox: entrega los eventos pendientes a los handlers en proceso
+(app.core.events). Se ejecuta dentro del proceso de la API (ver lifespan
+en app.main); las peticiones solo insertan el evento y no esperan a los
+handlers.
+"""
+
+import asyncio
+import logging
+from typing import List, Tuple
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.events import Event, get_handlers
+from app.crud.outbox import claim_events, complete_events, fail_events
+from app.workers.periodic import run_periodic
+
+logger = logging.getLogger(__name__)
+
+
+async def dispatch_events(events: List[Event]) -> Tuple[list, list]:
+    """
+    Entrega cada evento a todos sus handlers, en orden de creación.
+
+    Returns:
+        Tuple de (IDs entregados, lista de (evento, error) fallidos)
+    """
+    delivered = []
+    failed = []
+
+    for event in events:
+        try:
+            for handler in get_handlers(event.event_type):
+                await handler(event)
+        except Exception as exc:
+            logger.warning(
+                "Outbox event %s (%s) failed on attempt %d: %r",
+                event.id,
+                event.event_type,
+                event.attempts,
+                exc,
+            )
+            failed.append((event, repr(exc)))
+        else:
+            delivered.append(event.id)
+
+    return delivered, failed
+
+
+async def relay_batch() -> bool:
+    """Toma y entrega un lote de eventos; True si salió lleno"""
+    batch_size = settings.OUTBOX_BATCH_SIZE
+    async with AsyncSessionLocal() as db:
+        events = await claim_events(db, batch_size)
+
+    if events:
+        delivered, failed = await dispatch_events(events)
+        async with AsyncSessionLocal() as db:
+            await complete_events(db, delivered)
+            await fail_events(db, failed)
+    return len(events) >= batch_size
+
+
+async def run_outbox_relay(stop_event: asyncio.Event):
+    """
+    Toma y entrega lotes de eventos hasta que se active stop_event.
+
+    Si un lote sale lleno se toma el siguiente de inmediato; si no,
+    espera OUTBOX_POLL_INTERVAL_SECONDS.
+    """
+    await run_periodic(
+        "Outbox relay",
+        relay_batch,
+        settings.OUTBOX_POLL_INTERVAL_SECONDS,
+        stop_event,
+    )
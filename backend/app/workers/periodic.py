@@ -0,0 +1,40 @@
+"""
+Bucle común de las tareas en segundo plano (reaper de holds, janitor de
+idempotencia, relay del outbox).
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodic(
+    name: str,
+    iteration: Callable[[], Awaitable[bool]],
+    interval: float,
+    stop_event: asyncio.Event,
+):
+    """
+    Ejecuta iteration hasta que se active stop_event.
+
+    iteration devuelve True si procesó un lote lleno: hay más trabajo
+    pendiente y se ejecuta de nuevo de inmediato; si no, espera interval
+    segundos (o hasta stop_event). Un error se registra y no detiene la
+    tarea: se reintenta tras el intervalo.
+    """
+    while not stop_event.is_set():
+        more = False
+        try:
+            more = await iteration()
+        except Exception:
+            logger.exception("%s iteration failed", name)
+
+        if more:
+            continue
+
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,39 @@
+"""
+Tarea en segundo plano que libera holds de stock expirados.
+Se ejecuta dentro del proceso de la API (ver lifespan en app.main).
+"""
+
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud.stock_hold import release_expired_holds
+from app.workers.periodic import run_periodic
+
+logger = logging.getLogger(__name__)
+
+
+async def release_batch() -> bool:
+    """Libera un lote de holds expirados; True si salió lleno"""
+    batch_size = settings.STOCK_HOLD_REAPER_BATCH_SIZE
+    async with AsyncSessionLocal() as db:
+        released = await release_expired_holds(db, batch_size)
+    if released:
+        logger.info("Released %d expired stock holds", released)
+    return released >= batch_size
+
+
+async def run_stock_hold_reaper(stop_event: asyncio.Event):
+    """
+    Libera holds expirados en lotes hasta que se active stop_event.
+
+    Si un lote sale lleno, hay más trabajo pendiente y se procesa el
+    siguiente de inmediato; si no, espera el intervalo configurado.
+    """
+    await run_periodic(
+        "Stock hold reaper",
+        release_batch,
+        settings.STOCK_HOLD_REAPER_INTERVAL_SECONDS,
+        stop_event,
+    )